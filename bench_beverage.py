@@ -0,0 +1,108 @@
+"""
+스미오 음료 판단 속도 측정 스크립트.
+
+    python bench_beverage.py [--count 5000] [--menu-file names.txt]
+
+rooms/*.json과 카탈로그(catalog/*.json)에 저장된 실제 메뉴 이름(또는 --menu-file의 한 줄 한 이름)을 모아
+count개가 될 때까지 반복한 뒤, 예전 방식(호출마다 키워드 목록을 만들고 하나씩 부분 문자열 검사)과
+미리 컴파일한 정규식, 저장된 is_beverage 값을 읽는 화면 경로의 메뉴당 시간을 비교합니다.
+두 방식의 판단이 다른 메뉴와, '아이스'/'핫'/'차'만으로 음료가 된 메뉴(재정의 후보)도 출력합니다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(APP_DIR))
+
+from smio_beverage import BEVERAGE_PATTERN, classify_menu, is_beverage, menu_item_is_beverage
+
+AMBIGUOUS_KEYWORDS = ['아이스', '핫', '차']
+
+
+def legacy_is_beverage(menu_name):
+    """비교용: 예전 smio_app.is_beverage (호출마다 목록 생성 + any() 부분 문자열 검사)."""
+    beverage_keywords = [
+        '커피', '아메리카노', '라떼', '카페', '에스프레소', '모카', '카푸치노', '마끼아또',
+        '차', '녹차', '홍차', '우롱차', '보리차', '쌍화차', '감잎차', '모과차',
+        '주스', '스무디', '에이드', '레몬에이드', '라임에이드', '오렌지에이드',
+        '콜라', '사이다', '환타', '스프라이트', '펩시', '코카콜라',
+        '우유', '딸기우유', '초코우유', '바나나우유',
+        '쉐이크', '밀크쉐이크', '딸기쉐이크', '초코쉐이크',
+        '에스프레소', '아이스', '핫', '따뜻한', '차가운',
+        '음료', '드링크', '베버리지'
+    ]
+
+    menu_lower = menu_name.lower()
+    return any(keyword in menu_lower for keyword in beverage_keywords)
+
+
+def collect_menu_names(menu_file=None):
+    """저장된 주문방/카탈로그의 메뉴 이름을 모읍니다."""
+    if menu_file:
+        return [line.strip() for line in open(menu_file, encoding='utf-8') if line.strip()]
+
+    names = []
+    catalog_dir = Path(os.environ.get("SMIO_CATALOG_DIR", "catalog"))
+    for file_path in sorted((APP_DIR / "rooms").glob("*.json")) + sorted(catalog_dir.glob("*.json")):
+        try:
+            data = json.loads(file_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        restaurant_info = data.get("restaurant_info") or {}
+        names += [item["name"] for item in restaurant_info.get("menu", []) if item.get("name")]
+    return names
+
+
+def time_per_item(func, items, repeat=5):
+    """items 전체에 func를 적용하는 시간을 repeat번 재고 가장 빠른 값의 항목당 시간(마이크로초)을 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스미오 음료 판단 속도 측정")
+    parser.add_argument("--count", type=int, default=5000, help="측정할 메뉴 이름 수 (모자라면 반복해서 채움)")
+    parser.add_argument("--menu-file", help="한 줄에 메뉴 이름 하나씩 적힌 파일")
+    args = parser.parse_args()
+
+    unique_names = list(dict.fromkeys(collect_menu_names(args.menu_file)))
+    if not unique_names:
+        print("❌ 메뉴 이름을 찾지 못했습니다. rooms/*.json, 카탈로그, 또는 --menu-file을 확인하세요.")
+        return
+    names = (unique_names * (args.count // len(unique_names) + 1))[:args.count]
+    menu = classify_menu([{"name": name} for name in names])
+
+    print(f"🍹 메뉴 이름 {len(names)}개 (서로 다른 이름 {len(unique_names)}개)")
+    legacy = time_per_item(legacy_is_beverage, names)
+    compiled = time_per_item(lambda name: BEVERAGE_PATTERN.search(name) is not None, names)
+    full = time_per_item(is_beverage, names)
+    stored = time_per_item(menu_item_is_beverage, menu)
+    print(f"  예전 is_beverage            {legacy:7.2f} µs/메뉴")
+    print(f"  컴파일한 정규식              {compiled:7.2f} µs/메뉴 ({legacy / compiled:.1f}배)")
+    print(f"  is_beverage (재정의 포함)    {full:7.2f} µs/메뉴")
+    print(f"  저장된 값 읽기 (화면 경로)    {stored:7.2f} µs/메뉴")
+
+    mismatches = [name for name in unique_names if legacy_is_beverage(name) != (BEVERAGE_PATTERN.search(name) is not None)]
+    print(f"\n판단이 다른 메뉴: {len(mismatches)}개 {mismatches[:10]}")
+
+    ambiguous = sorted(
+        name for name in unique_names
+        if {match.group(0) for match in BEVERAGE_PATTERN.finditer(name)} <= set(AMBIGUOUS_KEYWORDS)
+        and BEVERAGE_PATTERN.search(name)
+    )
+    print(f"'아이스'/'핫'/'차'만으로 음료로 판단된 메뉴 (재정의 후보): {len(ambiguous)}개")
+    for name in ambiguous[:30]:
+        print(f"  - {name}")
+
+
+if __name__ == "__main__":
+    main()
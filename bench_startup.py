@@ -0,0 +1,130 @@
+"""
+스미오 시작/재실행 비용 측정 스크립트.
+
+    python bench_startup.py [--runs 10] [--room-id f4e5d7b6]
+
+1) 의존성과 앱 모듈을 새 파이썬 프로세스에서 import 하는 데 걸리는 시간 (콜드 import 비용)
+2) Streamlit AppTest로 랜딩/주문방/관리자 페이지를 새 프로세스에서 처음 실행하는 시간과
+   이후 재실행 한 번에 걸리는 시간, 그리고 그 페이지가 불러온 무거운 모듈 목록
+을 출력합니다. 임시 디렉터리에서 rooms/*.json 사본으로 실행하므로 실제 rooms.db나 로그는 건드리지 않습니다.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent
+HEAVY_MODULES = ["pandas", "requests", "selenium", "bs4", "webdriver_manager", "smio_scraper"]
+IMPORT_TARGETS = ["streamlit", "pandas", "requests", "selenium.webdriver", "bs4", "webdriver_manager.chrome", "smio_scraper"]
+
+
+def measure_import(module_name, workdir):
+    """새 프로세스에서 모듈 하나를 import 하는 시간(초)을 잽니다. streamlit은 미리 불러 둔 뒤 잽니다."""
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(APP_DIR)!r})\n"
+        "import streamlit\n"
+        "start = time.perf_counter()\n"
+        f"import {module_name}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    if module_name == "streamlit":
+        code = code.replace("import streamlit\nstart", "start", 1)
+    result = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def run_page(page, runs, room_id):
+    """(자식 프로세스) 한 페이지를 AppTest로 처음 실행하고 runs번 재실행한 결과를 JSON으로 출력합니다."""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(str(APP_DIR / "smio_app.py"), default_timeout=60)
+    if page == "room":
+        at.query_params["room_id"] = room_id
+    elif page == "admin":
+        at.session_state["admin_mode"] = True
+        at.session_state["admin_authenticated"] = True
+    at.run()
+    first = time.perf_counter() - start
+
+    reruns = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "first": first,
+        "rerun_median": statistics.median(reruns) if reruns else None,
+        "rerun_max": max(reruns) if reruns else None,
+        "errors": [str(e.value) for e in at.exception],
+        "loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+def measure_page(page, runs, room_id, workdir):
+    """새 프로세스에서 페이지 하나를 측정합니다 (콜드 스타트 포함)."""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--page", page, "--runs", str(runs), "--room-id", room_id],
+        cwd=workdir, capture_output=True, text=True
+    )
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"errors": [result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "측정 실패"]}
+
+
+def prepare_workdir():
+    """rooms/*.json 사본만 있는 임시 작업 디렉터리를 만듭니다. 즐겨찾기는 비워서 미리 스크래핑을 막습니다."""
+    workdir = Path(tempfile.mkdtemp(prefix="smio_bench_"))
+    shutil.copytree(APP_DIR / "rooms", workdir / "rooms")
+    (workdir / "favorites.json").write_text("[]", encoding="utf-8")
+    return workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스미오 시작/재실행 비용 측정")
+    parser.add_argument("--runs", type=int, default=10, help="페이지마다 재실행할 횟수")
+    parser.add_argument("--room-id", default="f4e5d7b6", help="주문방 페이지 측정에 쓸 rooms/*.json의 방 ID")
+    parser.add_argument("--page", choices=["landing", "room", "admin"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.page:
+        run_page(args.page, args.runs, args.room_id)
+        return
+
+    workdir = prepare_workdir()
+    os.environ.setdefault("SMIO_FAVORITES_FILE", str(workdir / "favorites.json"))
+    try:
+        print("📦 콜드 import 비용 (새 프로세스, streamlit 불러온 뒤)")
+        for module_name in IMPORT_TARGETS:
+            elapsed = measure_import(module_name, workdir)
+            print(f"  {module_name:<26} {'설치 안 됨' if elapsed is None else f'{elapsed * 1000:8.1f} ms'}")
+
+        print(f"\n⏱️ 페이지 실행 비용 (새 프로세스에서 첫 실행 + 재실행 {args.runs}회)")
+        for page in ["room", "landing", "admin"]:
+            result = measure_page(page, args.runs, args.room_id, workdir)
+            if result.get("first") is None:
+                print(f"  {page:<8} 실패: {result['errors']}")
+                continue
+            print(
+                f"  {page:<8} 첫 실행 {result['first'] * 1000:8.1f} ms | "
+                f"재실행 중앙값 {result['rerun_median'] * 1000:7.1f} ms (최대 {result['rerun_max'] * 1000:.1f} ms) | "
+                f"불러온 모듈: {', '.join(result['loaded']) or '-'}"
+            )
+            if result["errors"]:
+                print(f"           ⚠️ 예외: {result['errors']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
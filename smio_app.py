@@ -1,59 +1,698 @@
 import streamlit as st
-import pandas as pd
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import time
-import re
-from selenium.webdriver.common.action_chains import ActionChains
 import urllib.parse
 import os
-import sys
 import json
 import uuid
 import hashlib
+import secrets
 from pathlib import Path
 import datetime
+import threading
+import contextlib
+import collections
+import queue
+import sqlite3
+import gzip
+import csv
+import io
+
+from smio_settings import get_env_int
+from smio_beverage import menu_item_is_beverage
+
+try:
+    import fcntl  # 프로세스 간 파일 잠금 (Linux/macOS)
+except ImportError:
+    fcntl = None
 
 # --- 1. 방 ID 및 데이터 관리 함수 ---
 def generate_room_id():
     """고유한 방 ID를 생성합니다."""
     return str(uuid.uuid4())[:8]
 
-def get_room_data_path(room_id):
-    """방 ID에 해당하는 데이터 파일 경로를 반환합니다."""
-    rooms_dir = Path("rooms")
-    rooms_dir.mkdir(exist_ok=True)
-    return rooms_dir / f"{room_id}.json"
+ROOM_DB_FILE = Path(os.environ.get("SMIO_ROOM_DB", "rooms.db"))
+LEGACY_ROOMS_DIR = Path("rooms")
+ORDER_FIELDS = ["name", "menu", "quantity", "price", "beverage_option", "special_request"]
+
+ROOMS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    room_id TEXT PRIMARY KEY,
+    place_id TEXT NOT NULL,
+    restaurant_version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    closed_at REAL,
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (place_id, restaurant_version) REFERENCES restaurants(place_id, version)
+);
+"""
+
+ROOM_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    place_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    restaurant_info TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (place_id, version)
+);
+""" + ROOMS_TABLE_SQL.format(table="rooms") + """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_id TEXT NOT NULL REFERENCES rooms(room_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    menu TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    beverage_option TEXT,
+    special_request TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_room ON orders(room_id, order_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+SQLITE_POOL_IDLE = 8  # DB 파일마다 쉬는 연결을 이만큼까지 남겨 두고 재사용
+
+def connect_sqlite(path):
+    """
+    SQLite 파일에 새 연결을 엽니다. WAL 모드라 읽기는 쓰기를 막지 않고, 쓰기끼리는 busy_timeout 동안 기다립니다.
+    연결은 SQLitePool이 스레드 사이에서 돌려 쓰므로(한 번에 한 스레드만 사용) check_same_thread를 끕니다.
+    """
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+def connect_room_db():
+    """방 DB에 새 연결을 엽니다."""
+    return connect_sqlite(ROOM_DB_FILE)
+
+class SQLitePool:
+    """
+    프로세스 전체에서 돌려 쓰는 SQLite 연결 풀입니다.
+    Streamlit은 재실행과 fragment 실행마다 새 스레드를 쓰므로, 스레드별 연결로는 거의 매번 연결을 새로 열고
+    PRAGMA를 다시 설정하게 됩니다. 연결을 빌렸다가 돌려놓아 재사용하고, 쉬는 연결이 없으면 하나 더 엽니다.
+    """
+
+    def __init__(self, path, max_idle=SQLITE_POOL_IDLE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """with 블록 동안 연결 하나를 빌려줍니다. 블록 안에서 끝나지 않은 트랜잭션은 되돌린 뒤 돌려놓습니다."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = connect_sqlite(self.path)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+@st.cache_resource
+def init_room_db():
+    """프로세스당 한 번 스키마를 만들고 예전 rooms/*.json 파일을 가져옵니다."""
+    if ROOM_DB_FILE.parent != Path("."):
+        ROOM_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = connect_room_db()
+    try:
+        # 보관으로 지운 방의 빈 페이지를 정리할 때 조금씩 돌려주도록 incremental auto_vacuum 사용.
+        # WAL 모드로 연 뒤에는 설정만으로 바뀌지 않으므로 DB마다 한 번 VACUUM해서 전환 (새 DB는 비어 있어 즉시 끝남)
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]:
+                print(f"🗜️ {ROOM_DB_FILE}를 incremental auto_vacuum으로 전환합니다 (한 번만)")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        conn.executescript(ROOM_DB_SCHEMA)
+        migrate_room_restaurant_refs(conn)
+        if "closed_at" not in [row["name"] for row in conn.execute("PRAGMA table_info(rooms)")]:
+            conn.execute("ALTER TABLE rooms ADD COLUMN closed_at REAL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rooms_updated ON rooms(updated_at)")  # 보관 대상 조회용
+        migrate_json_rooms(conn)
+    finally:
+        conn.close()
+    return True
+
+@st.cache_resource
+def get_room_db_pool():
+    """프로세스 전체에서 공유하는 방 DB 연결 풀을 반환합니다."""
+    init_room_db()
+    return SQLitePool(ROOM_DB_FILE)
+
+def room_db():
+    """방 DB 연결을 풀에서 빌립니다. with room_db() as conn: 형태로 씁니다."""
+    return get_room_db_pool().connection()
+
+@contextlib.contextmanager
+def room_db_transaction():
+    """쓰기 트랜잭션. BEGIN IMMEDIATE로 시작해 쓰기 잠금을 먼저 잡고, 예외가 나면 되돌립니다."""
+    with room_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+
+def insert_room_orders(conn, room_id, orders, created_at=None):
+    """주문 목록을 orders 테이블에 넣습니다."""
+    created_at = created_at or time.time()
+    conn.executemany(
+        "INSERT INTO orders (room_id, name, menu, quantity, price, beverage_option, special_request, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (room_id, order.get("name", ""), order.get("menu", ""), order.get("quantity", 0) or 0,
+             order.get("price", 0) or 0, order.get("beverage_option"), order.get("special_request"), created_at)
+            for order in orders
+        ]
+    )
+
+def store_restaurant_snapshot(conn, restaurant_info):
+    """
+    가게 정보를 restaurants 테이블에 place_id별 버전으로 저장하고 (place_id, version)을 반환합니다.
+    내용이 같은 버전이 이미 있으면 새로 저장하지 않고 그 버전을 돌려주므로, 같은 가게의 방들은 메뉴를 한 벌만 공유합니다.
+    쓰기 트랜잭션 안에서 호출해야 합니다.
+    """
+    restaurant_info = restaurant_info or {}
+    payload = json.dumps(restaurant_info, ensure_ascii=False, sort_keys=True)
+    content_hash = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    # place_id가 없는 예전 방은 내용 해시로 식별
+    place_id = str(restaurant_info.get("place_id") or f"local-{content_hash[:12]}")
+    
+    row = conn.execute(
+        "SELECT version FROM restaurants WHERE place_id = ? AND content_hash = ? ORDER BY version DESC LIMIT 1",
+        (place_id, content_hash)
+    ).fetchone()
+    if row:
+        return place_id, row["version"]
+    
+    latest = conn.execute(
+        "SELECT COALESCE(MAX(version), 0) FROM restaurants WHERE place_id = ?", (place_id,)
+    ).fetchone()[0]
+    conn.execute(
+        "INSERT INTO restaurants (place_id, version, content_hash, restaurant_info, created_at) VALUES (?, ?, ?, ?, ?)",
+        (place_id, latest + 1, content_hash, payload, time.time())
+    )
+    return place_id, latest + 1
+
+@st.cache_resource(max_entries=256)
+def load_restaurant_snapshot(place_id, version):
+    """가게 정보 스냅샷을 불러옵니다. 스냅샷은 바뀌지 않으므로 모든 방과 세션이 파싱된 객체 하나를 함께 씁니다."""
+    with room_db() as conn:
+        row = conn.execute(
+            "SELECT restaurant_info FROM restaurants WHERE place_id = ? AND version = ?", (place_id, version)
+        ).fetchone()
+    return json.loads(row["restaurant_info"]) if row else None
+
+def migrate_room_restaurant_refs(conn):
+    """
+    rooms 테이블에 가게 정보 전체(restaurant_info)를 넣던 예전 스키마를 (place_id, restaurant_version) 참조로 바꿉니다.
+    SQLite는 열을 지우거나 제약을 바꿀 수 없으므로 새 테이블을 만들어 옮긴 뒤 교체합니다.
+    """
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(rooms)")]
+    if "restaurant_info" not in columns:
+        return 0
+    
+    conn.execute("PRAGMA foreign_keys=OFF")  # 교체하는 동안 orders → rooms 참조 검사 중지 (트랜잭션 밖에서만 바꿀 수 있음)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(ROOMS_TABLE_SQL.format(table="rooms_new"))
+        rows = conn.execute("SELECT room_id, restaurant_info, created_at, updated_at, version FROM rooms").fetchall()
+        for row in rows:
+            place_id, restaurant_version = store_restaurant_snapshot(conn, json.loads(row["restaurant_info"]))
+            conn.execute(
+                "INSERT INTO rooms_new (room_id, place_id, restaurant_version, created_at, updated_at, version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (row["room_id"], place_id, restaurant_version, row["created_at"], row["updated_at"], row["version"])
+            )
+        conn.execute("DROP TABLE rooms")
+        conn.execute("ALTER TABLE rooms_new RENAME TO rooms")
+        conn.execute("COMMIT")
+    except:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+    print(f"📦 방 {len(rows)}개의 가게 정보를 restaurants 카탈로그로 분리했습니다")
+    return len(rows)
+
+def migrate_json_rooms(conn, rooms_dir=LEGACY_ROOMS_DIR):
+    """
+    예전 방식의 rooms/{room_id}.json 파일을 DB로 옮깁니다. 이미 있는 방은 건너뛰며, 한 번 끝나면 다시 보지 않습니다.
+    옮긴 방의 마지막 활동 시각은 이전한 시각으로 두어, 첫 실행 직후 정리(TTL)에 바로 걸리지 않게 합니다.
+    원본 JSON 파일은 지우지 않습니다 (저장소에 들어 있는 파일일 수 있으므로 정리는 따로 합니다).
+    """
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_rooms_migrated'").fetchone():
+        return 0
+    
+    migrated = 0
+    for file_path in sorted(rooms_dir.glob("*.json")) if rooms_dir.exists() else []:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            room_id = file_path.stem
+            created_at = data.get("created_at") or file_path.stat().st_mtime
+            migrated_at = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            place_id, restaurant_version = store_restaurant_snapshot(conn, data.get("restaurant_info"))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO rooms (room_id, place_id, restaurant_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (room_id, place_id, restaurant_version, created_at, migrated_at)
+            )
+            if cursor.rowcount:
+                insert_room_orders(conn, room_id, data.get("orders", []), created_at)
+                migrated += 1
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"방 파일 이전 오류 ({file_path.name}): {e}")
+    
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_rooms_migrated', ?)", (str(time.time()),))
+    if migrated:
+        print(f"📦 rooms/*.json {migrated}개를 {ROOM_DB_FILE}로 이전했습니다")
+    return migrated
+
+def build_room_summary(orders):
+    """
+    주문 목록에서 방 집계를 한 번에 만듭니다 (주문 수만큼 한 번 훑음).
+    - total: 총 주문 금액
+    - menus: 메뉴 → {"quantity": 총 수량, "orderers": {주문자: 그 메뉴를 담은 주문 수}}
+    - people: 주문자 → {"total": 개인 총액, "orders": 그 사람의 주문 목록}
+    """
+    menus = {}
+    people = {}
+    total = 0
+    for order in orders:
+        menu = menus.setdefault(order["menu"], {"quantity": 0, "orderers": {}})
+        menu["quantity"] += order["quantity"]
+        menu["orderers"][order["name"]] = menu["orderers"].get(order["name"], 0) + 1
+        person = people.setdefault(order["name"], {"total": 0, "orders": []})
+        person["total"] += order["price"]
+        person["orders"].append(order)
+        total += order["price"]
+    return {"total": total, "menus": menus, "people": people}
+
+def update_room_summary(summary, removed=None, added=None):
+    """
+    주문 한 건이 빠지거나(removed) 들어온(added) 만큼만 방 집계를 고친 새 집계를 반환합니다.
+    주문 수정은 둘 다 넘깁니다. 캐시된 집계는 여러 세션이 공유하므로 건드리지 않고, 바뀐 메뉴/주문자 항목만 새로 만듭니다.
+    """
+    menus = dict(summary["menus"])
+    people = dict(summary["people"])
+    total = summary["total"]
+    changes = [(order, sign) for order, sign in ((removed, -1), (added, 1)) if order]
+
+    for order, sign in changes:
+        menu = menus.get(order["menu"], {"quantity": 0, "orderers": {}})
+        orderers = dict(menu["orderers"])
+        orderers[order["name"]] = orderers.get(order["name"], 0) + sign
+        menus[order["menu"]] = {"quantity": menu["quantity"] + sign * order["quantity"], "orderers": orderers}
+
+        person = people.get(order["name"], {"total": 0, "orders": []})
+        if sign < 0:
+            person_orders = [item for item in person["orders"] if item["order_id"] != order["order_id"]]
+            if added and added["name"] == order["name"]:
+                # 같은 사람의 주문 수정이면 목록 위치를 그대로 두고 바꿔 끼움
+                person_orders = [added if item["order_id"] == order["order_id"] else item for item in person["orders"]]
+        elif removed and removed["name"] == order["name"]:
+            person_orders = person["orders"]  # 위에서 이미 바꿔 끼움
+        else:
+            person_orders = person["orders"] + [order]
+            if len(person_orders) > 1 and person_orders[-2]["order_id"] > order["order_id"]:
+                person_orders.sort(key=lambda item: item["order_id"])  # 주문자를 바꾼 수정: 주문 순서 유지
+        people[order["name"]] = {"total": person["total"] + sign * order["price"], "orders": person_orders}
+        total += sign * order["price"]
+
+    # 주문이 하나도 남지 않은 메뉴/주문자는 집계에서 뺌
+    for order, _ in changes:
+        menu = menus.get(order["menu"])
+        if menu and not menu["orderers"].get(order["name"], 1):
+            del menu["orderers"][order["name"]]
+        if menu and not menu["orderers"]:
+            del menus[order["menu"]]
+        if order["name"] in people and not people[order["name"]]["orders"]:
+            del people[order["name"]]
+
+    return {"total": total, "menus": menus, "people": people}
+
+class RoomCache:
+    """
+    프로세스 전체가 함께 쓰는 방 데이터 캐시. 항목마다 DB의 version을 함께 기억해 두고,
+    version이 같으면 주문 목록을 다시 읽거나 JSON을 파싱하지 않고 같은 객체를 돌려줍니다.
+    주문이 바뀌면 방 집계(summary)도 바뀐 주문 한 건만큼만 고쳐서 함께 교체합니다.
+    돌려준 객체는 여러 세션이 공유하므로 읽기 전용으로 다룹니다 (쓰기는 새 객체로 교체).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rooms = {}
+
+    def get(self, room_id, version):
+        with self.lock:
+            room_data = self.rooms.get(room_id)
+        if room_data and room_data["version"] == version:
+            return room_data
+        return None
+
+    def put(self, room_id, room_data):
+        with self.lock:
+            current = self.rooms.get(room_id)
+            if not current or current["version"] <= room_data["version"]:
+                self.rooms[room_id] = room_data
+
+    def apply(self, room_id, new_version, update):
+        """직전 version의 항목이 캐시에 있으면 update로 만든 새 항목으로 바꾸고, 아니면 항목을 버립니다."""
+        with self.lock:
+            current = self.rooms.get(room_id)
+            if current and current["version"] == new_version - 1:
+                self.rooms[room_id] = dict(update(current), version=new_version)
+            else:
+                self.rooms.pop(room_id, None)
+
+    def invalidate(self, room_id):
+        with self.lock:
+            self.rooms.pop(room_id, None)
+
+@st.cache_resource
+def get_room_cache():
+    """프로세스 전체에서 공유하는 방 캐시를 반환합니다."""
+    return RoomCache()
+
+def get_room_version(conn, room_id):
+    """방의 현재 version을 반환합니다. 방이 없으면 None."""
+    row = conn.execute("SELECT version FROM rooms WHERE room_id = ?", (room_id,)).fetchone()
+    return row["version"] if row else None
 
 def save_room_data(room_id, data):
-    """방 데이터를 파일에 저장합니다."""
+    """방을 저장합니다. 방이 없으면 주문 목록과 함께 만들고, 있으면 가게 정보 참조만 갱신합니다.
+    가게 정보는 restaurants 카탈로그에 스냅샷으로 저장되고 방에는 (place_id, 버전) 참조만 남습니다.
+    주문은 add_room_order / delete_room_order로만 바꾸므로 다른 사람이 동시에 넣은 주문을 덮어쓰지 않습니다."""
     try:
-        file_path = get_room_data_path(room_id)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        now = time.time()
+        created = False
+        changed = False
+        with room_db_transaction() as conn:
+            place_id, restaurant_version = store_restaurant_snapshot(conn, data.get("restaurant_info"))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO rooms (room_id, place_id, restaurant_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (room_id, place_id, restaurant_version, data.get("created_at", now), now)
+            )
+            if cursor.rowcount:
+                created = True
+                insert_room_orders(conn, room_id, data.get("orders", []), now)
+            else:
+                # 참조가 그대로면 version을 올리지 않음 (보고 있는 사람들의 화면을 괜히 다시 그리지 않도록)
+                changed = conn.execute(
+                    "UPDATE rooms SET place_id = ?, restaurant_version = ?, updated_at = ?, version = version + 1 "
+                    "WHERE room_id = ? AND NOT (place_id = ? AND restaurant_version = ?)",
+                    (place_id, restaurant_version, now, room_id, place_id, restaurant_version)
+                ).rowcount > 0
+            version = get_room_version(conn, room_id)
+        
+        cache = get_room_cache()
+        restaurant_info = load_restaurant_snapshot(place_id, restaurant_version)
+        if created and not data.get("orders"):
+            cache.put(room_id, {
+                "restaurant_info": restaurant_info,
+                "place_id": place_id,
+                "restaurant_version": restaurant_version,
+                "orders": [],
+                "summary": build_room_summary([]),
+                "created_at": data.get("created_at", now),
+                "closed_at": None,
+                "version": version
+            })
+        elif created:
+            cache.invalidate(room_id)  # 주문 order_id는 다음 로드 때 DB에서 읽음
+        elif changed:
+            cache.apply(room_id, version, lambda room: dict(
+                room, restaurant_info=restaurant_info, place_id=place_id, restaurant_version=restaurant_version
+            ))
         return True
     except Exception as e:
         print(f"방 데이터 저장 오류: {e}")
         return False
 
+def upgrade_partial_room(room_id, partial_ref, restaurant_info):
+    """
+    부분 결과(partial)로 만든 방의 가게 정보를 다시 스크래핑한 결과로 바꿉니다.
+    방이 아직 그 부분 스냅샷(partial_ref = (place_id, 버전))을 가리키고, 마감되지 않았고, 주문이 하나도 없을 때만 바꿉니다.
+    이미 주문이 들어간 방은 주문과 메뉴가 어긋나지 않도록 그대로 둡니다. 바꿨으면 True를 반환합니다.
+    """
+    if not restaurant_info or not restaurant_info.get("menu") or restaurant_info.get("partial"):
+        return False
+    try:
+        now = time.time()
+        with room_db_transaction() as conn:
+            place_id, restaurant_version = store_restaurant_snapshot(conn, restaurant_info)
+            upgraded = conn.execute(
+                "UPDATE rooms SET place_id = ?, restaurant_version = ?, updated_at = ?, version = version + 1 "
+                "WHERE room_id = ? AND place_id = ? AND restaurant_version = ? AND closed_at IS NULL "
+                "AND NOT EXISTS (SELECT 1 FROM orders WHERE orders.room_id = rooms.room_id)",
+                (place_id, restaurant_version, now, room_id, *partial_ref)
+            ).rowcount > 0
+            version = get_room_version(conn, room_id)
+        if upgraded:
+            restaurant_info = load_restaurant_snapshot(place_id, restaurant_version)
+            get_room_cache().apply(room_id, version, lambda room: dict(
+                room, restaurant_info=restaurant_info, place_id=place_id, restaurant_version=restaurant_version
+            ))
+            print(f"🔄 방 {room_id}의 부분 메뉴를 새로 가져온 메뉴로 교체")
+        return upgraded
+    except Exception as e:
+        print(f"부분 결과 방 갱신 오류: {e}")
+        return False
+
 def load_room_data(room_id):
-    """방 데이터를 파일에서 불러옵니다."""
+    """
+    방 데이터를 불러옵니다. 각 주문에는 삭제/수정에 쓰는 order_id가 붙습니다.
+    version 한 칸만 조회해서 캐시와 같으면 캐시된 객체를 그대로 돌려줍니다.
+    """
     try:
-        file_path = get_room_data_path(room_id)
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        cache = get_room_cache()
+        with room_db() as conn:
+            version = get_room_version(conn, room_id)
+            if version is None:
+                cache.invalidate(room_id)
+                return None
+            
+            cached = cache.get(room_id, version)
+            if cached:
+                return cached
+            
+            # 한 번의 읽기 트랜잭션 안에서 방과 주문을 읽어 version과 내용이 어긋나지 않게 함
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute(
+                    "SELECT place_id, restaurant_version, created_at, closed_at, version FROM rooms WHERE room_id = ?", (room_id,)
+                ).fetchone()
+                order_rows = conn.execute(
+                    "SELECT order_id, " + ", ".join(ORDER_FIELDS) + " FROM orders WHERE room_id = ? ORDER BY order_id",
+                    (room_id,)
+                ).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        if not row:
+            return None
+        orders = [dict(order_row) for order_row in order_rows]
+        room_data = {
+            "restaurant_info": load_restaurant_snapshot(row["place_id"], row["restaurant_version"]),
+            "place_id": row["place_id"],
+            "restaurant_version": row["restaurant_version"],
+            "orders": orders,
+            "summary": build_room_summary(orders),
+            "created_at": row["created_at"],
+            "closed_at": row["closed_at"],
+            "version": row["version"]
+        }
+        cache.put(room_id, room_data)
+        return room_data
     except Exception as e:
         print(f"방 데이터 로드 오류: {e}")
         return None
 
+ROOM_MUTATION_RETRIES = 5
+
+def run_room_mutation(room_id, expected_version, check, apply, update):
+    """
+    방 version을 비교-교환(compare-and-swap)하며 주문 변경 한 건을 적용합니다.
+    - check(room): 최신 방 상태에서 이 변경이 여전히 유효한지 확인 (False면 적용하지 않음)
+    - apply(conn): 한 행짜리 DB 변경을 실행하고 결과를 반환
+    - update(room, result): 캐시된 방 데이터에 같은 변경을 반영한 새 객체를 반환
+    화면에서 본 version(expected_version) 이후 다른 사람이 방을 바꿨거나, 확인과 쓰기 사이에 version이 바뀌면
+    덮어쓰지 않고 최신 상태를 다시 읽어 check부터 다시 시도합니다. (적용 여부, apply 결과)를 반환합니다.
+    """
+    for attempt in range(ROOM_MUTATION_RETRIES):
+        room = load_room_data(room_id)
+        if not room:
+            return False, None
+        if expected_version is not None and expected_version != room["version"]:
+            print(f"🔁 방 {room_id}이(가) 그 사이 바뀜 (v{expected_version} → v{room['version']}) - 최신 상태로 다시 확인")
+            expected_version = None
+        if room.get("closed_at") or not check(room):
+            return False, None  # 마감된 방은 주문을 바꿀 수 없음
+        
+        applied = False
+        with room_db_transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE rooms SET updated_at = ?, version = version + 1 WHERE room_id = ? AND version = ?",
+                (time.time(), room_id, room["version"])
+            )
+            if cursor.rowcount:
+                result = apply(conn)
+                applied = True
+        if applied:
+            get_room_cache().apply(room_id, room["version"] + 1, lambda current: update(current, result))
+            return True, result
+        print(f"🔁 방 {room_id} version 충돌 - 다시 시도 ({attempt + 1}/{ROOM_MUTATION_RETRIES})")
+    
+    print(f"⚠️ 방 {room_id} 변경 재시도 횟수 초과")
+    return False, None
+
+def find_room_order(room, order_id):
+    """방 데이터에서 order_id에 해당하는 주문을 찾습니다."""
+    return next((order for order in room["orders"] if order["order_id"] == order_id), None)
+
+def room_order_unchanged(room, order_id, expected):
+    """
+    주문이 아직 있고, 화면에서 본 값(expected)과 지금 값이 같은지 확인합니다.
+    expected가 없으면 주문이 남아 있는지만 봅니다.
+    """
+    order = find_room_order(room, order_id)
+    if order is None:
+        return False
+    return expected is None or all(order.get(field) == expected.get(field) for field in ORDER_FIELDS)
+
+def add_room_order(room_id, order, expected_version=None):
+    """주문 한 건을 방에 추가합니다 (한 행 INSERT). 새 order_id를 반환하고, 실패하면 None을 반환합니다."""
+    try:
+        stored_order = {field: order.get(field) for field in ORDER_FIELDS}
+        
+        def apply(conn):
+            insert_room_orders(conn, room_id, [order])
+            return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        
+        def update(room, order_id):
+            added = dict(stored_order, order_id=order_id)
+            return dict(room, orders=room["orders"] + [added], summary=update_room_summary(room["summary"], added=added))
+        
+        applied, order_id = run_room_mutation(
+            room_id, expected_version,
+            check=lambda room: True,
+            apply=apply,
+            update=update
+        )
+        return order_id if applied else None
+    except Exception as e:
+        print(f"주문 추가 오류: {e}")
+        return None
+
+def delete_room_order(room_id, order_id, expected_version=None, expected=None):
+    """
+    방에서 주문 한 건을 지웁니다. expected(화면에서 본 주문)를 주면 그 사이 다른 사람이 이 주문을 바꿨을 때 지우지 않습니다.
+    이미 지워졌거나 바뀌었으면 False를 반환합니다.
+    """
+    try:
+        applied, _ = run_room_mutation(
+            room_id, expected_version,
+            check=lambda room: room_order_unchanged(room, order_id, expected),
+            apply=lambda conn: conn.execute(
+                "DELETE FROM orders WHERE room_id = ? AND order_id = ?", (room_id, order_id)
+            ).rowcount,
+            update=lambda room, _: dict(
+                room,
+                orders=[order for order in room["orders"] if order["order_id"] != order_id],
+                summary=update_room_summary(room["summary"], removed=find_room_order(room, order_id))
+            )
+        )
+        return applied
+    except Exception as e:
+        print(f"주문 삭제 오류: {e}")
+        return False
+
+def update_room_order(room_id, order_id, changes, expected_version=None, expected=None):
+    """
+    주문 한 건의 일부 필드(수량, 금액, 옵션 등)를 바꿉니다. expected(화면에서 본 주문)를 주면 그 사이 다른 사람이
+    이 주문을 바꿨을 때 덮어쓰지 않습니다. 주문이 이미 지워졌거나 바뀌었으면 False를 반환합니다.
+    """
+    changes = {field: value for field, value in changes.items() if field in ORDER_FIELDS}
+    if not changes:
+        return False
+    try:
+        assignments = ", ".join(f"{field} = ?" for field in changes)
+        
+        def update(room, _):
+            removed = find_room_order(room, order_id)
+            added = dict(removed, **changes)
+            return dict(
+                room,
+                orders=[added if order["order_id"] == order_id else order for order in room["orders"]],
+                summary=update_room_summary(room["summary"], removed=removed, added=added)
+            )
+        
+        applied, _ = run_room_mutation(
+            room_id, expected_version,
+            check=lambda room: room_order_unchanged(room, order_id, expected),
+            apply=lambda conn: conn.execute(
+                f"UPDATE orders SET {assignments} WHERE room_id = ? AND order_id = ?",
+                (*changes.values(), room_id, order_id)
+            ).rowcount,
+            update=update
+        )
+        return applied
+    except Exception as e:
+        print(f"주문 수정 오류: {e}")
+        return False
+
+def close_room(room_id):
+    """주문 총무가 방을 마감합니다. 이후 주문 추가/수정/삭제를 받지 않고, 보관 유예 시간이 지나면 정리 대상이 됩니다."""
+    try:
+        now = time.time()
+        with room_db_transaction() as conn:
+            closed = conn.execute(
+                "UPDATE rooms SET closed_at = ?, updated_at = ?, version = version + 1 WHERE room_id = ? AND closed_at IS NULL",
+                (now, now, room_id)
+            ).rowcount > 0
+            version = get_room_version(conn, room_id)
+        if closed:
+            get_room_cache().apply(room_id, version, lambda room: dict(room, closed_at=now))
+        return closed
+    except Exception as e:
+        print(f"방 마감 오류: {e}")
+        return False
+
+def reopen_room(room_id):
+    """마감을 취소하고 다시 주문을 받습니다. 보관 처리되기 전(마감 후 유예 시간 안)의 방만 다시 열 수 있습니다."""
+    try:
+        now = time.time()
+        with room_db_transaction() as conn:
+            reopened = conn.execute(
+                "UPDATE rooms SET closed_at = NULL, updated_at = ?, version = version + 1 WHERE room_id = ? AND closed_at IS NOT NULL",
+                (now, room_id)
+            ).rowcount > 0
+            version = get_room_version(conn, room_id)
+        if reopened:
+            get_room_cache().apply(room_id, version, lambda room: dict(room, closed_at=None))
+        return reopened
+    except Exception as e:
+        print(f"방 다시 열기 오류: {e}")
+        return False
+
 def get_current_room_id():
     """현재 URL에서 방 ID를 가져옵니다."""
     query_params = st.query_params
@@ -66,15 +705,34 @@ def create_room_url(room_id):
     return f"https://smioapp.up.railway.app?room_id={room_id}"
 
 # --- 로그 관리 함수 ---
-def get_log_file_path():
-    """로그 파일 경로를 반환합니다."""
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
-    today = datetime.datetime.now().strftime("%Y-%m")
-    return logs_dir / f"orders_{today}.json"
+# 주문 로그는 월별 JSON Lines 파일(logs/orders_YYYY-MM.jsonl)에 한 줄씩 덧붙입니다.
+LOGS_DIR = Path("logs")
+
+def get_log_file_path(year_month=None):
+    """월별 로그 파일 경로를 반환합니다. 월을 주지 않으면 이번 달 파일입니다."""
+    LOGS_DIR.mkdir(exist_ok=True)
+    year_month = year_month or datetime.datetime.now().strftime("%Y-%m")
+    return LOGS_DIR / f"orders_{year_month}.jsonl"
+
+@contextlib.contextmanager
+def order_log_lock(log_file):
+    """
+    월별 로그 파일의 권고 잠금(advisory lock). 덧붙이기와 다시 쓰기(삭제)가 서로 섞이지 않게 합니다.
+    다시 쓰기는 파일을 교체하므로 로그 파일 자체가 아닌 옆의 .lock 파일을 잠급니다.
+    """
+    if fcntl is None:
+        yield
+        return
+    
+    with open(log_file.with_suffix(".lock"), 'w') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 def save_order_log(room_id, restaurant_info, order_info):
-    """주문 로그를 파일에 저장합니다."""
+    """주문 로그 한 건을 이번 달 로그 파일 끝에 한 줄로 덧붙입니다."""
     try:
         now = datetime.datetime.now()
         restaurant_name = restaurant_info.get("name", "알 수 없는 음식점")
@@ -103,53 +761,42 @@ def save_order_log(room_id, restaurant_info, order_info):
         }
         
         log_file = get_log_file_path()
+        line = json.dumps(log_entry, ensure_ascii=False) + "\n"
         
-        # 기존 로그 읽기
-        existing_logs = []
-        if log_file.exists():
-            with open(log_file, 'r', encoding='utf-8') as f:
-                try:
-                    existing_logs = json.load(f)
-                except json.JSONDecodeError:
-                    existing_logs = []
-        
-        # 새 로그 추가
-        existing_logs.append(log_entry)
-        
-        # 로그 저장
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+        # 잠금을 잡고 write 한 번으로 덧붙임 (기존 내용은 읽지 않음)
+        with order_log_lock(log_file):
+            with open(log_file, 'a', encoding='utf-8') as f:
+                f.write(line)
         
         return True
     except Exception as e:
         print(f"로그 저장 오류: {e}")
         return False
 
-def load_order_logs(year_month=None):
-    """주문 로그를 불러옵니다."""
-    try:
-        if year_month:
-            log_file = Path("logs") / f"orders_{year_month}.json"
-        else:
-            log_file = get_log_file_path()
-        
-        if log_file.exists():
-            with open(log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"로그 로드 오류: {e}")
-        return []
+def iter_order_logs(year_month=None):
+    """월별 로그를 한 줄씩 읽어 항목을 하나씩 돌려줍니다. 기록 도중 끊긴 줄은 건너뜁니다."""
+    log_file = get_log_file_path(year_month)
+    if not log_file.exists():
+        return
+    
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ 손상된 로그 줄 건너뜀: {log_file.name}")
 
 def get_available_log_months():
     """사용 가능한 로그 월 목록을 반환합니다."""
     try:
-        logs_dir = Path("logs")
-        if not logs_dir.exists():
+        if not LOGS_DIR.exists():
             return []
         
         months = []
-        for file in logs_dir.glob("orders_*.json"):
+        for file in LOGS_DIR.glob("orders_*.jsonl"):
             month = file.stem.replace("orders_", "")
             months.append(month)
         
@@ -158,34 +805,42 @@ def get_available_log_months():
         print(f"로그 월 조회 오류: {e}")
         return []
 
-def delete_log_entry(month, timestamp):
-    """특정 로그 항목을 삭제합니다."""
+def rewrite_order_log(month, keep):
+    """keep(log)이 참인 항목만 남기도록 월별 로그를 스트리밍으로 다시 씁니다. 지운 항목 수를 반환합니다."""
+    log_file = get_log_file_path(month)
+    if not log_file.exists():
+        return 0
+    
+    removed = []
+    with order_log_lock(log_file):
+        old_stat = log_file.stat()
+        temp_path = log_file.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for log in iter_order_logs(month):
+                if keep(log):
+                    out.write(json.dumps(log, ensure_ascii=False) + "\n")
+                else:
+                    removed.append(log)
+        os.replace(temp_path, log_file)
+        apply_log_rewrite_to_index(month, old_stat, log_file.stat(), removed)
+    return len(removed)
+
+def delete_log_entries(month, timestamps):
+    """timestamp로 고른 로그 항목들을 파일 한 번 다시 쓰기로 삭제합니다. 지운 항목 수를 반환합니다."""
     try:
-        log_file = Path("logs") / f"orders_{month}.json"
-        if not log_file.exists():
-            return False
-        
-        with open(log_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
-        
-        # 해당 timestamp의 로그 제거
-        logs = [log for log in logs if log['timestamp'] != timestamp]
-        
-        # 파일 다시 저장
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
-        
-        return True
+        timestamps = set(timestamps)
+        return rewrite_order_log(month, lambda log: log['timestamp'] not in timestamps)
     except Exception as e:
         print(f"로그 삭제 오류: {e}")
-        return False
+        return 0
 
 def delete_all_logs_for_month(month):
     """특정 월의 모든 로그를 삭제합니다."""
     try:
-        log_file = Path("logs") / f"orders_{month}.json"
+        log_file = get_log_file_path(month)
         if log_file.exists():
-            log_file.unlink()
+            with order_log_lock(log_file):
+                log_file.unlink()
             return True
         return False
     except Exception as e:
@@ -195,966 +850,402 @@ def delete_all_logs_for_month(month):
 def delete_logs_by_room(month, room_id):
     """특정 방의 모든 로그를 삭제합니다."""
     try:
-        log_file = Path("logs") / f"orders_{month}.json"
-        if not log_file.exists():
-            return False
-        
-        with open(log_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
-        
-        # 해당 room_id의 로그들 제거
-        logs = [log for log in logs if log['room_id'] != room_id]
-        
-        # 파일 다시 저장
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=2)
-        
-        return True
+        return rewrite_order_log(month, lambda log: log['room_id'] != room_id) > 0
     except Exception as e:
         print(f"방별 로그 삭제 오류: {e}")
         return False
 
-# --- 2. URL 추출 및 정규화 함수 ---
-def extract_naver_url(text):
+@st.cache_resource
+def convert_legacy_order_logs():
     """
-    텍스트에서 네이버 플레이스 관련 URL을 추출합니다.
+    예전 형식(월별 JSON 배열, logs/orders_YYYY-MM.json)을 JSON Lines로 한 번 변환합니다.
+    같은 달의 .jsonl이 이미 있으면 배열 항목을 앞에 붙여 시간 순서를 유지하고, 원본은 .json.bak으로 남깁니다.
     """
-    import re
-    
-    print(f"URL 추출 시도 - 입력 텍스트: {text}")
-    
-    # 다양한 URL 패턴으로 시도
-    url_patterns = [
-        r'https?://[^\s\n\r]+',  # 기본 URL 패턴
-        r'https://naver\.me/[A-Za-z0-9]+',  # naver.me 특화
-        r'https://map\.naver\.com/[^\s\n\r]+',  # map.naver.com
-        r'https://m\.place\.naver\.com/[^\s\n\r]+',  # m.place.naver.com
-        r'http://[^\s\n\r]+naver[^\s\n\r]+',  # 기타 naver 도메인
-    ]
-    
-    found_urls = []
-    
-    # 모든 패턴으로 URL 찾기
-    for pattern in url_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        found_urls.extend(matches)
-    
-    print(f"발견된 모든 URL: {found_urls}")
-    
-    # 네이버 관련 URL만 필터링
-    naver_keywords = ['naver.me', 'map.naver.com', 'place.naver.com', 'm.place.naver.com', 'm.map.naver.com', 'pcmap.place.naver.com']
-    
-    for url in found_urls:
-        for keyword in naver_keywords:
-            if keyword in url.lower():
-                # URL 정리 (끝의 불필요한 문자 제거)
-                cleaned_url = re.sub(r'[^\w\-\./:=?&%#]+$', '', url)
-                print(f"✅ 추출된 네이버 URL: {cleaned_url}")
-                return cleaned_url
-    
-    # 마지막으로 텍스트에서 naver.me 패턴 직접 검색
-    naver_me_pattern = r'naver\.me/[A-Za-z0-9]+'
-    naver_me_match = re.search(naver_me_pattern, text, re.IGNORECASE)
-    if naver_me_match:
-        full_url = f"https://{naver_me_match.group(0)}"
-        print(f"✅ naver.me 패턴으로 추출된 URL: {full_url}")
-        return full_url
-    
-    print(f"❌ 텍스트에서 네이버 URL을 찾을 수 없음: {text}")
-    return None
-
-def normalize_naver_place_url(url_input):
-    """
-    네이버 플레이스 URL을 메뉴 페이지 URL로 정규화합니다.
-    """
-    import re
-    import requests
-    
-    print(f"🔍 URL 정규화 시작 - 입력: {url_input}")
-    
-    # 먼저 텍스트에서 URL 추출
-    extracted_url = extract_naver_url(url_input)
-    if not extracted_url:
-        print(f"❌ URL 추출 실패")
-        return None
-    
-    url = extracted_url
-    print(f"📝 추출된 URL: {url}")
-    
-    # 네이버 공유 링크인 경우 리다이렉트 처리
-    if 'naver.me' in url:
+    converted = 0
+    for legacy_file in sorted(LOGS_DIR.glob("orders_*.json")) if LOGS_DIR.exists() else []:
         try:
-            print(f"🔗 네이버 공유 링크 감지: {url}")
-            response = requests.head(url, allow_redirects=True, timeout=15)
-            final_url = response.url
-            print(f"➡️ 리다이렉트된 URL: {final_url}")
-            url = final_url
-        except Exception as e:
-            print(f"❌ 리다이렉트 처리 오류: {e}")
-            # 리다이렉트 실패해도 원본 URL로 계속 시도
-            pass
-    
-    # URL에서 place ID 추출 (다양한 패턴 시도)
-    place_id_patterns = [
-        r'place/(\d+)',           # 기본 패턴
-        r'restaurant/(\d+)',      # restaurant 패턴  
-        r'entry/place/(\d+)',     # entry/place 패턴
-        r'/(\d+)/?(?:\?|$)',      # URL 끝의 숫자 패턴
-    ]
-    
-    place_id = None
-    for pattern in place_id_patterns:
-        match = re.search(pattern, url)
-        if match:
-            place_id = match.group(1)
-            print(f"✅ Place ID 추출 성공: {place_id} (패턴: {pattern})")
-            break
-    
-    if not place_id:
-        print(f"❌ Place ID 추출 실패 - URL: {url}")
-        return None
-    
-    # 이미 모바일 메뉴 URL인 경우
-    if 'm.place.naver.com' in url and '/menu/' in url:
-        print(f"✅ 이미 모바일 메뉴 URL: {url}")
-        return url
-    
-    # 네이버 맵 URL을 모바일 메뉴 URL로 변환
-    mobile_menu_url = f"https://m.place.naver.com/restaurant/{place_id}/menu/list?entry=plt"
-    print(f"🎯 최종 변환된 URL: {mobile_menu_url}")
-    return mobile_menu_url
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy_logs = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"예전 로그 변환 실패 ({legacy_file.name}): {e}")
+            continue
+        
+        log_file = legacy_file.with_suffix(".jsonl")
+        with order_log_lock(log_file):
+            temp_path = log_file.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as out:
+                for log in legacy_logs:
+                    out.write(json.dumps(log, ensure_ascii=False) + "\n")
+                if log_file.exists():
+                    with open(log_file, 'r', encoding='utf-8') as current:
+                        for line in current:
+                            out.write(line if line.endswith("\n") else line + "\n")
+            os.replace(temp_path, log_file)
+            legacy_file.rename(legacy_file.with_suffix(".json.bak"))
+        converted += 1
+        print(f"📦 예전 로그 변환 완료: {legacy_file.name} → {log_file.name} ({len(legacy_logs)}건)")
+    return converted
 
-# --- 3. 음료 판단 함수 ---
-def is_beverage(menu_name):
-    """
-    메뉴 이름이 음료인지 판단합니다.
-    """
-    beverage_keywords = [
-        '커피', '아메리카노', '라떼', '카페', '에스프레소', '모카', '카푸치노', '마끼아또',
-        '차', '녹차', '홍차', '우롱차', '보리차', '쌍화차', '감잎차', '모과차',
-        '주스', '스무디', '에이드', '레몬에이드', '라임에이드', '오렌지에이드',
-        '콜라', '사이다', '환타', '스프라이트', '펩시', '코카콜라',
-        '우유', '딸기우유', '초코우유', '바나나우유',
-        '쉐이크', '밀크쉐이크', '딸기쉐이크', '초코쉐이크',
-        '에스프레소', '아이스', '핫', '따뜻한', '차가운',
-        '음료', '드링크', '베버리지'
-    ]
-    
-    menu_lower = menu_name.lower()
-    return any(keyword in menu_lower for keyword in beverage_keywords)
+# --- 로그 색인 (관리자 조회용) ---
+# JSONL 로그가 원본이고, 관리자 페이지의 필터/통계는 이 SQLite 색인에서 조회합니다.
+# 월별 파일의 inode와 색인한 바이트 위치를 기억해 두고, 새로 덧붙은 줄만 읽어 색인합니다.
+LOG_INDEX_DB_FILE = Path(os.environ.get("SMIO_LOG_INDEX_DB", "logs/orders_index.db"))
+
+LOG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_logs (
+    month TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    restaurant_name TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_logs_time ON order_logs(month, timestamp);
+CREATE INDEX IF NOT EXISTS idx_order_logs_restaurant ON order_logs(month, restaurant_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_order_logs_user ON order_logs(month, user_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_order_logs_room ON order_logs(month, room_id, timestamp);
+CREATE TABLE IF NOT EXISTS indexed_log_files (
+    month TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+"""
+
+@st.cache_resource
+def init_log_index_db():
+    """프로세스당 한 번 로그 색인 스키마를 만듭니다."""
+    LOG_INDEX_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = connect_sqlite(LOG_INDEX_DB_FILE)
+    try:
+        conn.executescript(LOG_INDEX_SCHEMA)
+    finally:
+        conn.close()
+    return True
+
+@st.cache_resource
+def get_log_index_pool():
+    """프로세스 전체에서 공유하는 로그 색인 DB 연결 풀을 반환합니다."""
+    init_log_index_db()
+    return SQLitePool(LOG_INDEX_DB_FILE)
+
+def log_index_db():
+    """로그 색인 DB 연결을 풀에서 빌립니다. with log_index_db() as conn: 형태로 씁니다."""
+    return get_log_index_pool().connection()
 
-# --- 4. Chrome WebDriver 설정 함수 ---
-def setup_chrome_driver():
+def sync_order_log_index(month):
     """
-    속도 최적화된 Chrome WebDriver를 설정합니다.
+    월별 로그 파일과 색인을 맞춥니다. 파일이 그대로면 stat 한 번과 조회 한 번으로 끝나고,
+    끝에 덧붙은 줄만 읽어 색인합니다. 삭제로 파일이 교체되었거나(inode 변경) 줄었으면 그 달을 다시 색인합니다.
     """
-    options = webdriver.ChromeOptions()
-    
-    # 필수 옵션들
-    options.add_argument('--headless')  # 필수: GUI 없이 실행
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-extensions')
-    options.add_argument('--disable-plugins')
-    options.add_argument('--disable-images')  # 이미지 로딩 비활성화로 속도 향상
-    options.add_argument('--disable-javascript')  # JavaScript 비활성화로 속도 향상
-    options.add_argument('--disable-css')  # CSS 비활성화로 속도 향상
-    options.add_argument('--disable-logging')
-    options.add_argument('--log-level=3')
-    options.add_argument('--silent')
-    options.add_argument('--window-size=1280,720')  # 작은 크기로 메모리 절약
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36")
-    
-    # 속도 최적화를 위한 옵션들
-    options.add_argument('--disable-background-timer-throttling')
-    options.add_argument('--disable-renderer-backgrounding')
-    options.add_argument('--disable-backgrounding-occluded-windows')
-    options.add_argument('--aggressive-cache-discard')
-    options.add_argument('--disable-features=TranslateUI,VizDisplayCompositor')
-    options.add_argument('--disable-background-networking')
-    options.add_argument('--disable-sync')
-    options.add_argument('--disable-default-apps')
-    options.add_argument('--disable-web-security')
-    options.add_argument('--disable-features=VizDisplayCompositor')
-    
-    # 메모리 사용량 최적화
-    options.add_argument('--memory-pressure-off')
-    options.add_argument('--max_old_space_size=2048')  # 메모리 사용량 줄임
-    
-    # 단순화된 환경 감지 및 Chrome 설정
-    is_cloud = (os.environ.get('STREAMLIT_SERVER_PORT') is not None or 
-                os.environ.get('RAILWAY_ENVIRONMENT') is not None or
-                os.environ.get('PORT') is not None)
-    
-    try:
-        if is_cloud:
-            # 클라우드 환경에서 Chrome 바이너리 경로 설정
-            chrome_paths = [
-                '/usr/bin/chromium-browser',
-                '/usr/bin/chromium',
-                '/usr/bin/google-chrome',
-                '/usr/bin/google-chrome-stable'
-            ]
-            
-            chrome_found = False
-            for path in chrome_paths:
-                if os.path.exists(path):
-                    options.binary_location = path
-                    chrome_found = True
-                    break
-            
-            if not chrome_found:
-                print("Chrome 바이너리를 찾을 수 없음")
-                return None
-            
-            # ChromeDriver 경로 설정
-            chromedriver_paths = [
-                '/usr/bin/chromedriver',
-                '/usr/bin/chromium-chromedriver',
-                '/usr/local/bin/chromedriver'
-            ]
-            
-            service = None
-            for path in chromedriver_paths:
-                if os.path.exists(path):
-                    service = Service(path)
-                    break
+    log_file = get_log_file_path(month)
+    with log_index_db() as conn:
+        file_stat = log_file.stat() if log_file.exists() else None
+        state = conn.execute("SELECT inode, offset FROM indexed_log_files WHERE month = ?", (month,)).fetchone()
+        if file_stat and state and state["inode"] == file_stat.st_ino and state["offset"] == file_stat.st_size:
+            return
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 잠금을 잡은 뒤 다시 확인 (다른 스레드가 먼저 색인했을 수 있음)
+            state = conn.execute("SELECT inode, offset FROM indexed_log_files WHERE month = ?", (month,)).fetchone()
+            offset = state["offset"] if state else 0
+            if not file_stat or not state or state["inode"] != file_stat.st_ino or file_stat.st_size < offset:
+                conn.execute("DELETE FROM order_logs WHERE month = ?", (month,))
+                offset = 0
             
-            if not service:
-                try:
-                    service = Service(ChromeDriverManager().install())
-                except Exception as e:
-                    print(f"webdriver-manager 실패: {e}")
-                    return None
-        else:
-            # 로컬 환경에서는 기본 설정 사용
-            service = Service(ChromeDriverManager().install())
-        
-        driver = webdriver.Chrome(service=service, options=options)
-        
-        # 짧은 타임아웃 설정으로 속도 향상
-        driver.set_page_load_timeout(15)  # 30초에서 15초로 단축
-        driver.implicitly_wait(5)  # 10초에서 5초로 단축
-        
-        return driver
-        
-    except Exception as e:
-        print(f"Chrome WebDriver 설정 오류: {e}")
-        return None
+            if file_stat:
+                with open(log_file, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+                complete = data[:data.rfind(b"\n") + 1]  # 아직 쓰는 중인 마지막 줄은 다음에 색인
+                rows = []
+                for line in complete.decode("utf-8").splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        log = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    rows.append((
+                        month, log.get("timestamp", ""), log.get("room_id", ""),
+                        log.get("restaurant", {}).get("name") or "", log.get("order", {}).get("user_name") or "",
+                        log.get("order", {}).get("price") or 0, line
+                    ))
+                conn.executemany(
+                    "INSERT INTO order_logs (month, timestamp, room_id, restaurant_name, user_name, price, entry) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO indexed_log_files (month, inode, offset) VALUES (?, ?, ?)",
+                    (month, file_stat.st_ino, offset + len(complete))
+                )
+            else:
+                conn.execute("DELETE FROM indexed_log_files WHERE month = ?", (month,))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
 
-# --- 5. 웹 스크래핑 기능: 네이버 플레이스에서 정보 가져오기 ---
-@st.cache_data(ttl=3600)  # 1시간 캐시
-def scrape_restaurant_info(url):
+def apply_log_rewrite_to_index(month, old_stat, new_stat, removed):
     """
-    주어진 네이버 플레이스 URL에서 가게 이름, 메뉴, 주차 정보를 스크래핑합니다.
+    삭제로 월별 로그 파일이 교체되었을 때, 색인이 교체 전 파일과 맞아 있었다면 지운 항목만 색인에서 빼고
+    새 파일을 색인한 것으로 기록합니다 (한 달 전체를 다시 색인하지 않도록). 맞지 않았다면 다음 조회 때 다시 색인됩니다.
     """
-    driver = None
-    try:
-        # WebDriver 설정
-        driver = setup_chrome_driver()
-        if not driver:
-            return {"error": "WebDriver 설정에 실패했습니다."}
-        
-        print(f"URL 접속 시도: {url}")
-        driver.get(url)
-
-        # 네이버 플레이스는 iframe 안에 주요 내용이 있으므로, iframe으로 전환해야 합니다.
-        print("iframe 찾기 시도...")
+    with log_index_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            WebDriverWait(driver, 20).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "entryIframe")))
-            print("entryIframe으로 전환 성공")
+            state = conn.execute("SELECT inode, offset FROM indexed_log_files WHERE month = ?", (month,)).fetchone()
+            if state and state["inode"] == old_stat.st_ino and state["offset"] == old_stat.st_size:
+                conn.executemany(
+                    "DELETE FROM order_logs WHERE month = ? AND timestamp = ? AND room_id = ?",
+                    [(month, log.get("timestamp", ""), log.get("room_id", "")) for log in removed]
+                )
+                conn.execute(
+                    "UPDATE indexed_log_files SET inode = ?, offset = ? WHERE month = ?",
+                    (new_stat.st_ino, new_stat.st_size, month)
+                )
+            conn.execute("COMMIT")
         except:
-            print("entryIframe을 찾을 수 없음, 다른 iframe 시도...")
-            try:
-                iframe_selectors = [
-                    "iframe#entryIframe",
-                    "iframe#searchIframe", 
-                    "iframe#placeIframe",
-                    "iframe[src*='entry']",
-                    "iframe[src*='place']"
-                ]
-                
-                iframe_found = False
-                for selector in iframe_selectors:
-                    try:
-                        iframe = driver.find_element(By.CSS_SELECTOR, selector)
-                        driver.switch_to.frame(iframe)
-                        print(f"iframe 전환 성공: {selector}")
-                        iframe_found = True
-                        break
-                    except:
-                        continue
-                
-                if not iframe_found:
-                    print("iframe을 찾을 수 없음, 메인 페이지에서 진행...")
-            except Exception as e:
-                print(f"iframe 처리 오류: {e}")
-                print("메인 페이지에서 진행...")
-        
-        # 페이지 로딩 대기
-        time.sleep(3)
-        
-        # 메뉴 탭 클릭
-        print("메뉴 탭 찾기 및 클릭...")
-        menu_tab = None
-        for selector in ["a[role='tab']", "a.tpj9w._tab-menu", "a[href*='/menu']", "span.veBoZ", "a._tab-menu"]:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if "메뉴" in element.text:
-                        menu_tab = element
-                        break
-                if menu_tab:
-                    break
-            except:
-                continue
-        
-        if menu_tab and menu_tab.is_displayed():
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", menu_tab)
-            time.sleep(0.5)
-            try:
-                menu_tab.click()
-                time.sleep(2)
-                print("메뉴 탭 클릭 성공")
-            except:
-                print("메뉴 탭 클릭 실패")
-        else:
-            print("메뉴 탭을 찾을 수 없음")
+            conn.execute("ROLLBACK")
+            raise
 
-        # 더보기 버튼 클릭 (속도 최적화)
-        print("더보기 버튼 클릭 시작...")
-        click_count = 0
-        max_clicks = 5  # 클릭 횟수 제한으로 속도 향상
-        
-        while click_count < max_clicks:
-            more_menu_btn = None
-            
-            # 더보기 버튼 찾기 (간단한 방법으로)
-            try:
-                more_buttons = driver.find_elements(By.CSS_SELECTOR, "span.TeItc")
-                for btn in more_buttons:
-                    if "더보기" in btn.text:
-                        more_menu_btn = btn
-                        break
-            except:
-                pass
-            
-            if not more_menu_btn:
-                print("더보기 버튼이 더 이상 없음 - 메뉴 로드 완료")
-                break
-            
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", more_menu_btn)
-                time.sleep(0.5)  # 대기 시간 단축
-                more_menu_btn.click()
-                time.sleep(1)  # 대기 시간 단축
-                click_count += 1
-            except Exception as e:
-                print(f"더보기 버튼 클릭 실패: {e}")
-                break
-        
-        # 메뉴 정보 추출
-        print("메뉴 정보 추출 시작...")
-        time.sleep(2)
-        
-        current_page_source = driver.page_source
-        menu_soup = BeautifulSoup(current_page_source, "html.parser")
-        
-        menu_items = menu_soup.select("div.place_section_content ul > li.E2jtL")
-        print(f"발견된 메뉴 항목 수: {len(menu_items)}")
-        
-        menu_list = []
-        processed_menus = set()
-        
-        for i, item in enumerate(menu_items):
-            # 메뉴 이름 추출
-            menu_name = None
-            name_selectors = [
-                "span.lPzHi",
-                "div.yQlqY span",
-                "span[class*='name']",
-                "div[class*='name'] span",
-                "span[class*='title']",
-                "div[class*='title'] span",
-                "h3", "h4", "h5",
-                "div.MXkFw span",
-                "div.meDTN span"
-            ]
-            
-            for selector in name_selectors:
-                name_tag = item.select_one(selector)
-                if name_tag and name_tag.text.strip():
-                    menu_name = name_tag.text.strip()
-                    break
-            
-            if not menu_name:
-                continue
-            
-            # 가격 추출
-            price = None
-            price_selectors = [
-                "div.GXS1X em",
-                "div.GXS1X",
-                "em",
-                "span[class*='price']",
-                "div[class*='price']"
-            ]
-            
-            for selector in price_selectors:
-                price_tag = item.select_one(selector)
-                if price_tag:
-                    price_text = re.sub(r'[^0-9]', '', price_tag.text)
-                    if price_text:
-                        try:
-                            price = int(price_text)
-                            break
-                        except ValueError:
-                            continue
-            
-            # 중복 제거
-            menu_key = f"{menu_name}_{price}"
-            if menu_key not in processed_menus:
-                processed_menus.add(menu_key)
-                if menu_name:
-                    menu_list.append({"name": menu_name, "price": price})
-
-        # 홈 탭에서 기본 정보 추출
-        print("홈 탭 정보 추출...")
-        address = None
-        phone = None
-        restaurant_name = None
-        restaurant_type = None
-        rating = None
-        review_visitor = None
-        review_blog = None
-        short_desc = None
-        parking_info = "주차 정보 없음"
-        
-        # 홈 탭 클릭
-        home_tab = None
-        home_selectors = ["a[role='tab']", "a.tpj9w._tab-menu", "span.veBoZ"]
-        for selector in home_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if "홈" in element.text:
-                        home_tab = element
-                        break
-                if home_tab:
-                    break
-            except:
-                continue
-        
-        if home_tab and home_tab.is_displayed():
-            try:
-                home_tab.click()
-                time.sleep(2)
-                
-                home_page = driver.page_source
-                home_soup = BeautifulSoup(home_page, "html.parser")
-                
-                # 기본 정보 추출
-                address_tag = home_soup.select_one("span.LDgIH")
-                if address_tag:
-                    address = address_tag.get_text(strip=True)
-                
-                phone_tag = home_soup.select_one("span.xlx7Q")
-                if phone_tag:
-                    phone = phone_tag.get_text(strip=True)
-                
-                # 가게 이름 - 여러 셀렉터 시도
-                name_selectors = [
-                    "div.zD5Nm div.LylZZ.v8v5j span.GHAhO",  # 기존 셀렉터
-                    "span.GHAhO",  # 클래스만
-                    "h1",  # 헤더 태그
-                    "h2", 
-                    ".restaurant_title",
-                    ".place_name",
-                    "[data-type='title']",
-                    ".title",
-                    ".name",
-                    "div[class*='title'] span",
-                    "div[class*='name'] span",
-                    "span[class*='title']",
-                    "span[class*='name']",
-                    ".GHAhO"
-                ]
-                
-                for selector in name_selectors:
-                    try:
-                        name_tag = home_soup.select_one(selector)
-                        if name_tag and name_tag.text.strip():
-                            restaurant_name = name_tag.text.strip()
-                            print(f"✅ 가게이름 발견: {restaurant_name} (셀렉터: {selector})")
-                            break
-                    except:
-                        continue
-                
-                # 업종
-                type_tag = home_soup.select_one("div.zD5Nm div.LylZZ.v8v5j span.lnJFt")
-                if type_tag:
-                    restaurant_type = type_tag.text.strip()
-                    
-            except Exception as e:
-                print(f"홈 탭 정보 추출 오류: {e}")
+def build_log_filter(month, restaurant=None, user=None, room_id=None):
+    """관리자 필터 조건을 WHERE 절과 인자로 만듭니다. month에 월 목록을 주면 여러 달을 함께 조회합니다. None인 조건은 적용하지 않습니다."""
+    if isinstance(month, (list, tuple)):
+        clauses = [f"month IN ({', '.join('?' for _ in month)})"]
+        params = list(month)
+    else:
+        clauses = ["month = ?"]
+        params = [month]
+    for column, value in (("restaurant_name", restaurant), ("user_name", user), ("room_id", room_id)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return " AND ".join(clauses), params
 
+def get_order_log_facets(month):
+    """해당 월의 음식점, 사용자, 방 ID 목록을 색인에서 가져옵니다."""
+    sync_order_log_index(month)
+    with log_index_db() as conn:
         return {
-            "name": restaurant_name or "가게 이름 정보 없음",
-            "type": restaurant_type,
-            "rating": rating,
-            "review_visitor": review_visitor,
-            "review_blog": review_blog,
-            "short_desc": short_desc,
-            "address": address or "주소 정보 없음",
-            "phone": phone or "전화번호 정보 없음",
-            "menu": menu_list,
-            "parking": parking_info
+            key: [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {column} FROM order_logs WHERE month = ? AND {column} != '' ORDER BY {column}", (month,)
+            )]
+            for key, column in (("restaurants", "restaurant_name"), ("users", "user_name"), ("rooms", "room_id"))
         }
 
-    except Exception as e:
-        print(f"스크래핑 오류 발생: {e}")
-        import traceback
-        print(f"상세 오류 정보: {traceback.format_exc()}")
-        
-        # Streamlit Cloud 환경에서의 특별한 오류 처리
-        if "invalid session id" in str(e):
-            return {"error": "브라우저 세션이 만료되었습니다. 다시 시도해주세요."}
-        elif "ChromeDriver를 찾을 수 없습니다" in str(e):
-            return {"error": "브라우저 드라이버를 찾을 수 없습니다. 잠시 후 다시 시도해주세요."}
-        elif "timeout" in str(e).lower():
-            return {"error": "페이지 로딩 시간이 초과되었습니다. 네트워크 상태를 확인하고 다시 시도해주세요."}
-        else:
-            return {"error": f"스크래핑 중 오류가 발생했습니다: {str(e)}"}
-    
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+def get_order_log_stats(month, **filters):
+    """필터에 맞는 주문 수, 총 금액, 사용자 수, 방 개수를 색인에서 집계합니다."""
+    sync_order_log_index(month)
+    where, params = build_log_filter(month, **filters)
+    with log_index_db() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(price), 0), COUNT(DISTINCT NULLIF(user_name, '')), COUNT(DISTINCT room_id) "
+            f"FROM order_logs WHERE {where}", params
+        ).fetchone()
+    return {"orders": row[0], "total_amount": row[1], "users": row[2], "rooms": row[3]}
 
-# --- 5. Streamlit UI 구성 ---
+def query_order_logs(month, limit=None, offset=0, **filters):
+    """필터에 맞는 로그 항목을 시간 순으로 가져옵니다. limit을 주면 그만큼만 읽습니다."""
+    sync_order_log_index(month)
+    where, params = build_log_filter(month, **filters)
+    sql = f"SELECT entry FROM order_logs WHERE {where} ORDER BY timestamp"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    with log_index_db() as conn:
+        return [json.loads(row["entry"]) for row in conn.execute(sql, params)]
 
-# 페이지 기본 설정 - 모바일 최적화
-st.set_page_config(
-    page_title="Smio | 스마트 팀 주문", 
-    page_icon="🍽️", 
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
+def iter_order_logs_range(months, chunk_size=1000, **filters):
+    """여러 달의 로그를 월, 시간 순으로 chunk_size개씩 묶어 돌려줍니다. 한 번에 한 묶음만 메모리에 둡니다."""
+    for month in months:
+        sync_order_log_index(month)
+    where, params = build_log_filter(list(months), **filters)
+    with log_index_db() as conn:
+        cursor = conn.execute(
+            f"SELECT entry FROM order_logs WHERE {where} ORDER BY month, timestamp", params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [json.loads(row["entry"]) for row in rows]
 
-# --- 모바일 최적화 CSS 스타일링 ---
-st.markdown("""
-<style>
-    /* 모바일 우선 반응형 디자인 */
-    .stApp {
-        background: #f8fafc;
-    }
-    
-    /* 모바일 뷰포트 설정 */
-    @viewport {
-        width: device-width;
-        initial-scale: 1.0;
-        maximum-scale: 1.0;
-        user-scalable: no;
-    }
-    
-    /* 메인 컨테이너 - 모바일 최적화 */
-    .main-container {
-        background: white;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        border: 1px solid #e2e8f0;
-    }
-    
-    /* 헤더 스타일 - 모바일 최적화 */
-    .main-header {
-        text-align: center;
-        padding: 2rem 1rem;
-        background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
-        border-radius: 8px;
-        color: white;
-        margin-bottom: 1rem;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    .main-title {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        color: #60a5fa;
-    }
-    
-    .main-subtitle {
-        font-size: 1rem;
-        opacity: 0.9;
-        font-weight: 400;
-        color: #cbd5e1;
-        line-height: 1.4;
-    }
-    
-    /* 카드 스타일 - 모바일 터치 최적화 */
-    .feature-card {
-        background: white;
-        border-radius: 8px;
-        padding: 1.25rem;
-        margin: 0.75rem 0;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.08);
-        border: 1px solid #e2e8f0;
-        border-left: 3px solid #3b82f6;
-        transition: all 0.2s ease;
-        -webkit-tap-highlight-color: rgba(59, 130, 246, 0.1);
-    }
-    
-    .feature-card:active {
-        transform: scale(0.98);
-        box-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* 주문 카드 - 모바일 최적화 */
-    .order-card {
-        background: #1e293b;
-        border-radius: 8px;
-        padding: 1.25rem;
-        margin: 0.75rem 0;
-        color: white;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .status-card {
-        background: #0f172a;
-        border-radius: 8px;
-        padding: 1.25rem;
-        margin: 0.75rem 0;
-        color: white;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* 레스토랑 정보 - 모바일 최적화 */
-    .restaurant-info {
-        background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
-        border-radius: 8px;
-        padding: 1.5rem;
-        color: white;
-        margin: 0.75rem 0;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .restaurant-name {
-        font-size: 1.5rem;
-        font-weight: bold;
-        margin-bottom: 1rem;
-        color: #e2e8f0;
-        line-height: 1.3;
-    }
-    
-    .restaurant-detail {
-        display: flex;
-        align-items: flex-start;
-        margin: 0.75rem 0;
-        font-size: 0.9rem;
-        line-height: 1.4;
-    }
-    
-    .restaurant-detail strong {
-        display: block;
-        margin-bottom: 0.25rem;
-    }
-    
-    /* 주문 아이템 - 터치 최적화 */
-    .order-item {
-        background: white;
-        border-radius: 6px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border: 1px solid #e2e8f0;
-        border-left: 3px solid #3b82f6;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        transition: all 0.2s ease;
-        -webkit-tap-highlight-color: rgba(59, 130, 246, 0.1);
-        min-height: 44px; /* 최소 터치 영역 */
-    }
-    
-    .order-item:active {
-        transform: scale(0.98);
-        background: #f8fafc;
-    }
-    
-    .order-name {
-        font-weight: 600;
-        color: #1e293b;
-        font-size: 1rem;
-        margin-bottom: 0.25rem;
-    }
-    
-    .order-details {
-        color: #64748b;
-        font-size: 0.85rem;
-        line-height: 1.3;
-    }
-    
-    /* 메트릭 카드 - 모바일 최적화 */
-    .metric-card {
-        background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
-        border-radius: 8px;
-        padding: 1.25rem;
-        text-align: center;
-        color: white;
-        margin: 0.75rem 0;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: bold;
-        margin-bottom: 0.25rem;
-        line-height: 1.2;
-    }
-    
-    .metric-label {
-        font-size: 0.9rem;
-        opacity: 0.9;
-    }
-    
-    /* 최종 주문서 */
-    .final-order {
-        background: linear-gradient(135deg, #059669 0%, #047857 100%);
-        border-radius: 8px;
-        padding: 1.5rem;
-        color: white;
-        margin: 1rem 0;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .final-order h3 {
-        margin-bottom: 1rem;
-        font-size: 1.3rem;
-        font-weight: 600;
-    }
-    
-    /* 버튼 스타일 - 터치 최적화 */
-    .stButton > button {
-        background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
-        color: white;
-        border: none;
-        border-radius: 6px;
-        padding: 1rem 1.5rem;
-        font-weight: 600;
-        font-size: 0.95rem;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        transition: all 0.2s ease;
-        min-height: 44px; /* 최소 터치 영역 */
-        -webkit-tap-highlight-color: rgba(59, 130, 246, 0.3);
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-        transform: translateY(-1px);
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.15);
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0);
-        box-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* 입력 필드 - 모바일 키보드 최적화 */
-    .stTextInput > div > div > input {
-        border-radius: 6px;
-        border: 2px solid #d1d5db;
-        padding: 1rem;
-        font-size: 16px; /* iOS 줌 방지 */
-        transition: border-color 0.2s ease;
-        background: white;
-        min-height: 44px; /* 최소 터치 영역 */
-        -webkit-appearance: none;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #3b82f6;
-        box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.1);
-        outline: none;
-    }
-    
-    /* 선택 박스 - 터치 최적화 */
-    .stSelectbox > div > div > select {
-        border-radius: 6px;
-        border: 2px solid #d1d5db;
-        background: white;
-        padding: 1rem;
-        font-size: 16px; /* iOS 줌 방지 */
-        min-height: 44px; /* 최소 터치 영역 */
-        -webkit-appearance: none;
-    }
-    
-    /* 숫자 입력 */
-    .stNumberInput > div > div > input {
-        border-radius: 6px;
-        border: 2px solid #d1d5db;
-        background: white;
-        padding: 1rem;
-        font-size: 16px; /* iOS 줌 방지 */
-        min-height: 44px; /* 최소 터치 영역 */
-    }
-    
-    /* 폼 스타일 */
-    .stForm {
-        border: none;
-        background: transparent;
-    }
-    
-    /* 확장 가능한 섹션 */
-    .streamlit-expanderHeader {
-        font-size: 1rem;
-        font-weight: 600;
-        color: #1e293b;
-        padding: 1rem;
-        background: #f8fafc;
-        border-radius: 6px;
-        border: 1px solid #e2e8f0;
-        min-height: 44px; /* 최소 터치 영역 */
-    }
-    
-    /* 데이터프레임 모바일 최적화 */
-    .stDataFrame {
-        border-radius: 6px;
-        overflow-x: auto;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        max-width: 100%;
-    }
-    
-    .stDataFrame table {
-        font-size: 0.85rem;
-    }
-    
-    /* 스크롤바 스타일 */
-    ::-webkit-scrollbar {
-        width: 4px;
-        height: 4px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #f1f5f9;
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: #94a3b8;
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: #64748b;
-    }
-    
-    /* 모바일 전용 스타일 */
-    @media (max-width: 768px) {
-        .main-title {
-            font-size: 2rem;
-        }
-        
-        .main-container {
-            margin: 0.25rem;
-            padding: 0.75rem;
-        }
-        
-        .restaurant-info {
-            padding: 1rem;
-        }
-        
-        .restaurant-name {
-            font-size: 1.25rem;
-        }
-        
-        .metric-value {
-            font-size: 1.75rem;
-        }
-        
-        /* 컬럼 간격 조정 */
-        .block-container {
-            padding-left: 1rem;
-            padding-right: 1rem;
-        }
-        
-        /* 그리드 레이아웃을 모바일에서 단일 컬럼으로 */
-        .restaurant-info > div {
-            display: block !important;
-        }
-        
-        .restaurant-detail {
-            margin: 1rem 0;
-            padding: 0.75rem;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 6px;
-        }
-    }
-    
-    /* 초소형 화면 (320px 이하) */
-    @media (max-width: 320px) {
-        .main-title {
-            font-size: 1.75rem;
-        }
-        
-        .main-subtitle {
-            font-size: 0.9rem;
-        }
-        
-        .metric-value {
-            font-size: 1.5rem;
-        }
+# --- 5-8. 주문방 보관 및 정리 ---
+ROOM_ARCHIVE_DIR = Path(os.environ.get("SMIO_ROOM_ARCHIVE_DIR", "archive"))
+ROOM_TTL = get_env_int("SMIO_ROOM_TTL", 7 * 24 * 3600)  # 마지막 활동 후 이 시간이 지나면 보관(초)
+ROOM_CLOSED_GRACE = get_env_int("SMIO_ROOM_CLOSED_GRACE", 3600)  # 마감된 방을 보관하기 전 최종 주문서를 볼 수 있는 시간(초)
+ROOM_SWEEP_INTERVAL = get_env_int("SMIO_ROOM_SWEEP_INTERVAL", 3600)  # 정리 주기(초)
+ROOM_SWEEP_BATCH = 100
+ROOM_VACUUM_STEP = 256  # incremental_vacuum 한 번에 파일에서 돌려주는 페이지 수
+
+def release_room_db_free_pages():
+    """
+    지운 방이 남긴 빈 페이지(freelist)를 DB 파일에서 돌려주고 그 크기(바이트)를 반환합니다.
+    전체 VACUUM 대신 incremental_vacuum을 ROOM_VACUUM_STEP 페이지씩 나눠 실행하므로,
+    쓰기 잠금은 잠깐씩만 잡혀 그 사이 들어오는 주문을 막지 않습니다. WAL 파일 크기는 계산에 넣지 않습니다.
+    """
+    with room_db() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        released = 0
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free_pages:
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({ROOM_VACUUM_STEP})").fetchall()
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free_pages:
+                break  # auto_vacuum이 꺼진 DB라 돌려줄 수 없음
+            released += free_pages - remaining
+    return released * page_size
+
+def export_room_record(conn, room_id):
+    """보관 파일에 쓸 방 한 개의 전체 기록(가게 정보 스냅샷 + 주문)을 만듭니다."""
+    row = conn.execute("SELECT * FROM rooms WHERE room_id = ?", (room_id,)).fetchone()
+    restaurant = conn.execute(
+        "SELECT restaurant_info FROM restaurants WHERE place_id = ? AND version = ?",
+        (row["place_id"], row["restaurant_version"])
+    ).fetchone()
+    orders = conn.execute(
+        "SELECT order_id, " + ", ".join(ORDER_FIELDS) + ", created_at FROM orders WHERE room_id = ? ORDER BY order_id",
+        (room_id,)
+    ).fetchall()
+    return dict(
+        dict(row),
+        restaurant_info=json.loads(restaurant["restaurant_info"]) if restaurant else None,
+        orders=[dict(order) for order in orders]
+    )
+
+def append_room_archive(records_by_month):
+    """방 기록들을 archive/rooms_YYYY-MM.jsonl.gz에 덧붙입니다. gzip 멤버를 이어 붙이는 방식이라 기존 내용을 다시 쓰지 않습니다."""
+    ROOM_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    for month, records in records_by_month.items():
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with open(ROOM_ARCHIVE_DIR / f"rooms_{month}.jsonl.gz", 'ab') as f:
+            f.write(gzip.compress(lines.encode("utf-8")))
+            f.flush()
+            os.fsync(f.fileno())
+
+def sweep_rooms(now=None):
+    """
+    보관 기한(SMIO_ROOM_TTL)이 지났거나 마감 후 유예 시간이 지난 방을 월별 압축 파일로 보관하고 DB에서 지웁니다.
+    보관 파일에 먼저 쓰고 나서 삭제를 커밋하므로, 중간에 실패해도 방이 사라지지는 않습니다 (최악의 경우 보관 파일에 중복 기록).
+    정리한 방/주문 수와 확보한 용량을 담은 결과를 반환합니다.
+    """
+    now = now or time.time()
+    stats = {"swept_at": now, "rooms": 0, "orders": 0, "bytes_reclaimed": 0, "bundles": []}
+    
+    while True:
+        with room_db_transaction() as conn:
+            # 쓰기 잠금을 잡은 뒤에 대상을 고르므로, 그 사이 주문이 들어온 방은 보관하지 않음
+            room_ids = [row["room_id"] for row in conn.execute(
+                "SELECT room_id FROM rooms WHERE updated_at < ? OR (closed_at IS NOT NULL AND closed_at < ?) LIMIT ?",
+                (now - ROOM_TTL, now - ROOM_CLOSED_GRACE, ROOM_SWEEP_BATCH)
+            )]
+            records_by_month = {}
+            for room_id in room_ids:
+                record = export_room_record(conn, room_id)
+                month = datetime.datetime.fromtimestamp(record["created_at"]).strftime("%Y-%m")
+                records_by_month.setdefault(month, []).append(record)
+                stats["orders"] += len(record["orders"])
+            append_room_archive(records_by_month)
+            conn.executemany("DELETE FROM rooms WHERE room_id = ?", [(room_id,) for room_id in room_ids])  # 주문은 CASCADE로 함께 삭제
+        if not room_ids:
+            break
         
-        .order-item, .feature-card {
-            padding: 0.75rem;
-        }
-    }
-    
-    /* 터치 제스처 최적화 */
-    * {
-        -webkit-touch-callout: none;
-        -webkit-user-select: none;
-        -khtml-user-select: none;
-        -moz-user-select: none;
-        -ms-user-select: none;
-        user-select: none;
-    }
-    
-    input, textarea, select {
-        -webkit-user-select: text;
-        -khtml-user-select: text;
-        -moz-user-select: text;
-        -ms-user-select: text;
-        user-select: text;
-    }
-    
-    /* iOS Safari 스타일 초기화 */
-    input[type="text"], 
-    input[type="number"], 
-    select, 
-    textarea {
-        -webkit-appearance: none;
-        -moz-appearance: none;
-        appearance: none;
-        border-radius: 6px;
-    }
-    
-    /* 모바일 키보드로 인한 뷰포트 변경 대응 */
-    .stApp {
-        min-height: 100vh;
-        position: relative;
-    }
+        for room_id in room_ids:
+            get_room_cache().invalidate(room_id)
+        stats["rooms"] += len(room_ids)
+        stats["bundles"] = sorted(set(stats["bundles"]) | {f"rooms_{month}.jsonl.gz" for month in records_by_month})
+    
+    if stats["rooms"]:
+        with room_db_transaction() as conn:
+            # 더 이상 어떤 방도 참조하지 않는 가게 스냅샷 정리 (버전 번호가 다시 쓰이지 않도록 가게별 최신 버전은 남김)
+            conn.execute("""
+                DELETE FROM restaurants
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM rooms WHERE rooms.place_id = restaurants.place_id AND rooms.restaurant_version = restaurants.version
+                )
+                AND version < (SELECT MAX(version) FROM restaurants AS latest WHERE latest.place_id = restaurants.place_id)
+            """)
+        stats["bytes_reclaimed"] += release_room_db_free_pages()
+    
+    get_room_sweep_history().append(stats)
+    print(f"🧹 주문방 정리: 방 {stats['rooms']}개, 주문 {stats['orders']}건 보관 후 삭제, "
+          f"{stats['bytes_reclaimed'] / 1024:.1f}KB 확보 {stats['bundles']}")
+    return stats
+
+@st.cache_resource
+def get_room_sweep_history():
+    """최근 주문방 정리 결과를 보관합니다."""
+    return collections.deque(maxlen=20)
+
+# 관리자 CSV 내보내기 파일. static/ 아래라 주소만 알면 누구나 받을 수 있으므로, 추측할 수 없는 파일 이름을 쓰고 정리 스레드가 짧은 주기로 지움
+# Streamlit은 작업 디렉터리가 아니라 메인 스크립트 옆의 static/을 /app/static/으로 내보내므로 스크립트 위치 기준으로 둠
+EXPORT_DIR = Path(__file__).resolve().parent / "static" / "exports"
+EXPORT_TTL = 3600  # 만든 CSV 파일을 남겨두는 시간(초)
+EXPORT_SWEEP_INTERVAL = 300  # 지난 CSV 파일을 확인하는 주기(초)
+
+def cleanup_exports():
+    """만든 지 EXPORT_TTL이 지난 CSV 파일(예전 방식의 토큰 디렉터리 포함)을 지웁니다."""
+    if not EXPORT_DIR.exists():
+        return
+    for export_path in EXPORT_DIR.iterdir():
+        try:
+            if time.time() - export_path.stat().st_mtime > EXPORT_TTL:
+                if export_path.is_dir():
+                    for file in export_path.iterdir():
+                        file.unlink()
+                    export_path.rmdir()
+                else:
+                    export_path.unlink()
+        except OSError as e:
+            print(f"CSV 파일 정리 오류 ({export_path.name}): {e}")
+
+@st.cache_resource
+def start_room_sweeper():
+    """주문방 정리(ROOM_SWEEP_INTERVAL마다)와 지난 CSV 내보내기 파일 정리(EXPORT_SWEEP_INTERVAL마다)를 실행하는 스레드를 띄웁니다."""
+    def worker():
+        next_room_sweep = 0
+        while True:
+            if time.time() >= next_room_sweep:
+                next_room_sweep = time.time() + ROOM_SWEEP_INTERVAL
+                try:
+                    sweep_rooms()
+                except Exception as e:
+                    print(f"주문방 정리 오류: {e}")
+            try:
+                cleanup_exports()
+            except Exception as e:
+                print(f"CSV 파일 정리 오류: {e}")
+            time.sleep(min(ROOM_SWEEP_INTERVAL, EXPORT_SWEEP_INTERVAL))
     
-    /* 안전 영역 고려 (iPhone X 이상) */
-    @supports(padding: max(0px)) {
-        .main-container {
-            padding-left: max(1rem, env(safe-area-inset-left));
-            padding-right: max(1rem, env(safe-area-inset-right));
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+    threading.Thread(target=worker, name="room-sweeper", daemon=True).start()
+    return True
+
+# --- 5. Streamlit UI 구성 ---
+
+# 페이지 기본 설정 - 모바일 최적화
+st.set_page_config(
+    page_title="Smio | 스마트 팀 주문", 
+    page_icon="🍽️", 
+    layout="wide",
+    initial_sidebar_state="collapsed"
+)
+
+# --- 모바일 최적화 CSS 스타일링 ---
+# 테마 CSS는 static/smio.css에 두고 Streamlit 정적 파일 서빙(app/static/)으로 내려보냅니다.
+# 재실행마다 보내는 것은 <link> 한 줄뿐이고, 브라우저는 파일 내용이 바뀔 때(v=내용 해시)만 CSS를 다시 받습니다.
+THEME_CSS_FILE = Path(__file__).resolve().parent / "static" / "smio.css"
+
+@st.cache_resource
+def get_theme_css_url():
+    """테마 CSS 주소를 내용 해시와 함께 돌려줍니다. 프로세스마다 한 번만 파일을 읽습니다."""
+    digest = hashlib.md5(THEME_CSS_FILE.read_bytes()).hexdigest()[:10]
+    return f"app/static/{THEME_CSS_FILE.name}?v={digest}"
+
+st.markdown(f'<link rel="stylesheet" href="{get_theme_css_url()}">', unsafe_allow_html=True)
 
 # --- 6. 세션 상태 및 방 관리 ---
 def initialize_session_state():
@@ -1165,30 +1256,12 @@ def initialize_session_state():
     if 'current_room_id' not in st.session_state:
         st.session_state.current_room_id = current_room_id
     
-    # 즐겨찾기 자동 URL 처리
+    # 즐겨찾기 자동 URL 처리 - 백그라운드 스크래핑 작업으로 넘기고 랜딩 페이지에서 진행 상황 표시
     auto_url = st.query_params.get('auto_url', None)
     if auto_url and not st.session_state.get('url_processed', False):
-        try:
-            normalized_url = normalize_naver_place_url(auto_url)
-            if normalized_url:
-                restaurant_data = scrape_restaurant_info(normalized_url)
-                if restaurant_data and restaurant_data.get("menu"):
-                    # 방 ID 생성 및 데이터 저장
-                    room_id = generate_room_id()
-                    st.session_state.current_room_id = room_id
-                    st.session_state.restaurant_info = restaurant_data
-                    st.session_state.url_processed = True
-                    st.session_state.orders = []
-                    
-                    # 방 데이터 저장
-                    sync_room_data()
-                    
-                    # URL 업데이트
-                    st.query_params["room_id"] = room_id
-                    if "auto_url" in st.query_params:
-                        del st.query_params["auto_url"]
-        except:
-            pass  # 실패해도 계속 진행
+        if not st.session_state.get('scrape_job_id'):
+            submit_scrape_job(auto_url)
+        del st.query_params["auto_url"]
     
     # 방 ID가 URL에 있는 경우 해당 방 데이터 로드
     if current_room_id:
@@ -1197,12 +1270,16 @@ def initialize_session_state():
             st.session_state.url_processed = True
             st.session_state.restaurant_info = room_data.get('restaurant_info')
             st.session_state.orders = room_data.get('orders', [])
+            st.session_state.room_summary = room_data.get('summary')
+            st.session_state.room_version = room_data.get('version')
+            st.session_state.room_closed = bool(room_data.get('closed_at'))
             st.session_state.current_room_id = current_room_id
         else:
             # 방 ID가 있지만 데이터가 없는 경우
             st.session_state.url_processed = False
             st.session_state.restaurant_info = None
             st.session_state.orders = []
+            st.session_state.room_summary = None
     else:
         # 방 ID가 없는 경우 (새로운 방 생성)
         if 'url_processed' not in st.session_state:
@@ -1211,13 +1288,105 @@ def initialize_session_state():
             st.session_state.restaurant_info = None
         if 'orders' not in st.session_state:
             st.session_state.orders = []
+            st.session_state.room_summary = None
     
     if 'error_message' not in st.session_state:
         st.session_state.error_message = None
 
+def create_room(restaurant_data):
+    """가게 정보로 새 주문방을 만들고 현재 세션을 그 방으로 전환합니다."""
+    room_id = generate_room_id()
+    st.session_state.current_room_id = room_id
+    st.session_state.restaurant_info = restaurant_data
+    st.session_state.url_processed = True
+    st.session_state.orders = []
+    st.session_state.room_summary = None
+    st.session_state.error_message = None
+    
+    # 방 데이터 저장
+    sync_room_data()
+    
+    # URL 업데이트
+    st.query_params["room_id"] = room_id
+    return room_id
+
+def load_scraper():
+    """
+    스크래핑 모듈(smio_scraper)을 처음 필요할 때 불러옵니다.
+    Selenium/requests/BeautifulSoup은 주문방을 만들 때만 쓰이므로, 주문방을 보기만 하는 프로세스는 불러오지 않습니다.
+    """
+    import smio_scraper
+    return smio_scraper
+
+def submit_scrape_job(url_input):
+    """스크래핑 작업을 큐에 넣고 작업 ID를 세션에 기록합니다. 대기열이 가득 차면 False를 반환합니다."""
+    job_id = load_scraper().get_scrape_queue().submit(url_input)
+    if not job_id:
+        st.session_state.error_message = "지금 주문방을 만드는 사람이 많습니다. 잠시 후 다시 시도해주세요."
+        return False
+    st.session_state.scrape_job_id = job_id
+    st.session_state.error_message = None
+    st.session_state.show_url_help = False
+    return True
+
+def apply_finished_scrape_job():
+    """끝난 스크래핑 작업이 있으면 결과로 주문방을 만들거나 오류 메시지를 세션에 남깁니다."""
+    job_id = st.session_state.get('scrape_job_id')
+    if not job_id:
+        return
+    
+    job = load_scraper().get_scrape_queue().get(job_id)
+    if job and job["status"] in ("queued", "running"):
+        return
+    
+    st.session_state.scrape_job_id = None
+    restaurant_data = job["result"] if job else None
+    if not job:
+        st.session_state.error_message = "작업 정보를 찾을 수 없습니다. 다시 시도해주세요."
+    elif job["status"] == "failed":
+        print(f"예상치 못한 오류: {job['error']}")
+        st.session_state.error_message = "일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+    elif restaurant_data is None:
+        st.session_state.error_message = "입력하신 내용에서 네이버 플레이스 URL을 찾을 수 없습니다."
+        st.session_state.show_url_help = True
+    elif "error" in restaurant_data:
+        st.session_state.error_message = restaurant_data['error']
+    elif restaurant_data.get("menu"):
+        room_id = create_room(restaurant_data)
+        st.toast("✅ 주문방이 성공적으로 생성되었습니다!")
+        if restaurant_data.get("partial") and restaurant_data.get("place_id"):
+            # 시간 예산을 넘긴 부분 결과 - 바로 다시 스크래핑해서, 주문이 들어오기 전이면 방의 메뉴를 교체
+            room = load_room_data(room_id)
+            if room:
+                partial_ref = (room["place_id"], room["restaurant_version"])
+                load_scraper().complete_partial_entry(
+                    restaurant_data["place_id"],
+                    lambda restaurant_info: upgrade_partial_room(room_id, partial_ref, restaurant_info)
+                )
+    else:
+        st.session_state.error_message = "메뉴 정보를 가져오는 데 실패했습니다. URL을 확인하시거나 다른 가게를 시도해주세요."
+
+@st.fragment(run_every=1)
+def show_scrape_progress(job_id):
+    """스크래핑 작업의 단계별 진행 상황을 1초마다 갱신해서 보여줍니다."""
+    job = load_scraper().get_scrape_queue().get(job_id)
+    if not job or job["status"] not in ("queued", "running"):
+        st.rerun()  # 전체 페이지를 다시 실행해 결과를 반영
+        return
+    
+    scraper = load_scraper()
+    index = scraper.SCRAPE_PHASE_INDEX.get(job["phase"], 0)
+    elapsed = time.time() - job["created_at"]
+    label = scraper.SCRAPE_PHASES[index][1]
+    if job["status"] == "queued" and job["position"]:
+        label = f"⏳ 앞에 {job['position']}개의 주문방이 만들어지는 중입니다..."
+    st.progress((index + 1) / (len(scraper.SCRAPE_PHASES) + 1), text=f"{label} ({elapsed:.0f}초)")
+
 def sync_room_data():
-    """현재 세션 데이터를 방 파일에 동기화합니다."""
+    """현재 세션의 방이 DB에 있도록 보장합니다. 주문은 건드리지 않고, 새 방일 때만 세션의 주문 목록으로 만듭니다."""
     if st.session_state.get('current_room_id') and st.session_state.get('url_processed'):
+        if load_room_data(st.session_state.current_room_id):
+            return  # 이미 있는 방 (버전 조회 한 번으로 확인)
         room_data = {
             'restaurant_info': st.session_state.restaurant_info,
             'orders': st.session_state.orders,
@@ -1225,11 +1394,391 @@ def sync_room_data():
         }
         save_room_data(st.session_state.current_room_id, room_data)
 
+ROOM_POLL_INTERVAL = get_env_int("SMIO_ROOM_POLL_INTERVAL", 2)  # 주문방 화면이 방 version을 확인하는 주기(초)
+
+def refresh_room_orders():
+    """방 version이 바뀌었을 때만 세션의 주문 목록을 최신으로 바꿉니다. 바뀌지 않았으면 version 조회 한 번으로 끝납니다."""
+    room_id = st.session_state.get('current_room_id')
+    if not room_id:
+        return
+    room_data = load_room_data(room_id)
+    if room_data and room_data.get('version') != st.session_state.get('room_version'):
+        st.session_state.orders = room_data.get('orders', [])
+        st.session_state.room_summary = room_data.get('summary')
+        st.session_state.room_version = room_data.get('version')
+        if bool(room_data.get('closed_at')) != st.session_state.get('room_closed', False):
+            st.session_state.room_closed = bool(room_data.get('closed_at'))
+            st.rerun()  # 마감 여부가 바뀌면 주문 입력 폼까지 다시 그림
+
+def get_session_room_summary():
+    """세션에 있는 방 집계를 반환합니다. 방 데이터와 함께 받아 둔 집계가 없을 때만 주문 목록으로 새로 만듭니다."""
+    summary = st.session_state.get('room_summary')
+    if summary is None:
+        summary = build_room_summary(st.session_state.orders)
+        st.session_state.room_summary = summary
+    return summary
+
+@st.fragment(run_every=ROOM_POLL_INTERVAL)
+def watch_room_version():
+    """
+    방 version 한 칸만 주기적으로 확인하는 감시용 fragment. 아무것도 그리지 않으므로 방이 조용할 때는
+    뷰어마다 주기당 기본 키 조회 한 번만 듭니다. version이 바뀌었을 때만 페이지 전체를 다시 실행합니다.
+    """
+    room_id = st.session_state.get('current_room_id')
+    if not room_id:
+        return
+    with room_db() as conn:
+        version = get_room_version(conn, room_id)
+    if version != st.session_state.get('room_version'):
+        st.rerun()
+
+@st.fragment
+def show_order_status():
+    """실시간 주문 현황. 주문 수정/삭제 위젯을 조작할 때는 이 부분만 다시 실행됩니다."""
+    st.markdown("""
+    <div class="status-card">
+        <h3 style="margin-bottom: 1rem; font-size: 1.2rem;">📊 실시간 주문 현황</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if not st.session_state.orders:
+        st.markdown("""
+        <div style="text-align: center; padding: 1.5rem; background: white; border-radius: 8px; margin: 0.75rem 0; border: 1px solid #e2e8f0;">
+            <div style="font-size: 3rem; margin-bottom: 0.75rem;">🛒</div>
+            <h4 style="color: #64748b; font-size: 1rem;">아직 주문이 없습니다</h4>
+            <p style="color: #94a3b8; font-size: 0.9rem;">왼쪽에서 메뉴를 담아주세요!</p>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        total_price = get_session_room_summary()["total"]
+        
+        # 총액 표시
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{total_price:,.0f}원</div>
+            <div class="metric-label">현재 총 주문 금액</div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # 주문 목록
+        st.markdown("**📋 주문 목록**")
+        for i, order in enumerate(st.session_state.orders):
+            details = format_order_details(order)
+            details_text = f"<br><small style='color: #94a3b8;'>{' / '.join(details)}</small>" if details else ""
+            
+            st.markdown(f"""
+            <div class="order-item">
+                <div class="order-name">{order['name']}</div>
+                <div class="order-details">{order['menu']} × {order['quantity']}개 | {order['price']:,}원{details_text}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # 다른 사람이 먼저 바꾼 주문을 수정/삭제하려다 막힌 경우, 다시 그린 최신 현황과 함께 안내
+        edit_conflict = st.session_state.pop('order_edit_conflict', None)
+        if edit_conflict:
+            st.warning(edit_conflict)
+        
+        # 주문 관리
+        with st.expander("🔧 주문 수정/삭제"):
+            if st.session_state.get('room_closed'):
+                st.caption("🔒 마감된 방은 주문을 바꿀 수 없습니다.")
+            elif st.session_state.orders:
+                # 목록 위치가 아닌 order_id로 고르므로, 그 사이 다른 주문이 추가/삭제되어도 엉뚱한 주문을 건드리지 않음
+                orders_by_id = {order['order_id']: order for order in st.session_state.orders}
+                order_ids = list(orders_by_id)
+                # 버튼을 누른 실행은 방을 새로 읽은 뒤라서, 사용자가 실제로 본 주문은 직전 실행에서 그린 값
+                seen_orders = st.session_state.get('order_edit_seen') or {}
+                st.session_state.order_edit_seen = orders_by_id
+                
+                def format_order_for_edit(order_id):
+                    order = orders_by_id.get(order_id)
+                    if not order:
+                        return "(삭제된 주문)"
+                    return f"{order_ids.index(order_id)+1}. {order['name']} - {order['menu']} ({order['quantity']}개)"
+                
+                selected_order_id = st.selectbox(
+                    "수정/삭제할 주문을 선택하세요", 
+                    options=order_ids,
+                    format_func=format_order_for_edit,
+                    index=None,
+                    placeholder="주문 선택"
+                )
+                selected_order = orders_by_id.get(selected_order_id)
+                
+                new_quantity = st.number_input(
+                    "📊 변경할 수량",
+                    min_value=1,
+                    value=selected_order['quantity'] if selected_order else 1,
+                    disabled=selected_order is None
+                )
+                
+                edit_col, delete_col = st.columns(2)
+                with edit_col:
+                    edit_clicked = st.button("✏️ 수량 변경", use_container_width=True)
+                with delete_col:
+                    delete_clicked = st.button("🗑️ 선택한 주문 삭제", use_container_width=True)
+                
+                if edit_clicked or delete_clicked:
+                    if selected_order is None:
+                        st.warning("⚠️ 주문을 먼저 선택해주세요.")
+                    else:
+                        room_id = st.session_state.current_room_id
+                        expected_version = st.session_state.get('room_version')
+                        seen_order = seen_orders.get(selected_order_id, selected_order)
+                        if delete_clicked:
+                            # 해당 주문 한 건만 DB에서 삭제 (화면에서 본 주문 내용과 같을 때만)
+                            done = delete_room_order(room_id, selected_order_id, expected_version, expected=seen_order)
+                            message = f"✅ {seen_order['name']}님의 주문이 삭제되었습니다!"
+                        else:
+                            unit_price = seen_order['price'] // seen_order['quantity'] if seen_order['quantity'] else 0
+                            done = update_room_order(
+                                room_id, selected_order_id,
+                                {"quantity": new_quantity, "price": unit_price * new_quantity},
+                                expected_version,
+                                expected=seen_order
+                            )
+                            message = f"✅ {seen_order['name']}님의 주문 수량이 {new_quantity}개로 변경되었습니다!"
+                        refresh_room_orders()
+                        if done:
+                            st.success(message)
+                            time.sleep(1)
+                        else:
+                            current = next((order for order in st.session_state.orders if order['order_id'] == selected_order_id), None)
+                            if current is None:
+                                conflict = f"⚠️ {seen_order['name']}님의 주문은 그 사이 삭제되었습니다."
+                            else:
+                                conflict = (
+                                    f"⚠️ 그 사이 다른 사람이 {current['name']}님의 주문을 바꿨습니다 "
+                                    f"(현재: {current['menu']} × {current['quantity']}개, {current['price']:,}원). 확인 후 다시 시도해주세요."
+                                )
+                            st.session_state.order_edit_conflict = conflict
+                        st.rerun()
+
+def escape_table_cell(text):
+    """마크다운 표 칸에 넣을 문자열에서 표를 깨뜨리는 문자(|, 줄바꿈)를 바꿉니다."""
+    return str(text).replace("|", "\\|").replace("\n", " ")
+
+def format_order_details(order):
+    """주문의 음료 옵션과 요청사항을 화면/주문서에 붙일 문구 목록으로 만듭니다."""
+    details = []
+    if order.get('beverage_option'):
+        details.append(order['beverage_option'])
+    if order.get('special_request'):
+        details.append(f"요청: {order['special_request']}")
+    return details
+
+FINAL_SHEET_CACHE_SIZE = 256  # 최종 주문서를 기억해 둘 방 수
+FINAL_SHEET_CSV_COLUMNS = ["주문자", "메뉴", "수량", "금액", "옵션", "요청사항"]
+
+def render_menu_row(menu_name, menu):
+    """메뉴별 합계 표의 한 줄."""
+    return f"| {escape_table_cell(menu_name)} | {menu['quantity']} | {escape_table_cell(', '.join(menu['orderers']))} |"
+
+def render_person_block(name, person):
+    """개인별 상세 내역에서 한 사람 몫의 HTML (이름/총액과 주문 목록)."""
+    lines = [
+        f'<div class="order-item"><div class="order-name">{name}</div>'
+        f'<div class="order-details">총 주문 금액: {person["total"]:,}원</div></div>'
+    ]
+    for order in person["orders"]:
+        details = format_order_details(order)
+        details_text = f"<br><small style='color: #94a3b8;'>{' / '.join(details)}</small>" if details else ""
+        lines.append(
+            '<div style="margin-left: 1rem; color: #64748b; margin-bottom: 0.5rem; padding: 0.5rem; background: #f8fafc; border-radius: 4px; font-size: 0.9rem;">'
+            f"• {order['menu']}: {order['quantity']}개 ({order['price']:,}원){details_text}</div>"
+        )
+    return "\n".join(lines)
+
+def format_order_sheet_text(summary, restaurant_name):
+    """가게에 전화하거나 메신저로 보낼 때 그대로 붙여넣을 수 있는 텍스트 주문서."""
+    lines = [f"[{restaurant_name}] 단체 주문" if restaurant_name else "단체 주문", ""]
+    for menu_name in sorted(summary["menus"]):
+        lines.append(f"- {menu_name} {summary['menus'][menu_name]['quantity']}개")
+    
+    requests_lines = []
+    for name in sorted(summary["people"]):
+        for order in summary["people"][name]["orders"]:
+            details = [value for value in (order.get('beverage_option'), order.get('special_request')) if value]
+            if details:
+                requests_lines.append(f"- {order['menu']} {order['quantity']}개: {' / '.join(details)}")
+    if requests_lines:
+        lines += ["", "요청사항"] + requests_lines
+    
+    total_quantity = sum(menu["quantity"] for menu in summary["menus"].values())
+    lines += ["", f"총 {total_quantity}개 / {summary['total']:,}원"]
+    return "\n".join(lines)
+
+def format_order_sheet_csv(summary):
+    """주문 한 건이 한 줄인 CSV (엑셀에서 바로 열리도록 BOM 포함)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FINAL_SHEET_CSV_COLUMNS)
+    total_quantity = 0
+    for name in sorted(summary["people"]):
+        for order in summary["people"][name]["orders"]:
+            writer.writerow([
+                name, order["menu"], order["quantity"], order["price"],
+                order.get("beverage_option") or "", order.get("special_request") or ""
+            ])
+            total_quantity += order["quantity"]
+    writer.writerow(["합계", "", total_quantity, summary["total"], "", ""])
+    return buffer.getvalue().encode("utf-8-sig")
+
+def render_final_order_sheet(summary, restaurant_name, previous=None):
+    """
+    방 집계로 최종 주문서(화면용 표/HTML, 텍스트, CSV)를 만듭니다.
+    previous가 있으면 그때와 같은 집계 항목(주문이 바뀌지 않은 메뉴/사람)의 결과는 다시 만들지 않고 그대로 씁니다.
+    """
+    previous_menus = previous["menu_rows"] if previous else {}
+    previous_people = previous["people_blocks"] if previous else {}
+    
+    menu_rows = {}
+    for menu_name in sorted(summary["menus"]):
+        menu = summary["menus"][menu_name]
+        cached = previous_menus.get(menu_name)
+        menu_rows[menu_name] = cached if cached and cached[0] is menu else (menu, render_menu_row(menu_name, menu))
+    
+    people_blocks = {}
+    for name in sorted(summary["people"]):
+        person = summary["people"][name]
+        cached = previous_people.get(name)
+        people_blocks[name] = cached if cached and cached[0] is person else (person, render_person_block(name, person))
+    
+    return {
+        "summary": summary,
+        "restaurant_name": restaurant_name,
+        "menu_rows": menu_rows,
+        "people_blocks": people_blocks,
+        "menu_table": "\n".join(["| 메뉴 | 총 수량 | 주문자 |", "|---|---:|---|"] + [row for _, row in menu_rows.values()]),
+        "people_html": "\n".join(block for _, block in people_blocks.values()),
+        "text": format_order_sheet_text(summary, restaurant_name),
+        "csv": format_order_sheet_csv(summary),
+    }
+
+class FinalSheetCache:
+    """
+    프로세스 전체가 함께 쓰는 최종 주문서 캐시. 방마다 마지막으로 만든 주문서를 그 집계 객체와 함께 기억합니다.
+    방 집계는 version이 바뀔 때만 새 객체가 되므로, 같은 객체면 주문서를 그대로 돌려주고
+    바뀌었으면 바뀐 메뉴/사람 몫만 다시 만듭니다. 오래 안 본 방부터 잊습니다.
+    """
+
+    def __init__(self, max_rooms=FINAL_SHEET_CACHE_SIZE):
+        self.lock = threading.Lock()
+        self.sheets = collections.OrderedDict()
+        self.max_rooms = max_rooms
+
+    def get(self, room_id, summary, restaurant_name):
+        with self.lock:
+            previous = self.sheets.get(room_id)
+            if previous:
+                self.sheets.move_to_end(room_id)
+        if previous and previous["summary"] is summary and previous["restaurant_name"] == restaurant_name:
+            return previous
+        
+        sheet = render_final_order_sheet(summary, restaurant_name, previous)
+        with self.lock:
+            self.sheets[room_id] = sheet
+            self.sheets.move_to_end(room_id)
+            while len(self.sheets) > self.max_rooms:
+                self.sheets.popitem(last=False)
+        return sheet
+
+@st.cache_resource
+def get_final_sheet_cache():
+    """프로세스 전체에서 공유하는 최종 주문서 캐시를 반환합니다."""
+    return FinalSheetCache()
+
+@st.fragment
+def show_final_order_sheet():
+    """최종 주문서. 방 version이 바뀌어 페이지가 다시 실행될 때만 새로 그립니다."""
+    if st.session_state.orders:
+        with st.expander("📋 최종 주문서 보기 (주문 총무용)", expanded=False):
+            # 방 version마다 한 번 만들어 둔 주문서를 그대로 씀 (주문이 바뀌면 바뀐 사람/메뉴 몫만 다시 만듦)
+            restaurant_name = (st.session_state.restaurant_info or {}).get("name", "")
+            sheet = get_final_sheet_cache().get(st.session_state.current_room_id, get_session_room_summary(), restaurant_name)
+            
+            st.markdown("""
+            <div class="final-order">
+                <h3>✅ 최종 주문서</h3>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # 메뉴별 요약
+            st.markdown("### 🧮 메뉴별 주문 합계")
+            st.markdown(sheet["menu_table"])
+            
+            # 개인별 상세 내역
+            st.markdown("### 🧑‍💻 개인별 상세 내역")
+            st.markdown(sheet["people_html"], unsafe_allow_html=True)
+            
+            # 최종 합계
+            grand_total = sheet["summary"]["total"]
+            st.markdown(f"""
+            <div class="final-order" style="text-align: center; margin-top: 1.5rem; background: linear-gradient(135deg, #059669 0%, #047857 100%);">
+                <h2 style="margin: 0; color: white; font-size: 1.5rem;">💰 총 합계: {grand_total:,}원</h2>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # 가게에 전달할 텍스트 주문서 (오른쪽 위 복사 버튼) 및 내려받기
+            st.markdown("### 📞 가게에 전달할 주문 내용")
+            st.code(sheet["text"], language=None)
+            room_id = st.session_state.current_room_id
+            text_col, csv_col = st.columns(2)
+            with text_col:
+                st.download_button(
+                    "📄 텍스트로 받기", data=sheet["text"], file_name=f"smio_{room_id}_주문서.txt",
+                    mime="text/plain", use_container_width=True, key="download_sheet_text"
+                )
+            with csv_col:
+                st.download_button(
+                    "📊 CSV로 받기", data=sheet["csv"], file_name=f"smio_{room_id}_주문서.csv",
+                    mime="text/csv", use_container_width=True, key="download_sheet_csv"
+                )
+            
+            # 주문 마감 - 마감 후에는 주문을 바꿀 수 없고, 유예 시간이 지나면 방이 보관 처리됨
+            # 누구나 누를 수 있으므로 한 번 더 확인받고, 보관 전까지는 다시 열 수 있게 함
+            if not st.session_state.get('room_closed'):
+                if not st.session_state.get('confirm_close_room'):
+                    st.button(
+                        "🔒 주문 마감하기", use_container_width=True, key="close_room",
+                        on_click=lambda: st.session_state.update(confirm_close_room=True)
+                    )
+                else:
+                    st.warning(
+                        f"⚠️ 마감하면 모두 주문을 추가/수정/삭제할 수 없습니다. "
+                        f"{ROOM_CLOSED_GRACE // 60}분 안에는 다시 열 수 있고, 그 뒤에는 방이 보관 처리됩니다."
+                    )
+                    confirm_col, cancel_col = st.columns(2)
+                    with confirm_col:
+                        confirm_clicked = st.button("🔒 마감 확정", use_container_width=True, key="confirm_close_room_button")
+                    with cancel_col:
+                        st.button(
+                            "취소", use_container_width=True, key="cancel_close_room",
+                            on_click=lambda: st.session_state.update(confirm_close_room=False)
+                        )
+                    if confirm_clicked:
+                        st.session_state.confirm_close_room = False
+                        if close_room(st.session_state.current_room_id):
+                            st.session_state.room_closed = True
+                        st.rerun()
+            else:
+                st.caption(f"🔒 마감된 방입니다. 마감 후 {ROOM_CLOSED_GRACE // 60}분이 지나면 보관 처리됩니다.")
+                if st.button("🔓 다시 주문 받기", use_container_width=True, key="reopen_room"):
+                    if reopen_room(st.session_state.current_room_id):
+                        st.session_state.room_closed = False
+                    st.rerun()
+
 # 세션 상태 초기화 실행
+start_room_sweeper()
+convert_legacy_order_logs()
 initialize_session_state()
+apply_finished_scrape_job()
 
 # --- 페이지 1: 랜딩 페이지 (URL 입력 전) ---
 if not st.session_state.url_processed:
+    # 주문방을 만드는 화면에서만 스크래핑 모듈을 불러오고 즐겨찾기 미리 준비를 시작
+    scraper = load_scraper()
+    scraper.start_favorites_warmer()
     
     # 메인 헤더 (관리자 아이콘 포함)
     header_col1, header_col2 = st.columns([10, 1])
@@ -1415,42 +1964,18 @@ if not st.session_state.url_processed:
         if st.button("🚀 주문방 만들기", type="primary", use_container_width=True):
             if not url_input:
                 st.warning("⚠️ URL을 입력해주세요.")
+            elif st.session_state.get('scrape_job_id'):
+                st.warning("⚠️ 이미 가게 정보를 불러오는 중입니다. 잠시만 기다려주세요.")
             else:
-                with st.spinner("🔍 가게 정보를 불러오는 중입니다... (최대 1분 소요)"):
-                    try:
-                        normalized_url = normalize_naver_place_url(url_input)
-                        if not normalized_url:
-                            st.error("❌ 입력하신 내용에서 네이버 플레이스 URL을 찾을 수 없습니다.")
-                            st.info("💡 **사용 가능한 URL 형식:**\n- naver.me 단축링크\n- map.naver.com 일반 링크\n- m.place.naver.com 모바일 링크\n\n텍스트 중에 URL이 포함되어 있으면 자동으로 찾아줍니다!")
-                        else:
-                            restaurant_data = scrape_restaurant_info(normalized_url)
-                            
-                            if restaurant_data and "error" in restaurant_data:
-                                st.error(f"❌ {restaurant_data['error']}")
-                            elif restaurant_data and restaurant_data.get("menu"):
-                                # 방 ID 생성 및 데이터 저장
-                                room_id = generate_room_id()
-                                st.session_state.current_room_id = room_id
-                                st.session_state.restaurant_info = restaurant_data
-                                st.session_state.url_processed = True
-                                st.session_state.orders = []
-                                st.session_state.error_message = None
-                                
-                                # 방 데이터 저장
-                                sync_room_data()
-                                
-                                st.success("✅ 주문방이 성공적으로 생성되었습니다!")
-                                
-                                # URL 업데이트
-                                st.query_params["room_id"] = room_id
-                                time.sleep(1)
-                                st.rerun()
-                            else:
-                                st.error("❌ 메뉴 정보를 가져오는 데 실패했습니다. URL을 확인하시거나 다른 가게를 시도해주세요.")
-                                
-                    except Exception as e:
-                        print(f"예상치 못한 오류: {e}")
-                        st.error("❌ 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
+                # 스크래핑은 백그라운드 작업으로 넘기고 진행 상황만 표시
+                submit_scrape_job(url_input)
+        
+        if st.session_state.get('scrape_job_id'):
+            show_scrape_progress(st.session_state.scrape_job_id)
+        elif st.session_state.get('error_message'):
+            st.error(f"❌ {st.session_state.error_message}")
+            if st.session_state.get('show_url_help'):
+                st.info("💡 **사용 가능한 URL 형식:**\n- naver.me 단축링크\n- map.naver.com 일반 링크\n- m.place.naver.com 모바일 링크\n\n텍스트 중에 URL이 포함되어 있으면 자동으로 찾아줍니다!")
     
     # 즐겨찾기 섹션
     st.markdown("""
@@ -1460,30 +1985,21 @@ if not st.session_state.url_processed:
     </div>
     """, unsafe_allow_html=True)
     
-    # 즐겨찾기 버튼들을 2열로 배치
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("☕ 매머드커피", use_container_width=True, type="secondary"):
-            st.session_state.url_input_value = "https://naver.me/FjbWj0iM"
-            st.query_params["auto_url"] = "https://naver.me/FjbWj0iM"
-            st.rerun()
-        
-        if st.button("🍲 다락골 소머리국밥", use_container_width=True, type="secondary"):
-            st.session_state.url_input_value = "https://naver.me/5qDj8gcj"
-            st.query_params["auto_url"] = "https://naver.me/5qDj8gcj"
-            st.rerun()
+    # 즐겨찾기 버튼들을 2열로 배치 (목록은 favorites.json에서 관리)
+    favorite_columns = st.columns(2)
     
-    with col2:
-        if st.button("🥘 중화요리 삼국지", use_container_width=True, type="secondary"):
-            st.session_state.url_input_value = "https://naver.me/GFByqJEd"
-            st.query_params["auto_url"] = "https://naver.me/GFByqJEd"
-            st.rerun()
-        
-        if st.button("🍜 선비 칼국수", use_container_width=True, type="secondary"):
-            st.session_state.url_input_value = "https://naver.me/GDamQwXw"
-            st.query_params["auto_url"] = "https://naver.me/GDamQwXw"
-            st.rerun()
+    for i, favorite in enumerate(scraper.load_favorites()):
+        with favorite_columns[i % 2]:
+            if st.button(favorite["label"], key=f"favorite_{i}", use_container_width=True, type="secondary"):
+                restaurant_data = scraper.get_warm_favorite_info(favorite)
+                if restaurant_data:
+                    # 미리 준비된 카탈로그로 바로 주문방 생성
+                    create_room(restaurant_data)
+                else:
+                    # 아직 준비되지 않았으면 일반 경로(백그라운드 스크래핑)로 처리
+                    st.session_state.url_input_value = favorite["url"]
+                    st.query_params["auto_url"] = favorite["url"]
+                st.rerun()
 
 # --- 페이지 2: 주문 및 현황 페이지 (URL 입력 후) ---
 if st.session_state.url_processed:
@@ -1496,26 +2012,10 @@ if st.session_state.url_processed:
             st.session_state.url_processed = False
             st.session_state.restaurant_info = None
             st.session_state.orders = []
+            st.session_state.room_summary = None
             st.rerun()
         st.stop()
     
-    # 실시간 업데이트를 위한 자동 새로고침
-    if st.session_state.get('current_room_id'):
-        # 방 데이터 다시 로드하여 실시간 업데이트
-        room_data = load_room_data(st.session_state.current_room_id)
-        if room_data:
-            st.session_state.orders = room_data.get('orders', [])
-        
-        # 10초마다 자동 새로고침
-        time.sleep(0.1)  # 너무 빠른 새로고침 방지
-        st.markdown("""
-        <script>
-        setTimeout(function() {
-            window.parent.location.reload();
-        }, 10000);
-        </script>
-        """, unsafe_allow_html=True)
-    
     # 방 공유 링크 표시
     if st.session_state.get('current_room_id'):
         current_url = create_room_url(st.session_state.current_room_id)
@@ -1635,7 +2135,7 @@ if st.session_state.url_processed:
         <div style="background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%); padding: 0.5rem 1rem 1rem 1rem; border-radius: 0 0 8px 8px; margin-top: 0; text-align: center;">
             <div style="color: rgba(255,255,255,0.9); font-size: 0.85rem; line-height: 1.4;">
                 📋 <strong>복사 방법:</strong> '📋 복사' 버튼 클릭 또는 URL 박스 클릭 → Ctrl+A → Ctrl+C<br>
-                💫 실시간 업데이트: 10초마다 자동으로 새로고침됩니다<br>
+                💫 실시간 업데이트: 주문 현황이 자동으로 갱신됩니다<br>
                 👥 이 링크를 공유하면 다른 사람들이 같은 주문방에 접속할 수 있습니다
             </div>
         </div>
@@ -1683,7 +2183,11 @@ if st.session_state.url_processed:
         
         if not info.get("menu"):
             st.warning("⚠️ 메뉴 정보를 불러올 수 없습니다. 다른 식당을 시도해보세요.")
+        elif st.session_state.get('room_closed'):
+            st.info("🔒 주문이 마감된 방입니다. 최종 주문서에서 주문 내역을 확인하거나 다시 주문을 받을 수 있습니다.")
         else:
+            if info.get("partial") and not st.session_state.orders:
+                st.caption("⏳ 메뉴를 일부만 불러왔습니다. 첫 주문이 들어오기 전에 나머지를 불러오면 전체 메뉴로 바뀝니다.")
             with st.form("order_form", clear_on_submit=True):
                 menu_names = []
                 for item in info["menu"]:
@@ -1716,7 +2220,7 @@ if st.session_state.url_processed:
                     
                     beverage_options = None
                     special_request = None
-                    if is_beverage(selected_menu_name):
+                    if menu_item_is_beverage(selected_menu_info, info.get("place_id")):
                         beverage_options = st.selectbox(
                             "🧊 음료 옵션", 
                             ["(선택)", "Hot", "Ice"], 
@@ -1749,10 +2253,12 @@ if st.session_state.url_processed:
                                 "beverage_option": beverage_options if beverage_options and beverage_options != "(선택)" else None,
                                 "special_request": special_request.strip() if special_request else None
                             }
-                            st.session_state.orders.append(order_info)
-                            
-                            # 방 데이터 동기화
-                            sync_room_data()
+                            # 주문 한 건만 DB에 추가하고 최신 주문 목록을 다시 읽음
+                            order_id = add_room_order(st.session_state.current_room_id, order_info, st.session_state.get('room_version'))
+                            refresh_room_orders()
+                            if order_id is None:
+                                st.error("❌ 주문을 추가하지 못했습니다. 마감된 방인지 확인하고 다시 시도해주세요.")
+                                st.stop()
                             
                             # 주문 로그 저장
                             if st.session_state.get('current_room_id') and st.session_state.get('restaurant_info'):
@@ -1767,138 +2273,11 @@ if st.session_state.url_processed:
                             st.rerun()
     
     with col2:
-        st.markdown("""
-        <div class="status-card">
-            <h3 style="margin-bottom: 1rem; font-size: 1.2rem;">📊 실시간 주문 현황</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if not st.session_state.orders:
-            st.markdown("""
-            <div style="text-align: center; padding: 1.5rem; background: white; border-radius: 8px; margin: 0.75rem 0; border: 1px solid #e2e8f0;">
-                <div style="font-size: 3rem; margin-bottom: 0.75rem;">🛒</div>
-                <h4 style="color: #64748b; font-size: 1rem;">아직 주문이 없습니다</h4>
-                <p style="color: #94a3b8; font-size: 0.9rem;">왼쪽에서 메뉴를 담아주세요!</p>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            orders_df = pd.DataFrame(st.session_state.orders)
-            total_price = orders_df['price'].sum()
-            
-            # 총액 표시
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-value">{total_price:,.0f}원</div>
-                <div class="metric-label">현재 총 주문 금액</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # 주문 목록
-            st.markdown("**📋 주문 목록**")
-            for i, order in enumerate(st.session_state.orders):
-                details = []
-                if order.get('beverage_option'):
-                    details.append(order['beverage_option'])
-                if order.get('special_request'):
-                    details.append(f"요청: {order['special_request']}")
-                
-                details_text = f"<br><small style='color: #94a3b8;'>{' / '.join(details)}</small>" if details else ""
-                
-                st.markdown(f"""
-                <div class="order-item">
-                    <div class="order-name">{order['name']}</div>
-                    <div class="order-details">{order['menu']} × {order['quantity']}개 | {order['price']:,}원{details_text}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # 주문 관리
-            with st.expander("🔧 주문 수정/삭제"):
-                if st.session_state.orders:
-                    def format_order_for_deletion(i):
-                        order = st.session_state.orders[i]
-                        return f"{i+1}. {order['name']} - {order['menu']} ({order['quantity']}개)"
-                    
-                    order_to_delete_index = st.selectbox(
-                        "삭제할 주문을 선택하세요", 
-                        options=range(len(st.session_state.orders)),
-                        format_func=format_order_for_deletion,
-                        index=None,
-                        placeholder="삭제할 주문 선택"
-                    )
-                    
-                    if st.button("🗑️ 선택한 주문 삭제", use_container_width=True):
-                        if order_to_delete_index is not None:
-                            deleted_order = st.session_state.orders.pop(order_to_delete_index)
-                            
-                            # 방 데이터 동기화
-                            sync_room_data()
-                            
-                            st.success(f"✅ {deleted_order['name']}님의 주문이 삭제되었습니다!")
-                            time.sleep(1)
-                            st.rerun()
-                        else:
-                            st.warning("⚠️ 삭제할 주문을 먼저 선택해주세요.")
+        watch_room_version()
+        show_order_status()
     
     # 최종 주문서
-    if st.session_state.orders:
-        with st.expander("📋 최종 주문서 보기 (주문 총무용)", expanded=False):
-            orders_df = pd.DataFrame(st.session_state.orders)
-            
-            st.markdown("""
-            <div class="final-order">
-                <h3>✅ 최종 주문서</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # 메뉴별 요약
-            st.markdown("### 🧮 메뉴별 주문 합계")
-            menu_summary = orders_df.groupby("menu").agg(
-                총_수량=('quantity', 'sum'),
-                주문자=('name', lambda x: ', '.join(x.unique()))
-            ).reset_index()
-            
-            st.dataframe(
-                menu_summary, 
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            # 개인별 상세 내역
-            st.markdown("### 🧑‍💻 개인별 상세 내역")
-            person_summary = orders_df.groupby("name").agg(총액=('price', 'sum')).reset_index()
-            
-            for _, row in person_summary.iterrows():
-                with st.container():
-                    st.markdown(f"""
-                    <div class="order-item">
-                        <div class="order-name">{row['name']}</div>
-                        <div class="order-details">총 주문 금액: {row['총액']:,}원</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    person_orders = orders_df[orders_df['name'] == row['name']]
-                    for _, p_order in person_orders.iterrows():
-                        details = []
-                        if 'beverage_option' in p_order and pd.notna(p_order['beverage_option']):
-                            details.append(p_order['beverage_option'])
-                        if 'special_request' in p_order and pd.notna(p_order['special_request']):
-                            details.append(f"요청: {p_order['special_request']}")
-                        
-                        details_text = f"<br><small style='color: #94a3b8;'>{' / '.join(details)}</small>" if details else ""
-                        
-                        st.markdown(f"""
-                        <div style="margin-left: 1rem; color: #64748b; margin-bottom: 0.5rem; padding: 0.5rem; background: #f8fafc; border-radius: 4px; font-size: 0.9rem;">
-                            • {p_order['menu']}: {p_order['quantity']}개 ({p_order['price']:,}원){details_text}
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # 최종 합계
-            grand_total = orders_df['price'].sum()
-            st.markdown(f"""
-            <div class="final-order" style="text-align: center; margin-top: 1.5rem; background: linear-gradient(135deg, #059669 0%, #047857 100%);">
-                <h2 style="margin: 0; color: white; font-size: 1.5rem;">💰 총 합계: {grand_total:,}원</h2>
-            </div>
-            """, unsafe_allow_html=True)
+    show_final_order_sheet()
     
     # 새로운 주문방 만들기
     st.markdown("<br>", unsafe_allow_html=True)
@@ -1906,6 +2285,7 @@ if st.session_state.url_processed:
         st.session_state.url_processed = False
         st.session_state.restaurant_info = None
         st.session_state.orders = []
+        st.session_state.room_summary = None
         st.session_state.current_room_id = None
         
         # URL에서 room_id 제거
@@ -1915,6 +2295,100 @@ if st.session_state.url_processed:
         st.rerun()
 
 # --- 관리자 페이지 함수 ---
+ADMIN_PAGE_SIZE = get_env_int("SMIO_ADMIN_PAGE_SIZE", 50)  # 주문 내역 기본 페이지 크기
+
+EXPORT_CHUNK_SIZE = get_env_int("SMIO_EXPORT_CHUNK_SIZE", 1000)  # CSV로 한 번에 옮기는 로그 수
+EXPORT_COLUMNS = ["시간", "음식점", "방ID", "주문자", "메뉴", "수량", "금액", "옵션", "요청사항"]
+
+def format_log_row(log, time_format="%m-%d %H:%M"):
+    """로그 항목 하나를 주문 내역 표/CSV의 한 행으로 바꿉니다."""
+    return {
+        "시간": datetime.datetime.fromisoformat(log['timestamp']).strftime(time_format),
+        "음식점": log['restaurant']['name'],
+        "방ID": log['room_id'][:8],
+        "주문자": log['order']['user_name'],
+        "메뉴": log['order']['menu'],
+        "수량": log['order']['quantity'],
+        "금액": f"{log['order']['price']:,}원",
+        "옵션": log['order']['beverage_option'] or "",
+        "요청사항": log['order']['special_request'] or ""
+    }
+
+def export_order_logs_csv(months, filename, **filters):
+    """
+    여러 달의 로그를 색인에서 묶음 단위로 읽어 바로 CSV 파일에 씁니다. 전체를 메모리에 올리지 않으므로
+    내보내는 행 수와 관계없이 메모리 사용량이 일정합니다. (다운로드 URL 경로, 행 수)를 반환합니다.
+    파일은 추측할 수 없는 임의 이름으로 저장하고, 사용자에게 보일 filename은 다운로드 링크의 download 속성으로 붙입니다.
+    """
+    cleanup_exports()
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    export_path = EXPORT_DIR / f"{secrets.token_urlsafe(32)}.csv"
+    
+    row_count = 0
+    with open(export_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for chunk in iter_order_logs_range(months, chunk_size=EXPORT_CHUNK_SIZE, **filters):
+            writer.writerows(format_log_row(log, time_format="%Y-%m-%d %H:%M") for log in chunk)
+            row_count += len(chunk)
+    
+    print(f"📥 CSV 내보내기: {len(months)}개월 {row_count}건 → {filename}")
+    return f"app/static/exports/{export_path.name}", row_count
+
+def show_admin_log_table(selected_month, log_filters, total_orders):
+    """주문 내역에서 현재 페이지의 행만 색인에서 읽어 표 하나로 보여주고, 선택한 행을 한 번에 삭제합니다."""
+    st.write("### 📋 주문 내역")
+    
+    if not total_orders:
+        st.info("📭 선택한 조건에 맞는 로그가 없습니다.")
+        return
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        page_size_options = sorted({25, 50, 100, 200, ADMIN_PAGE_SIZE})
+        page_size = st.selectbox(
+            "페이지당 행 수", page_size_options,
+            index=page_size_options.index(ADMIN_PAGE_SIZE), key="admin_log_page_size"
+        )
+    
+    # 필터나 페이지 크기가 바뀌면 첫 페이지로
+    page_count = max(1, -(-total_orders // page_size))
+    filter_key = (selected_month, tuple(log_filters.values()), page_size)
+    if st.session_state.get('admin_log_filter_key') != filter_key:
+        st.session_state.admin_log_filter_key = filter_key
+        st.session_state.admin_log_page = 1
+    st.session_state.admin_log_page = min(st.session_state.get('admin_log_page', 1), page_count)
+    
+    with col2:
+        page = st.number_input(f"페이지 (전체 {page_count}쪽)", min_value=1, max_value=page_count, key="admin_log_page")
+    
+    page_logs = query_order_logs(selected_month, limit=page_size, offset=(page - 1) * page_size, **log_filters)
+    import pandas as pd
+    page_df = pd.DataFrame([format_log_row(log) for log in page_logs])
+    
+    start_row = (page - 1) * page_size
+    st.caption(f"{start_row + 1:,}–{start_row + len(page_logs):,} / {total_orders:,}건 · 삭제할 행을 표에서 선택하세요")
+    # 선택은 행 번호로만 남으므로, 월/필터/페이지가 바뀌거나 삭제한 뒤에는 표 key를 바꿔 이전 선택을 버림
+    table_key = hashlib.md5(repr((filter_key, page, st.session_state.get('admin_log_delete_count', 0))).encode()).hexdigest()[:12]
+    selection = st.dataframe(
+        page_df,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"admin_log_table_{table_key}"
+    )
+    selected_rows = [row for row in selection.selection.rows if row < len(page_logs)]
+    
+    if st.button(f"🗑️ 선택한 {len(selected_rows)}건 삭제", disabled=not selected_rows):
+        removed = delete_log_entries(selected_month, [page_logs[row]['timestamp'] for row in selected_rows])
+        if removed:
+            st.success(f"✅ {removed}건 삭제됨")
+            st.session_state.admin_log_delete_count = st.session_state.get('admin_log_delete_count', 0) + 1
+            st.rerun()
+        else:
+            st.error("❌ 삭제 실패")
+
 def show_admin_page():
     """관리자 페이지를 표시합니다."""
     st.title("🔐 SMIO 관리자 페이지")
@@ -1931,6 +2405,20 @@ def show_admin_page():
             st.success("✅ 로그아웃되었습니다.")
             st.rerun()
     
+    # 주문방 보관/정리 현황
+    with st.expander("🧹 주문방 정리 현황"):
+        sweep_history = list(get_room_sweep_history())
+        if sweep_history:
+            last_sweep = sweep_history[-1]
+            st.caption(
+                f"마지막 정리: {datetime.datetime.fromtimestamp(last_sweep['swept_at']).strftime('%Y-%m-%d %H:%M')} · "
+                f"방 {last_sweep['rooms']}개 · 주문 {last_sweep['orders']}건 · {last_sweep['bytes_reclaimed'] / 1024:.1f}KB 확보"
+            )
+        st.caption(f"보관 기준: 마지막 활동 후 {ROOM_TTL // 3600}시간, 마감 후 {ROOM_CLOSED_GRACE // 60}분 · 보관 위치: {ROOM_ARCHIVE_DIR}/")
+        if st.button("🧹 지금 정리하기"):
+            stats = sweep_rooms()
+            st.success(f"✅ 방 {stats['rooms']}개를 보관하고 {stats['bytes_reclaimed'] / 1024:.1f}KB를 확보했습니다.")
+    
     # 월별 로그 선택
     available_months = get_available_log_months()
     if not available_months:
@@ -1943,10 +2431,10 @@ def show_admin_page():
         format_func=lambda x: f"{x[:4]}년 {x[5:]}월"
     )
     
-    # 로그 불러오기
-    logs = load_order_logs(selected_month)
+    # 색인에서 필터 목록과 통계를 조회 (월 전체를 불러오지 않음)
+    facets = get_order_log_facets(selected_month)
     
-    if not logs:
+    if not facets["rooms"]:
         st.info(f"📭 {selected_month}에 기록된 로그가 없습니다.")
         return
     
@@ -1956,44 +2444,38 @@ def show_admin_page():
     
     with col1:
         # 음식점별 필터
-        restaurants = list(set([log['restaurant']['name'] for log in logs]))
-        selected_restaurant = st.selectbox("🏪 음식점 선택", ["전체"] + restaurants)
+        selected_restaurant = st.selectbox("🏪 음식점 선택", ["전체"] + facets["restaurants"])
     
     with col2:
         # 사용자별 필터
-        users = list(set([log['order']['user_name'] for log in logs if log['order']['user_name']]))
-        selected_user = st.selectbox("👤 사용자 선택", ["전체"] + users)
+        selected_user = st.selectbox("👤 사용자 선택", ["전체"] + facets["users"])
     
     with col3:
-        # 방별 필터 (방 ID로 표시)
-        rooms = list(set([log['room_id'] for log in logs]))
-        selected_room = st.selectbox("🏠 방 ID 선택", ["전체"] + [f"{room[:8]}" for room in rooms])
-    
-    # 로그 필터링
-    filtered_logs = logs
-    if selected_restaurant != "전체":
-        filtered_logs = [log for log in filtered_logs if log['restaurant']['name'] == selected_restaurant]
-    if selected_user != "전체":
-        filtered_logs = [log for log in filtered_logs if log['order']['user_name'] == selected_user]
-    if selected_room != "전체":
-        # room_id로 필터링 (앞 8자리로 비교)
-        filtered_logs = [log for log in filtered_logs if log['room_id'][:8] == selected_room]
+        # 방별 필터 (방 ID 앞 8자리로 표시)
+        selected_room = st.selectbox(
+            "🏠 방 ID 선택", ["전체"] + facets["rooms"],
+            format_func=lambda room: room if room == "전체" else room[:8]
+        )
+    
+    log_filters = {
+        "restaurant": None if selected_restaurant == "전체" else selected_restaurant,
+        "user": None if selected_user == "전체" else selected_user,
+        "room_id": None if selected_room == "전체" else selected_room
+    }
     
     # 통계 정보
     st.write("### 📈 통계 정보")
+    stats = get_order_log_stats(selected_month, **log_filters)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("총 주문 수", len(filtered_logs))
+        st.metric("총 주문 수", stats["orders"])
     with col2:
-        total_amount = sum([log['order']['price'] for log in filtered_logs])
-        st.metric("총 주문 금액", f"{total_amount:,}원")
+        st.metric("총 주문 금액", f"{stats['total_amount']:,}원")
     with col3:
-        unique_users = len(set([log['order']['user_name'] for log in filtered_logs if log['order']['user_name']]))
-        st.metric("사용자 수", f"{unique_users}명")
+        st.metric("사용자 수", f"{stats['users']}명")
     with col4:
-        unique_rooms = len(set([log['room_id'] for log in filtered_logs]))
-        st.metric("방 개수", f"{unique_rooms}개")
+        st.metric("방 개수", f"{stats['rooms']}개")
     
     # 로그 삭제 기능
     st.write("### 🗑️ 로그 관리")
@@ -2014,15 +2496,8 @@ def show_admin_page():
     
     with col2:
         if selected_room != "전체" and st.button("🏠 선택한 방 로그 삭제", use_container_width=True):
-            # 실제 room_id 찾기
-            actual_room_id = None
-            for log in logs:
-                if log['room_id'][:8] == selected_room:
-                    actual_room_id = log['room_id']
-                    break
-            
-            if actual_room_id and delete_logs_by_room(selected_month, actual_room_id):
-                st.success(f"✅ 방 {selected_room}의 로그가 삭제되었습니다.")
+            if delete_logs_by_room(selected_month, selected_room):
+                st.success(f"✅ 방 {selected_room[:8]}의 로그가 삭제되었습니다.")
                 st.rerun()
             else:
                 st.error("❌ 삭제 실패")
@@ -2032,75 +2507,44 @@ def show_admin_page():
             st.rerun()
 
     # 로그 테이블 표시
-    st.write("### 📋 주문 내역")
+    show_admin_log_table(selected_month, log_filters, stats["orders"])
     
-    if filtered_logs:
-        # 개별 삭제 기능이 포함된 테이블
-        for i, log in enumerate(filtered_logs):
-            with st.container():
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    timestamp = datetime.datetime.fromisoformat(log['timestamp']).strftime("%m-%d %H:%M")
-                    st.markdown(f"""
-                    <div style="background: white; padding: 1rem; margin: 0.5rem 0; border-radius: 8px; border: 1px solid #e2e8f0;">
-                        <div style="font-weight: 600; color: #1e293b; margin-bottom: 0.5rem;">
-                            {timestamp} | {log['restaurant']['name']} | 방ID: {log['room_id'][:8]}
-                        </div>
-                        <div style="color: #64748b;">
-                            👤 {log['order']['user_name']} | 🍽️ {log['order']['menu']} | 
-                            📊 {log['order']['quantity']}개 | 💰 {log['order']['price']:,}원
-                        </div>
-                        {f"<div style='color: #94a3b8; font-size: 0.85rem; margin-top: 0.25rem;'>💬 {log['order']['special_request']}</div>" if log['order']['special_request'] else ""}
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    if st.button("🗑️", key=f"delete_{i}", help="이 주문 삭제"):
-                        if delete_log_entry(selected_month, log['timestamp']):
-                            st.success("✅ 삭제됨")
-                            st.rerun()
-                        else:
-                            st.error("❌ 실패")
-        
-        # 데이터프레임으로도 표시 (다운로드용)
-        st.write("### 📊 표 형태 보기")
-        df_data = []
-        for log in filtered_logs:
-            df_data.append({
-                "시간": datetime.datetime.fromisoformat(log['timestamp']).strftime("%m-%d %H:%M"),
-                "음식점": log['restaurant']['name'],
-                "방ID": log['room_id'][:8],
-                "주문자": log['order']['user_name'],
-                "메뉴": log['order']['menu'],
-                "수량": log['order']['quantity'],
-                "금액": f"{log['order']['price']:,}원",
-                "옵션": log['order']['beverage_option'] or "",
-                "요청사항": log['order']['special_request'] or ""
-            })
-        
-        df = pd.DataFrame(df_data)
-        st.dataframe(df, use_container_width=True, hide_index=True)
-        
-        # CSV 다운로드
-        csv = df.to_csv(index=False, encoding='utf-8-sig')
-        
-        # 파일명 생성 (필터 조건 반영)
-        filename_parts = [f"smio_orders_{selected_month}"]
+    # CSV 내보내기 - 여러 달을 골라 파일로 스트리밍한 뒤 링크로 내려받음
+    st.write("### 📥 CSV 내보내기")
+    col1, col2 = st.columns(2)
+    month_label = lambda x: f"{x[:4]}년 {x[5:]}월"
+    with col1:
+        export_from = st.selectbox(
+            "시작 월", available_months, index=available_months.index(selected_month), format_func=month_label
+        )
+    with col2:
+        export_to = st.selectbox(
+            "끝 월", available_months, index=available_months.index(selected_month), format_func=month_label
+        )
+    export_months = sorted(m for m in available_months if min(export_from, export_to) <= m <= max(export_from, export_to))
+    
+    if st.button("📄 CSV 만들기"):
+        # 파일명 생성 (기간과 필터 조건 반영)
+        filename_parts = [f"smio_orders_{export_months[0]}"]
+        if len(export_months) > 1:
+            filename_parts[0] += f"_{export_months[-1]}"
         if selected_restaurant != "전체":
             filename_parts.append(selected_restaurant.replace("/", "_"))
         if selected_room != "전체":
-            filename_parts.append(f"room_{selected_room}")
+            filename_parts.append(f"room_{selected_room[:8]}")
         
         filename = "_".join(filename_parts) + ".csv"
-        
-        st.download_button(
-            label="📥 CSV 다운로드",
-            data=csv,
-            file_name=filename,
-            mime="text/csv"
+        with st.spinner("CSV 파일을 만드는 중..."):
+            url, row_count = export_order_logs_csv(export_months, filename, **log_filters)
+        st.session_state.admin_export = {"url": url, "filename": filename, "rows": row_count}
+    
+    export = st.session_state.get('admin_export')
+    if export:
+        st.markdown(
+            f'<a href="{export["url"]}" download="{export["filename"]}">📥 {export["filename"]} 다운로드 ({export["rows"]:,}건)</a>',
+            unsafe_allow_html=True
         )
-    else:
-        st.info("📭 선택한 조건에 맞는 로그가 없습니다.")
+        st.caption(f"다운로드 링크는 {EXPORT_TTL // 60}분 동안 유지됩니다.")
 
 # 관리자 페이지 체크 (세션 기반)
 if st.session_state.get('admin_mode') and st.session_state.get('admin_authenticated'):
@@ -0,0 +1,98 @@
+"""
+스미오 음료 판단: 메뉴 이름으로 음료 여부(음료 옵션/요청사항 입력을 보여줄지)를 정합니다.
+스크래핑할 때 메뉴마다 한 번 판단해 is_beverage 값으로 저장하고, 화면은 저장된 값을 읽습니다.
+smio_app.py와 smio_scraper.py가 함께 사용합니다.
+"""
+import os
+import re
+import json
+import time
+from pathlib import Path
+
+BEVERAGE_KEYWORDS = [
+    '커피', '아메리카노', '라떼', '카페', '에스프레소', '모카', '카푸치노', '마끼아또',
+    '차', '녹차', '홍차', '우롱차', '보리차', '쌍화차', '감잎차', '모과차',
+    '주스', '스무디', '에이드', '레몬에이드', '라임에이드', '오렌지에이드',
+    '콜라', '사이다', '환타', '스프라이트', '펩시', '코카콜라',
+    '우유', '딸기우유', '초코우유', '바나나우유',
+    '쉐이크', '밀크쉐이크', '딸기쉐이크', '초코쉐이크',
+    '아이스', '핫', '따뜻한', '차가운',
+    '음료', '드링크', '베버리지'
+]
+
+# 키워드 전체를 하나의 정규식(alternation)으로 한 번만 컴파일해 메뉴 이름을 한 번 훑어서 판단
+BEVERAGE_PATTERN = re.compile(
+    "|".join(re.escape(keyword) for keyword in sorted(set(BEVERAGE_KEYWORDS), key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+BEVERAGE_OVERRIDES_FILE = Path(os.environ.get("SMIO_BEVERAGE_OVERRIDES_FILE", "beverage_overrides.json"))
+BEVERAGE_OVERRIDES_CHECK_INTERVAL = 5  # 재정의 파일이 바뀌었는지 확인하는 최소 간격(초)
+
+_overrides_cache = {"mtime": None, "checked_at": None, "overrides": {}}
+
+def load_beverage_overrides():
+    """
+    음료 판단 재정의 파일을 읽습니다. 몇 초에 한 번만 수정 시각을 확인하고, 바뀌었을 때만 다시 파싱합니다.
+    형식: {"<place_id>": {"beverage": [메뉴 이름], "food": [메뉴 이름]}, "*": {...모든 가게...}}
+    """
+    now = time.monotonic()
+    checked_at = _overrides_cache["checked_at"]
+    if checked_at is not None and now - checked_at < BEVERAGE_OVERRIDES_CHECK_INTERVAL:
+        return _overrides_cache["overrides"]
+    _overrides_cache["checked_at"] = now
+    try:
+        mtime = BEVERAGE_OVERRIDES_FILE.stat().st_mtime if BEVERAGE_OVERRIDES_FILE.exists() else None
+        if mtime != _overrides_cache["mtime"]:
+            overrides = {}
+            if mtime is not None:
+                with open(BEVERAGE_OVERRIDES_FILE, 'r', encoding='utf-8') as f:
+                    for place_id, entry in json.load(f).items():
+                        overrides[str(place_id)] = {
+                            "beverage": {name.strip() for name in entry.get("beverage", [])},
+                            "food": {name.strip() for name in entry.get("food", [])}
+                        }
+            _overrides_cache.update(mtime=mtime, overrides=overrides)
+    except Exception as e:
+        print(f"음료 재정의 파일 로드 오류: {e}")
+    return _overrides_cache["overrides"]
+
+def get_beverage_override(menu_name, place_id=None):
+    """재정의 파일에 이 메뉴가 있으면 True(음료)/False(음식)를, 없으면 None을 반환합니다. 가게별 설정이 "*"보다 우선입니다."""
+    overrides = load_beverage_overrides()
+    if not overrides:
+        return None
+    name = menu_name.strip()
+    for key in (str(place_id) if place_id else None, "*"):
+        entry = overrides.get(key)
+        if entry:
+            if name in entry["food"]:
+                return False
+            if name in entry["beverage"]:
+                return True
+    return None
+
+def is_beverage(menu_name, place_id=None):
+    """메뉴 이름이 음료인지 판단합니다. 재정의 파일이 키워드보다 우선합니다."""
+    override = get_beverage_override(menu_name, place_id)
+    if override is not None:
+        return override
+    return BEVERAGE_PATTERN.search(menu_name) is not None
+
+def classify_menu(menu, place_id=None):
+    """메뉴 목록의 각 항목에 is_beverage 값을 채웁니다 (스크래핑/카탈로그 저장 때 한 번)."""
+    for item in menu:
+        item["is_beverage"] = is_beverage(item.get("name") or "", place_id)
+    return menu
+
+def menu_item_is_beverage(item, place_id=None):
+    """
+    화면에서 쓰는 음료 여부. 저장된 is_beverage 값을 읽고, 재정의 파일은 저장 이후에 바뀌었을 수 있으므로 먼저 확인합니다.
+    값이 없는 예전 카탈로그/주문방 메뉴만 이름으로 직접 판단합니다.
+    """
+    override = get_beverage_override(item["name"], place_id)
+    if override is not None:
+        return override
+    if item.get("is_beverage") is not None:
+        return item["is_beverage"]
+    return BEVERAGE_PATTERN.search(item["name"]) is not None
@@ -0,0 +1,1605 @@
+"""
+스미오 스크래핑 모듈: 네이버 플레이스 URL 해석, Chrome 드라이버 풀, 메뉴 스크래핑,
+가게 카탈로그와 백그라운드 스크래핑 작업 큐를 담당합니다.
+
+Selenium/requests/BeautifulSoup은 주문방을 만들 때만 필요하므로 smio_app.py는
+이 모듈을 처음 쓰는 순간에 import 합니다. 주문방을 보기만 하는 프로세스는
+이 무거운 의존성을 불러오지 않습니다.
+"""
+import streamlit as st
+import requests
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from webdriver_manager.chrome import ChromeDriverManager
+from bs4 import BeautifulSoup
+import time
+import re
+import urllib.parse
+import os
+import json
+import uuid
+from pathlib import Path
+import threading
+import queue
+import atexit
+import contextlib
+import concurrent.futures
+import collections
+
+from smio_settings import get_env_int, get_env_list
+from smio_beverage import classify_menu
+
+try:
+    import fcntl  # 프로세스 간 파일 잠금 (Linux/macOS)
+except ImportError:
+    fcntl = None
+
+# --- 2. URL 추출 및 정규화 함수 ---
+def extract_naver_url(text):
+    """
+    텍스트에서 네이버 플레이스 관련 URL을 추출합니다.
+    """
+    print(f"URL 추출 시도 - 입력 텍스트: {text}")
+    
+    # 다양한 URL 패턴으로 시도
+    url_patterns = [
+        r'https?://[^\s\n\r]+',  # 기본 URL 패턴
+        r'https://naver\.me/[A-Za-z0-9]+',  # naver.me 특화
+        r'https://map\.naver\.com/[^\s\n\r]+',  # map.naver.com
+        r'https://m\.place\.naver\.com/[^\s\n\r]+',  # m.place.naver.com
+        r'http://[^\s\n\r]+naver[^\s\n\r]+',  # 기타 naver 도메인
+    ]
+    
+    found_urls = []
+    
+    # 모든 패턴으로 URL 찾기
+    for pattern in url_patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        found_urls.extend(matches)
+    
+    print(f"발견된 모든 URL: {found_urls}")
+    
+    # 네이버 관련 URL만 필터링
+    naver_keywords = ['naver.me', 'map.naver.com', 'place.naver.com', 'm.place.naver.com', 'm.map.naver.com', 'pcmap.place.naver.com']
+    
+    for url in found_urls:
+        for keyword in naver_keywords:
+            if keyword in url.lower():
+                # URL 정리 (끝의 불필요한 문자 제거)
+                cleaned_url = re.sub(r'[^\w\-\./:=?&%#]+$', '', url)
+                print(f"✅ 추출된 네이버 URL: {cleaned_url}")
+                return cleaned_url
+    
+    # 마지막으로 텍스트에서 naver.me 패턴 직접 검색
+    naver_me_pattern = r'naver\.me/[A-Za-z0-9]+'
+    naver_me_match = re.search(naver_me_pattern, text, re.IGNORECASE)
+    if naver_me_match:
+        full_url = f"https://{naver_me_match.group(0)}"
+        print(f"✅ naver.me 패턴으로 추출된 URL: {full_url}")
+        return full_url
+    
+    print(f"❌ 텍스트에서 네이버 URL을 찾을 수 없음: {text}")
+    return None
+
+PLACE_ID_PATTERNS = [
+    r'place/(\d+)',           # 기본 패턴
+    r'restaurant/(\d+)',      # restaurant 패턴  
+    r'entry/place/(\d+)',     # entry/place 패턴
+    r'/(\d+)/?(?:\?|$)',      # URL 끝의 숫자 패턴
+]
+
+def extract_place_id(url):
+    """URL에서 네이버 플레이스 ID를 추출합니다. 찾지 못하면 None을 반환합니다."""
+    if not url:
+        return None
+    for pattern in PLACE_ID_PATTERNS:
+        match = re.search(pattern, url)
+        if match:
+            print(f"✅ Place ID 추출 성공: {match.group(1)} (패턴: {pattern})")
+            return match.group(1)
+    return None
+
+def normalize_naver_place_url(url_input):
+    """
+    네이버 플레이스 URL을 메뉴 페이지 URL로 정규화합니다.
+    """
+    print(f"🔍 URL 정규화 시작 - 입력: {url_input}")
+    
+    # 먼저 텍스트에서 URL 추출
+    extracted_url = extract_naver_url(url_input)
+    if not extracted_url:
+        print(f"❌ URL 추출 실패")
+        return None
+    
+    url = extracted_url
+    print(f"📝 추출된 URL: {url}")
+    
+    # 네이버 공유 링크인 경우 리다이렉트 처리 (한 번 해석한 링크는 캐시에서 바로 가져옴)
+    if 'naver.me' in url:
+        print(f"🔗 네이버 공유 링크 감지: {url}")
+        url = resolve_naver_short_link(url)
+    
+    # URL에서 place ID 추출 (다양한 패턴 시도)
+    place_id = extract_place_id(url)
+    
+    if not place_id:
+        print(f"❌ Place ID 추출 실패 - URL: {url}")
+        return None
+    
+    # 이미 모바일 메뉴 URL인 경우
+    if 'm.place.naver.com' in url and '/menu/' in url:
+        print(f"✅ 이미 모바일 메뉴 URL: {url}")
+        return url
+    
+    # 네이버 맵 URL을 모바일 메뉴 URL로 변환
+    mobile_menu_url = f"https://m.place.naver.com/restaurant/{place_id}/menu/list?entry=plt"
+    print(f"🎯 최종 변환된 URL: {mobile_menu_url}")
+    return mobile_menu_url
+
+# --- 2-1. 공용 HTTP 세션 및 단축 링크 해석 ---
+HTTP_CONNECT_TIMEOUT = 3.05  # 연결 타임아웃(초) - 빨리 실패하고 재시도
+HTTP_READ_TIMEOUT = 10
+SHORT_LINK_CACHE_FILE = Path(os.environ.get("SMIO_SHORT_LINK_CACHE", "catalog/short_links.json"))
+SHORT_LINK_MAX_REDIRECTS = 5
+
+@st.cache_resource
+def get_http_session():
+    """keep-alive와 제한된 재시도가 설정된 프로세스 공용 requests.Session을 반환합니다."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=1,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET"]
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_short_link_cache():
+    """naver.me 단축 코드 → place_id 매핑을 파일에서 한 번 읽어 프로세스 전체에서 공유합니다."""
+    links = {}
+    try:
+        if SHORT_LINK_CACHE_FILE.exists():
+            with open(SHORT_LINK_CACHE_FILE, 'r', encoding='utf-8') as f:
+                links = json.load(f)
+    except Exception as e:
+        print(f"단축 링크 캐시 로드 오류: {e}")
+    return {"lock": threading.Lock(), "links": links}
+
+def save_short_link(code, place_id):
+    """단축 코드 매핑을 메모리와 파일에 기록합니다. 다른 프로세스가 쓴 항목도 합쳐서 저장합니다."""
+    cache = get_short_link_cache()
+    with cache["lock"]:
+        cache["links"][code] = place_id
+        try:
+            SHORT_LINK_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            if SHORT_LINK_CACHE_FILE.exists():
+                with open(SHORT_LINK_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    cache["links"] = {**json.load(f), **cache["links"]}
+            tmp_path = SHORT_LINK_CACHE_FILE.with_name(f"{SHORT_LINK_CACHE_FILE.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache["links"], f, ensure_ascii=False)
+            os.replace(tmp_path, SHORT_LINK_CACHE_FILE)
+        except Exception as e:
+            print(f"단축 링크 캐시 저장 오류: {e}")
+
+def resolve_naver_short_link(url):
+    """
+    naver.me 단축 링크를 place ID가 드러난 URL로 해석합니다.
+    캐시에 있으면 네트워크 없이 바로 반환하고, 없으면 리다이렉트를 한 단계씩 따라가다
+    place ID가 보이는 첫 주소에서 멈춥니다. 실패하면 원본 URL을 그대로 반환합니다.
+    """
+    code_match = re.search(r'naver\.me/([A-Za-z0-9]+)', url)
+    code = code_match.group(1) if code_match else None
+    
+    place_id = get_short_link_cache()["links"].get(code) if code else None
+    if place_id:
+        print(f"⚡ 단축 링크 캐시 적중: {code} → {place_id}")
+        return f"https://m.place.naver.com/restaurant/{place_id}"
+    
+    session = get_http_session()
+    current_url = url
+    try:
+        for _ in range(SHORT_LINK_MAX_REDIRECTS):
+            response = session.head(
+                current_url,
+                allow_redirects=False,
+                timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                headers={"User-Agent": HTTP_SCRAPE_HEADERS["User-Agent"]}
+            )
+            location = response.headers.get("Location")
+            if not response.is_redirect or not location:
+                break
+            current_url = urllib.parse.urljoin(current_url, location)
+            print(f"➡️ 리다이렉트된 URL: {current_url}")
+            if 'naver.me' not in current_url and extract_place_id(current_url):
+                break
+    except Exception as e:
+        print(f"❌ 리다이렉트 처리 오류: {e}")
+        # 리다이렉트 실패해도 지금까지 따라간 URL로 계속 시도
+    
+    place_id = extract_place_id(current_url) if 'naver.me' not in current_url else None
+    if code and place_id:
+        save_short_link(code, place_id)
+    return current_url
+
+# --- 4. Chrome WebDriver 설정 함수 ---
+def setup_chrome_driver():
+    """
+    속도 최적화된 Chrome WebDriver를 설정합니다.
+    """
+    options = webdriver.ChromeOptions()
+    
+    # 필수 옵션들
+    options.add_argument('--headless')  # 필수: GUI 없이 실행
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-plugins')
+    # 이미지/폰트 등은 Chromium이 무시하는 플래그 대신 CDP URL 차단으로 막음 (enable_resource_blocking 참고)
+    options.add_argument('--disable-logging')
+    options.add_argument('--log-level=3')
+    options.add_argument('--silent')
+    options.add_argument('--window-size=1280,720')  # 작은 크기로 메모리 절약
+    options.page_load_strategy = 'eager'  # load 이벤트까지 기다리지 않고 DOM 준비 후 바로 진행
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36")
+    
+    # 속도 최적화를 위한 옵션들
+    options.add_argument('--disable-background-timer-throttling')
+    options.add_argument('--disable-renderer-backgrounding')
+    options.add_argument('--disable-backgrounding-occluded-windows')
+    options.add_argument('--aggressive-cache-discard')
+    options.add_argument('--disable-features=TranslateUI,VizDisplayCompositor')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-default-apps')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--disable-features=VizDisplayCompositor')
+    
+    # 메모리 사용량 최적화
+    options.add_argument('--memory-pressure-off')
+    options.add_argument('--max_old_space_size=2048')  # 메모리 사용량 줄임
+    
+    # 차단/허용 요청 수와 바이트를 세기 위한 네트워크 성능 로그
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    
+    # 단순화된 환경 감지 및 Chrome 설정
+    is_cloud = (os.environ.get('STREAMLIT_SERVER_PORT') is not None or 
+                os.environ.get('RAILWAY_ENVIRONMENT') is not None or
+                os.environ.get('PORT') is not None)
+    
+    try:
+        if is_cloud:
+            # 클라우드 환경에서 Chrome 바이너리 경로 설정
+            chrome_paths = [
+                '/usr/bin/chromium-browser',
+                '/usr/bin/chromium',
+                '/usr/bin/google-chrome',
+                '/usr/bin/google-chrome-stable'
+            ]
+            
+            chrome_found = False
+            for path in chrome_paths:
+                if os.path.exists(path):
+                    options.binary_location = path
+                    chrome_found = True
+                    break
+            
+            if not chrome_found:
+                print("Chrome 바이너리를 찾을 수 없음")
+                return None
+            
+            # ChromeDriver 경로 설정
+            chromedriver_paths = [
+                '/usr/bin/chromedriver',
+                '/usr/bin/chromium-chromedriver',
+                '/usr/local/bin/chromedriver'
+            ]
+            
+            service = None
+            for path in chromedriver_paths:
+                if os.path.exists(path):
+                    service = Service(path)
+                    break
+            
+            if not service:
+                try:
+                    service = Service(ChromeDriverManager().install())
+                except Exception as e:
+                    print(f"webdriver-manager 실패: {e}")
+                    return None
+        else:
+            # 로컬 환경에서는 기본 설정 사용
+            service = Service(ChromeDriverManager().install())
+        
+        driver = webdriver.Chrome(service=service, options=options)
+        
+        # 짧은 타임아웃 설정으로 속도 향상
+        driver.set_page_load_timeout(15)  # 30초에서 15초로 단축
+        driver.implicitly_wait(0)  # 대기는 ScrapeDeadline의 명시적 조건으로만 처리 (암묵적 대기와 섞이면 시간이 겹침)
+        
+        enable_resource_blocking(driver)
+        
+        return driver
+        
+    except Exception as e:
+        print(f"Chrome WebDriver 설정 오류: {e}")
+        return None
+
+# --- 4-2. 네트워크 리소스 차단 (Chrome DevTools Protocol) ---
+# 리소스 유형별 차단 URL 패턴 (Network.setBlockedURLs는 와일드카드 URL 패턴만 지원)
+RESOURCE_TYPE_URL_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+              "*phinf.pstatic.net/*", "*://search.pstatic.net/common*"],  # 네이버 이미지 CDN
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*"],
+    "stylesheet": ["*.css*"],
+}
+
+# 분석/광고 비콘과 지도 타일 도메인
+DEFAULT_BLOCKED_DOMAINS = [
+    "wcs.naver.net",
+    "lcs.naver.com",
+    "tivan.naver.com",
+    "nam.veta.naver.com",
+    "siape.veta.naver.com",
+    "map.pstatic.net",
+    "www.google-analytics.com",
+    "www.googletagmanager.com",
+    "stats.g.doubleclick.net",
+]
+
+def build_blocked_url_patterns():
+    """환경변수의 허용/차단 목록을 반영해 CDP에 넘길 차단 URL 패턴을 만듭니다."""
+    resource_types = set(get_env_list("SMIO_BLOCK_RESOURCE_TYPES", ["image", "font", "media"]))
+    resource_types -= set(get_env_list("SMIO_ALLOW_RESOURCE_TYPES", []))
+    
+    domains = DEFAULT_BLOCKED_DOMAINS + get_env_list("SMIO_BLOCK_DOMAINS", [])
+    allowed_domains = set(get_env_list("SMIO_ALLOW_DOMAINS", []))
+    
+    patterns = []
+    for resource_type in sorted(resource_types):
+        patterns.extend(RESOURCE_TYPE_URL_PATTERNS.get(resource_type, []))
+    for domain in domains:
+        if domain not in allowed_domains:
+            patterns.append(f"*://{domain}/*")
+    return patterns
+
+BLOCKED_URL_PATTERNS = build_blocked_url_patterns()
+
+def enable_resource_blocking(driver):
+    """드라이버에 CDP URL 차단을 설정합니다. 실패해도 스크래핑은 계속됩니다."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"네트워크 차단 설정 오류: {e}")
+
+def drain_performance_log(driver):
+    """지금까지 쌓인 성능 로그를 비워 다음 스크래핑의 집계가 섞이지 않게 합니다."""
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
+
+def collect_network_stats(driver):
+    """
+    성능 로그의 Network 이벤트를 읽어 이번 스크래핑의 허용/차단 요청 수와 바이트를 집계합니다.
+    차단된 요청은 전송되지 않으므로 바이트 대신 요청 수로만 셉니다.
+    """
+    stats = {
+        "allowed_requests": 0,
+        "allowed_bytes": 0,
+        "blocked_requests": 0,
+        "failed_requests": 0,
+        "allowed_by_type": {},
+        "blocked_by_type": {},
+    }
+    request_types = {}
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"성능 로그 읽기 오류: {e}")
+        return stats
+    
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        request_id = params.get("requestId")
+        
+        if method == "Network.requestWillBeSent":
+            request_types[request_id] = params.get("type", "Other")
+        elif method == "Network.loadingFinished":
+            resource_type = request_types.get(request_id, "Other")
+            stats["allowed_requests"] += 1
+            stats["allowed_bytes"] += int(params.get("encodedDataLength", 0))
+            by_type = stats["allowed_by_type"].setdefault(resource_type, {"requests": 0, "bytes": 0})
+            by_type["requests"] += 1
+            by_type["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            if params.get("blockedReason"):
+                resource_type = params.get("type") or request_types.get(request_id, "Other")
+                stats["blocked_requests"] += 1
+                stats["blocked_by_type"][resource_type] = stats["blocked_by_type"].get(resource_type, 0) + 1
+            else:
+                stats["failed_requests"] += 1
+    return stats
+
+@st.cache_resource
+def get_network_stats_history():
+    """최근 스크래핑들의 네트워크 집계를 보관합니다 (차단 효과 측정용)."""
+    return collections.deque(maxlen=100)
+
+def record_network_stats(driver, url):
+    """이번 스크래핑의 네트워크 집계를 기록하고 요약을 출력합니다."""
+    stats = collect_network_stats(driver)
+    stats["url"] = url
+    stats["recorded_at"] = time.time()
+    get_network_stats_history().append(stats)
+    print(f"🛡️ 네트워크 요청: 허용 {stats['allowed_requests']}건 ({stats['allowed_bytes'] / 1024:.0f}KB), "
+          f"차단 {stats['blocked_requests']}건 {stats['blocked_by_type']}")
+    return stats
+
+# --- 4-3. WebDriver 풀 관리 ---
+DRIVER_POOL_SIZE = get_env_int("SMIO_DRIVER_POOL_SIZE", 2)  # 미리 띄워둘 드라이버 수
+DRIVER_MAX_USES = get_env_int("SMIO_DRIVER_MAX_USES", 20)  # 이 횟수만큼 쓰면 새 드라이버로 교체
+DRIVER_MAX_RSS_MB = get_env_int("SMIO_DRIVER_MAX_RSS_MB", 700)  # 브라우저 메모리가 이보다 크면 교체
+DRIVER_ACQUIRE_TIMEOUT = get_env_int("SMIO_DRIVER_ACQUIRE_TIMEOUT", 60)  # 드라이버 대기 최대 시간(초)
+
+def get_process_tree_rss_mb(root_pid):
+    """/proc을 읽어 root_pid와 모든 자식 프로세스의 RSS 합계(MB)를 반환합니다."""
+    children = {}
+    rss_kb = {}
+    try:
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            try:
+                with open(f"/proc/{pid}/stat", 'r') as f:
+                    stat = f.read()
+                # comm 필드에 공백/괄호가 들어갈 수 있으므로 마지막 ')' 뒤에서 ppid를 읽음
+                ppid = int(stat.rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(pid)
+                with open(f"/proc/{pid}/status", 'r') as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            rss_kb[pid] = int(line.split()[1])
+                            break
+            except (OSError, ValueError, IndexError):
+                continue
+    except OSError:
+        return 0  # /proc이 없는 환경 (로컬 macOS/Windows)
+
+    total_kb = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total_kb += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+class PooledDriver:
+    """풀에서 관리하는 드라이버와 사용 횟수를 묶어둡니다."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+    def rss_mb(self):
+        """chromedriver와 그 아래 Chrome 프로세스들의 메모리 사용량(MB)을 반환합니다."""
+        try:
+            return get_process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return 0
+
+class DriverPool:
+    """미리 띄워둔 headless Chrome 드라이버를 스크래핑 요청 사이에 재사용하는 풀입니다."""
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES,
+                 max_rss_mb=DRIVER_MAX_RSS_MB, factory=setup_chrome_driver):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.factory = factory
+        self._idle = queue.LifoQueue()  # 가장 최근에 쓴(캐시가 따뜻한) 드라이버부터 재사용
+        self._lock = threading.Lock()
+        self._total = 0  # 생성되어 살아있는 드라이버 수 (대여 중 포함)
+        self._closed = False
+
+    def _spawn(self):
+        """새 드라이버를 띄웁니다. 실패하면 자리 예약을 되돌리고 None을 반환합니다."""
+        driver = None
+        try:
+            driver = self.factory()
+        except Exception as e:
+            print(f"드라이버 생성 오류: {e}")
+        if not driver:
+            with self._lock:
+                self._total -= 1
+            return None
+        return PooledDriver(driver)
+
+    def _reserve_slot(self):
+        """풀 크기 안에서 새 드라이버 자리를 예약합니다."""
+        with self._lock:
+            if self._closed or self._total >= self.size:
+                return False
+            self._total += 1
+            return True
+
+    def warm_up(self):
+        """풀 크기만큼 드라이버를 미리 띄워 idle 큐에 넣습니다."""
+        while self._reserve_slot():
+            pooled = self._spawn()
+            if not pooled:
+                break
+            self._idle.put(pooled)
+        print(f"🔥 WebDriver 풀 준비 완료: {self._idle.qsize()}/{self.size}")
+
+    def warm_up_async(self):
+        """백그라운드 스레드에서 풀을 미리 채웁니다."""
+        threading.Thread(target=self.warm_up, name="driver-pool-warmup", daemon=True).start()
+
+    def acquire(self, timeout=DRIVER_ACQUIRE_TIMEOUT):
+        """건강한 드라이버를 하나 빌려옵니다. 사용할 수 없으면 None을 반환합니다."""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+                if self._reserve_slot():
+                    pooled = self._spawn()
+                    if not pooled:
+                        return None
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        print("⏳ 사용 가능한 WebDriver가 없음 (대기 시간 초과)")
+                        return None
+                    try:
+                        pooled = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        continue
+
+            if self.is_healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+    def release(self, pooled, discard=False):
+        """드라이버를 풀에 돌려줍니다. 수명이 다했거나 상태가 나쁘면 교체합니다."""
+        if pooled is None:
+            return
+        pooled.uses += 1
+
+        reason = None
+        if discard:
+            reason = "오류 발생"
+        elif self._closed:
+            reason = "풀 종료"
+        elif pooled.uses >= self.max_uses:
+            reason = f"사용 횟수 {pooled.uses}회 도달"
+        else:
+            rss = pooled.rss_mb()
+            if rss > self.max_rss_mb:
+                reason = f"메모리 {rss:.0f}MB 초과"
+            elif not self.reset(pooled):
+                reason = "초기화 실패"
+
+        if reason:
+            print(f"♻️ WebDriver 교체: {reason}")
+            self._discard(pooled)
+            if not self._closed:
+                self.warm_up_async()  # 빈 자리는 백그라운드에서 다시 채움
+            return
+        self._idle.put(pooled)
+
+    @staticmethod
+    def is_healthy(pooled):
+        """드라이버 세션이 살아있는지 가벼운 명령으로 확인합니다."""
+        try:
+            pooled.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def reset(pooled):
+        """다음 작업을 위해 쿠키, 탭, 프레임 상태를 초기화합니다."""
+        driver = pooled.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+            try:
+                # 모든 도메인의 쿠키 삭제 (delete_all_cookies는 현재 도메인만 지움)
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"WebDriver 초기화 오류: {e}")
+            return False
+
+    def _discard(self, pooled):
+        """드라이버를 종료하고 풀에서 제거합니다."""
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._total -= 1
+
+    def close(self):
+        """풀의 모든 유휴 드라이버를 종료합니다."""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+@st.cache_resource
+def get_driver_pool():
+    """프로세스 전체에서 공유하는 WebDriver 풀을 반환합니다."""
+    pool = DriverPool()
+    pool.warm_up_async()
+    atexit.register(pool.close)
+    return pool
+
+# --- 5. 웹 스크래핑 기능: 네이버 플레이스에서 정보 가져오기 ---
+MENU_ITEM_SELECTOR = "div.place_section_content ul > li.E2jtL"
+
+MENU_NAME_SELECTORS = [
+    "span.lPzHi",
+    "div.yQlqY span",
+    "span[class*='name']",
+    "div[class*='name'] span",
+    "span[class*='title']",
+    "div[class*='title'] span",
+    "h3", "h4", "h5",
+    "div.MXkFw span",
+    "div.meDTN span"
+]
+
+MENU_PRICE_SELECTORS = [
+    "div.GXS1X em",
+    "div.GXS1X",
+    "em",
+    "span[class*='price']",
+    "div[class*='price']"
+]
+
+RESTAURANT_NAME_SELECTORS = [
+    "div.zD5Nm div.LylZZ.v8v5j span.GHAhO",  # 기존 셀렉터
+    "span.GHAhO",  # 클래스만
+    "h1",  # 헤더 태그
+    "h2", 
+    ".restaurant_title",
+    ".place_name",
+    "[data-type='title']",
+    ".title",
+    ".name",
+    "div[class*='title'] span",
+    "div[class*='name'] span",
+    "span[class*='title']",
+    "span[class*='name']",
+    ".GHAhO"
+]
+
+ADDRESS_SELECTOR = "span.LDgIH"
+PHONE_SELECTOR = "span.xlx7Q"
+RESTAURANT_TYPE_SELECTOR = "div.zD5Nm div.LylZZ.v8v5j span.lnJFt"
+
+def build_restaurant_info(name=None, type=None, rating=None, review_visitor=None,
+                          review_blog=None, short_desc=None, address=None, phone=None,
+                          menu=None, parking=None):
+    """스크래핑 경로와 관계없이 같은 형태의 가게 정보 dict를 만듭니다."""
+    return {
+        "name": name or "가게 이름 정보 없음",
+        "type": type,
+        "rating": rating,
+        "review_visitor": review_visitor,
+        "review_blog": review_blog,
+        "short_desc": short_desc,
+        "address": address or "주소 정보 없음",
+        "phone": phone or "전화번호 정보 없음",
+        "menu": classify_menu(menu or []),  # 메뉴마다 음료 여부를 한 번 판단해 저장
+        "parking": parking or "주차 정보 없음"
+    }
+
+def parse_price(value):
+    """'8,000원' 같은 가격 표기에서 숫자만 뽑아 정수로 반환합니다."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    price_text = re.sub(r'[^0-9]', '', str(value))
+    return int(price_text) if price_text else None
+
+def dedupe_menu(menu_pairs):
+    """(이름, 가격) 목록에서 같은 이름·가격의 중복을 제거해 메뉴 dict 목록으로 만듭니다."""
+    menu_list = []
+    processed_menus = set()
+    for menu_name, price in menu_pairs:
+        menu_key = f"{menu_name}_{price}"
+        if menu_name and menu_key not in processed_menus:
+            processed_menus.add(menu_key)
+            menu_list.append({"name": menu_name, "price": price})
+    return menu_list
+
+def parse_menu_items(menu_soup):
+    """메뉴 탭 HTML에서 메뉴 이름과 가격 목록을 추출합니다."""
+    menu_items = menu_soup.select(MENU_ITEM_SELECTOR)
+    print(f"발견된 메뉴 항목 수: {len(menu_items)}")
+    
+    menu_pairs = []
+    for item in menu_items:
+        # 메뉴 이름 추출
+        menu_name = None
+        for selector in MENU_NAME_SELECTORS:
+            name_tag = item.select_one(selector)
+            if name_tag and name_tag.text.strip():
+                menu_name = name_tag.text.strip()
+                break
+        
+        if not menu_name:
+            continue
+        
+        # 가격 추출
+        price = None
+        for selector in MENU_PRICE_SELECTORS:
+            price_tag = item.select_one(selector)
+            if price_tag:
+                price = parse_price(price_tag.text)
+                if price is not None:
+                    break
+        
+        menu_pairs.append((menu_name, price))
+    
+    # 중복 제거
+    return dedupe_menu(menu_pairs)
+
+def parse_home_info(home_soup):
+    """홈 탭 HTML에서 가게 이름, 업종, 주소, 전화번호를 추출합니다."""
+    home_info = {"name": None, "type": None, "address": None, "phone": None}
+    
+    address_tag = home_soup.select_one(ADDRESS_SELECTOR)
+    if address_tag:
+        home_info["address"] = address_tag.get_text(strip=True)
+    
+    phone_tag = home_soup.select_one(PHONE_SELECTOR)
+    if phone_tag:
+        home_info["phone"] = phone_tag.get_text(strip=True)
+    
+    # 가게 이름 - 여러 셀렉터 시도
+    for selector in RESTAURANT_NAME_SELECTORS:
+        try:
+            name_tag = home_soup.select_one(selector)
+            if name_tag and name_tag.text.strip():
+                home_info["name"] = name_tag.text.strip()
+                print(f"✅ 가게이름 발견: {home_info['name']} (셀렉터: {selector})")
+                break
+        except:
+            continue
+    
+    # 업종
+    type_tag = home_soup.select_one(RESTAURANT_TYPE_SELECTOR)
+    if type_tag:
+        home_info["type"] = type_tag.text.strip()
+    
+    return home_info
+
+# 브라우저 안에서 직접 메뉴를 뽑아 작은 JSON으로만 돌려받는 스크립트 (page_source 전송과 파이썬 DOM 파싱 생략)
+EXTRACT_MENU_JS = """
+const [itemSelector, nameSelectors, priceSelectors] = arguments;
+const firstText = (root, selectors, accept) => {
+    for (const selector of selectors) {
+        const el = root.querySelector(selector);
+        if (!el) continue;
+        const value = accept(el.textContent);
+        if (value) return value;
+    }
+    return null;
+};
+const pairs = [];
+for (const item of document.querySelectorAll(itemSelector)) {
+    const name = firstText(item, nameSelectors, text => text.trim());
+    if (!name) continue;
+    const price = firstText(item, priceSelectors, text => text.replace(/[^0-9]/g, ''));
+    pairs.push([name, price]);
+}
+return JSON.stringify(pairs);
+"""
+
+EXTRACT_HOME_JS = """
+const [addressSelector, phoneSelector, nameSelectors, typeSelector] = arguments;
+const textOf = selector => {
+    const el = document.querySelector(selector);
+    return el && el.textContent.trim() ? el.textContent.trim() : null;
+};
+let name = null;
+for (const selector of nameSelectors) {
+    name = textOf(selector);
+    if (name) break;
+}
+return JSON.stringify({
+    name: name,
+    type: textOf(typeSelector),
+    address: textOf(addressSelector),
+    phone: textOf(phoneSelector)
+});
+"""
+
+SCRAPE_EXTRACTION_MODE = os.environ.get("SMIO_EXTRACTION_MODE", "js")  # "js" 또는 "html"
+
+def extract_menu_with_js(driver):
+    """execute_script 한 번으로 메뉴 이름·가격을 추출합니다. 실패하면 None을 반환합니다."""
+    try:
+        pairs = json.loads(driver.execute_script(
+            EXTRACT_MENU_JS, MENU_ITEM_SELECTOR, MENU_NAME_SELECTORS, MENU_PRICE_SELECTORS
+        ))
+        print(f"발견된 메뉴 항목 수 (JS): {len(pairs)}")
+        return dedupe_menu((name, parse_price(price)) for name, price in pairs)
+    except Exception as e:
+        print(f"JS 메뉴 추출 실패: {e}")
+        return None
+
+def extract_home_with_js(driver):
+    """execute_script 한 번으로 홈 탭의 가게 이름, 업종, 주소, 전화번호를 추출합니다. 실패하면 None을 반환합니다."""
+    try:
+        return json.loads(driver.execute_script(
+            EXTRACT_HOME_JS, ADDRESS_SELECTOR, PHONE_SELECTOR, RESTAURANT_NAME_SELECTORS, RESTAURANT_TYPE_SELECTOR
+        ))
+    except Exception as e:
+        print(f"JS 홈 정보 추출 실패: {e}")
+        return None
+
+# --- 5-1. HTTP 스크래핑: 브라우저 없이 빠르게 가져오기 ---
+HTTP_SCRAPE_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)  # (연결, 읽기) 타임아웃
+HTTP_SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8",
+    "Referer": "https://m.place.naver.com/"
+}
+
+def extract_apollo_state(html):
+    """페이지에 포함된 window.__APOLLO_STATE__ JSON을 dict로 추출합니다."""
+    match = re.search(r'window\.__APOLLO_STATE__\s*=\s*', html)
+    if not match:
+        return None
+    try:
+        state, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except ValueError as e:
+        print(f"APOLLO_STATE 파싱 오류: {e}")
+        return None
+    return state if isinstance(state, dict) else None
+
+def parse_apollo_menu(state):
+    """APOLLO_STATE의 Menu 항목들에서 메뉴 목록을 추출합니다."""
+    def menu_order(key):
+        # "Menu:1234567_3" 형태의 키에서 순번을 읽어 화면 순서대로 정렬
+        index = key.rsplit('_', 1)[-1]
+        return int(index) if index.isdigit() else 0
+    
+    menu_keys = [key for key, value in state.items()
+                 if key.startswith("Menu:") and isinstance(value, dict) and value.get("name")]
+    
+    return dedupe_menu(
+        (str(state[key]["name"]).strip(), parse_price(state[key].get("price")))
+        for key in sorted(menu_keys, key=menu_order)
+    )
+
+def parse_apollo_place(state):
+    """APOLLO_STATE의 PlaceDetailBase 항목에서 가게 기본 정보를 추출합니다."""
+    for key, value in state.items():
+        if key.startswith("PlaceDetailBase:") and isinstance(value, dict):
+            return {
+                "name": value.get("name"),
+                "type": value.get("category"),
+                "address": value.get("roadAddress") or value.get("address"),
+                "phone": value.get("phone") or value.get("virtualPhone"),
+                "rating": value.get("visitorReviewsScore"),
+                "review_visitor": value.get("visitorReviewsTotal")
+            }
+    return {}
+
+def scrape_restaurant_info_http(url):
+    """
+    브라우저 없이 메뉴 페이지 HTML만 받아 가게 정보를 추출합니다.
+    서버 렌더링된 APOLLO_STATE를 먼저 읽고, 없으면 HTML 마크업을 파싱합니다.
+    실패하면 None을 반환합니다.
+    """
+    try:
+        start = time.time()
+        response = get_http_session().get(url, headers=HTTP_SCRAPE_HEADERS, timeout=HTTP_SCRAPE_TIMEOUT)
+        response.raise_for_status()
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = 'utf-8'  # charset 헤더가 없으면 requests가 latin-1로 추정하므로 UTF-8로 고정
+        html = response.text
+        report_scrape_progress("page_loaded")
+        
+        place = {}
+        menu_list = []
+        state = extract_apollo_state(html)
+        if state:
+            place = parse_apollo_place(state)
+            menu_list = parse_apollo_menu(state)
+        
+        if not menu_list:
+            soup = BeautifulSoup(html, "html.parser")
+            menu_list = parse_menu_items(soup)
+            if not place.get("name"):
+                place = {**parse_home_info(soup), **{k: v for k, v in place.items() if v}}
+        
+        print(f"⚡ HTTP 스크래핑 완료: 메뉴 {len(menu_list)}개 ({time.time() - start:.2f}초)")
+        if menu_list:
+            report_scrape_progress("parsed")
+        return build_restaurant_info(menu=menu_list, **place)
+    except Exception as e:
+        print(f"HTTP 스크래핑 실패: {e}")
+        return None
+
+# --- 5-2. 스크래핑 진입점 ---
+def scrape_restaurant_info(url):
+    """
+    주어진 네이버 플레이스 URL에서 가게 이름, 메뉴, 주차 정보를 스크래핑합니다.
+    HTTP 빠른 경로를 먼저 시도하고, 실패하거나 메뉴가 비어 있을 때만 Selenium을 사용합니다.
+    """
+    restaurant_data = scrape_restaurant_info_http(url)
+    if restaurant_data and restaurant_data.get("menu"):
+        return restaurant_data
+    
+    print("HTTP 경로에서 메뉴를 얻지 못함 - Selenium으로 재시도")
+    return scrape_restaurant_info_selenium(url)
+
+# --- 5-3. Selenium 스크래핑: HTTP 경로가 실패했을 때 사용 ---
+SCRAPE_DEADLINE = get_env_int("SMIO_SCRAPE_DEADLINE", 30)  # Selenium 스크래핑 전체 시간 예산(초)
+MENU_TAB_SELECTORS = ["a[role='tab']", "a.tpj9w._tab-menu", "a[href*='/menu']", "span.veBoZ", "a._tab-menu"]
+HOME_TAB_SELECTORS = ["a[role='tab']", "a.tpj9w._tab-menu", "span.veBoZ"]
+MORE_BUTTON_SELECTOR = "span.TeItc"
+
+class ScrapeDeadline:
+    """스크래핑 한 번에 주어진 전체 시간 예산을 관리합니다."""
+
+    def __init__(self, seconds):
+        self.expires_at = time.time() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def wait(self, driver, condition, cap):
+        """cap과 남은 예산 중 짧은 시간 동안 condition을 기다립니다. 만족하지 않으면 None을 반환합니다."""
+        timeout = min(cap, self.remaining())
+        if timeout <= 0:
+            return None
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=0.2).until(condition)
+        except TimeoutException:
+            return None
+
+def any_element_present(*selectors):
+    """셀렉터 중 하나라도 요소가 있으면 참이 되는 대기 조건을 만듭니다."""
+    combined = ", ".join(selectors)
+    return lambda driver: driver.find_elements(By.CSS_SELECTOR, combined)
+
+def element_count_greater_than(selector, count):
+    """요소 수가 count보다 많아지면 참이 되는 대기 조건을 만듭니다 (더보기로 항목이 늘었는지 확인)."""
+    return lambda driver: len(driver.find_elements(By.CSS_SELECTOR, selector)) > count
+
+def find_tab(driver, selectors, label):
+    """탭 후보 셀렉터들 중 텍스트에 label이 들어간 첫 요소를 찾습니다."""
+    for selector in selectors:
+        try:
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                if label in element.text:
+                    return element
+        except:
+            continue
+    return None
+
+def scrape_restaurant_info_selenium(url):
+    """
+    Chrome WebDriver로 페이지를 열어 가게 이름, 메뉴, 주차 정보를 스크래핑합니다.
+    고정 대기 대신 각 단계의 조건을 기다리며, 전체 시간 예산(SMIO_SCRAPE_DEADLINE)을 넘기면
+    남은 단계를 건너뛰고 그때까지 얻은 정보를 partial 표시와 함께 반환합니다. 홈 탭(주소/전화)이 그려지지 않은 결과도 partial입니다.
+    """
+    deadline = ScrapeDeadline(SCRAPE_DEADLINE)
+    pool = get_driver_pool()
+    pooled = None
+    discard_driver = False
+    try:
+        # 풀에서 미리 띄워둔 WebDriver 대여
+        pooled = pool.acquire()
+        if not pooled:
+            return {"error": "WebDriver 설정에 실패했습니다."}
+        driver = pooled.driver
+        drain_performance_log(driver)  # 이전 작업의 네트워크 로그 제거
+        report_scrape_progress("driver_acquired")
+        
+        print(f"URL 접속 시도: {url}")
+        driver.set_page_load_timeout(max(1, deadline.remaining()))
+        driver.get(url)
+        report_scrape_progress("page_loaded")
+
+        # 네이버 플레이스는 iframe 안에 주요 내용이 있을 수 있으므로, iframe 또는 본문 탭/메뉴가 나타날 때까지 기다립니다.
+        print("iframe 찾기 시도...")
+        deadline.wait(driver, any_element_present("iframe#entryIframe", "a[role='tab']", MENU_ITEM_SELECTOR), cap=10)
+        iframe_selectors = [
+            "iframe#entryIframe",
+            "iframe#searchIframe", 
+            "iframe#placeIframe",
+            "iframe[src*='entry']",
+            "iframe[src*='place']"
+        ]
+        
+        iframe_found = False
+        for selector in iframe_selectors:
+            try:
+                iframe = driver.find_element(By.CSS_SELECTOR, selector)
+                driver.switch_to.frame(iframe)
+                print(f"iframe 전환 성공: {selector}")
+                iframe_found = True
+                break
+            except:
+                continue
+        
+        if not iframe_found:
+            print("iframe 없음, 메인 페이지에서 진행...")
+        report_scrape_progress("iframe_found")
+        
+        # 탭이나 메뉴 항목이 그려질 때까지 대기
+        deadline.wait(driver, any_element_present(*MENU_TAB_SELECTORS, MENU_ITEM_SELECTOR), cap=8)
+        
+        # 메뉴 탭 클릭 (이미 메뉴 항목이 보이면 생략)
+        if not driver.find_elements(By.CSS_SELECTOR, MENU_ITEM_SELECTOR) and not deadline.expired:
+            print("메뉴 탭 찾기 및 클릭...")
+            menu_tab = find_tab(driver, MENU_TAB_SELECTORS, "메뉴")
+            if menu_tab and menu_tab.is_displayed():
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", menu_tab)
+                try:
+                    deadline.wait(driver, EC.element_to_be_clickable(menu_tab), cap=3)
+                    menu_tab.click()
+                    # 탭 내용이 메뉴 목록으로 바뀔 때까지 대기
+                    if deadline.wait(driver, any_element_present(MENU_ITEM_SELECTOR), cap=8):
+                        print("메뉴 탭 클릭 성공")
+                    else:
+                        print("메뉴 탭 클릭 후 메뉴 항목이 나타나지 않음")
+                except:
+                    print("메뉴 탭 클릭 실패")
+            else:
+                print("메뉴 탭을 찾을 수 없음")
+
+        # 더보기 버튼 클릭 - 클릭할 때마다 메뉴 항목이 늘어날 때까지 대기
+        print("더보기 버튼 클릭 시작...")
+        click_count = 0
+        max_clicks = 5  # 클릭 횟수 제한으로 속도 향상
+        
+        while click_count < max_clicks and not deadline.expired:
+            more_menu_btn = find_tab(driver, [MORE_BUTTON_SELECTOR], "더보기")
+            if not more_menu_btn:
+                print("더보기 버튼이 더 이상 없음 - 메뉴 로드 완료")
+                break
+            
+            try:
+                item_count = len(driver.find_elements(By.CSS_SELECTOR, MENU_ITEM_SELECTOR))
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", more_menu_btn)
+                more_menu_btn.click()
+                click_count += 1
+                if not deadline.wait(driver, element_count_greater_than(MENU_ITEM_SELECTOR, item_count), cap=3):
+                    print("더보기 클릭 후 메뉴가 늘어나지 않음 - 중단")
+                    break
+            except Exception as e:
+                print(f"더보기 버튼 클릭 실패: {e}")
+                break
+        
+        report_scrape_progress("menu_expanded")
+        
+        # 메뉴 정보 추출 (시간 예산을 넘겼더라도 지금 화면에 있는 메뉴는 가져옴)
+        print("메뉴 정보 추출 시작...")
+        menu_list = extract_menu_with_js(driver) if SCRAPE_EXTRACTION_MODE == "js" else None
+        if not menu_list:
+            # JS 추출이 꺼져 있거나 실패하면 전체 HTML을 받아 BeautifulSoup으로 파싱
+            current_page_source = driver.page_source
+            menu_soup = BeautifulSoup(current_page_source, "html.parser")
+            menu_list = parse_menu_items(menu_soup)
+        report_scrape_progress("parsed")
+
+        # 홈 탭에서 기본 정보 추출
+        print("홈 탭 정보 추출...")
+        address = None
+        phone = None
+        restaurant_name = None
+        restaurant_type = None
+        rating = None
+        review_visitor = None
+        review_blog = None
+        short_desc = None
+        parking_info = "주차 정보 없음"
+        home_incomplete = False
+        
+        # 홈 탭 클릭
+        home_tab = None if deadline.expired else find_tab(driver, HOME_TAB_SELECTORS, "홈")
+        if home_tab and home_tab.is_displayed():
+            try:
+                home_tab.click()
+                # 주소가 그려질 때까지 대기 (가게 이름 헤더는 메뉴 탭에도 있어서 홈 탭이 그려졌는지 알 수 없음)
+                if not deadline.wait(driver, any_element_present(ADDRESS_SELECTOR), cap=5):
+                    print("홈 탭 클릭 후 주소가 나타나지 않음 - 부분 결과로 처리")
+                    home_incomplete = True
+                
+                home_info = extract_home_with_js(driver) if SCRAPE_EXTRACTION_MODE == "js" else None
+                if not home_info:
+                    home_page = driver.page_source
+                    home_soup = BeautifulSoup(home_page, "html.parser")
+                    home_info = parse_home_info(home_soup)
+                address = home_info["address"]
+                phone = home_info["phone"]
+                restaurant_name = home_info["name"]
+                restaurant_type = home_info["type"]
+                    
+            except Exception as e:
+                print(f"홈 탭 정보 추출 오류: {e}")
+                home_incomplete = True
+
+        restaurant_data = build_restaurant_info(
+            name=restaurant_name,
+            type=restaurant_type,
+            rating=rating,
+            review_visitor=review_visitor,
+            review_blog=review_blog,
+            short_desc=short_desc,
+            address=address,
+            phone=phone,
+            menu=menu_list,
+            parking=parking_info
+        )
+        if deadline.expired or home_incomplete:
+            if deadline.expired:
+                print(f"⏰ 스크래핑 시간 예산({SCRAPE_DEADLINE}초) 초과 - 부분 결과 반환")
+            restaurant_data["partial"] = True
+        return restaurant_data
+
+    except Exception as e:
+        print(f"스크래핑 오류 발생: {e}")
+        import traceback
+        print(f"상세 오류 정보: {traceback.format_exc()}")
+        
+        # Streamlit Cloud 환경에서의 특별한 오류 처리
+        if "invalid session id" in str(e):
+            discard_driver = True
+            return {"error": "브라우저 세션이 만료되었습니다. 다시 시도해주세요."}
+        elif "ChromeDriver를 찾을 수 없습니다" in str(e):
+            return {"error": "브라우저 드라이버를 찾을 수 없습니다. 잠시 후 다시 시도해주세요."}
+        elif "timeout" in str(e).lower():
+            return {"error": "페이지 로딩 시간이 초과되었습니다. 네트워크 상태를 확인하고 다시 시도해주세요."}
+        else:
+            return {"error": f"스크래핑 중 오류가 발생했습니다: {str(e)}"}
+    
+    finally:
+        if pooled and not discard_driver:
+            record_network_stats(pooled.driver, url)
+        # 드라이버는 종료하지 않고 초기화 후 풀에 반납
+        pool.release(pooled, discard=discard_driver)
+
+# --- 5-4. 가게 카탈로그: place_id 기준 디스크 캐시 ---
+CATALOG_DIR = Path(os.environ.get("SMIO_CATALOG_DIR", "catalog"))
+CATALOG_TTL = get_env_int("SMIO_CATALOG_TTL", 6 * 3600)  # 이 시간 안의 항목은 그대로 사용(초)
+CATALOG_STALE_TTL = get_env_int("SMIO_CATALOG_STALE_TTL", 7 * 24 * 3600)  # TTL 이후 이 시간까지는 바로 주고 백그라운드 갱신(초)
+
+def get_catalog_entry_path(place_id):
+    """place_id에 해당하는 카탈로그 파일 경로를 반환합니다."""
+    CATALOG_DIR.mkdir(parents=True, exist_ok=True)
+    return CATALOG_DIR / f"{place_id}.json"
+
+def load_catalog_entry(place_id):
+    """카탈로그에서 가게 항목을 불러옵니다. 없으면 None을 반환합니다."""
+    try:
+        file_path = get_catalog_entry_path(place_id)
+        if file_path.exists():
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+    except Exception as e:
+        print(f"카탈로그 로드 오류: {e}")
+        return None
+
+def save_catalog_entry(place_id, restaurant_info, source_url):
+    """가게 정보를 카탈로그에 저장합니다. 임시 파일에 쓴 뒤 교체하여 중간 상태가 남지 않게 합니다."""
+    try:
+        file_path = get_catalog_entry_path(place_id)
+        fetched_at = time.time()
+        if restaurant_info.get("partial"):
+            # 시간 예산을 넘긴 부분 결과는 바로 '오래된' 항목으로 저장해 다음 요청 때 백그라운드로 다시 채움
+            fetched_at -= CATALOG_TTL
+        entry = {
+            "place_id": place_id,
+            "source_url": source_url,
+            "fetched_at": fetched_at,
+            "restaurant_info": restaurant_info
+        }
+        tmp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+        return entry
+    except Exception as e:
+        print(f"카탈로그 저장 오류: {e}")
+        return None
+
+def refresh_catalog_entry(place_id, url):
+    """
+    가게를 새로 스크래핑하여 카탈로그를 갱신하고 결과를 반환합니다.
+    같은 가게에 대한 동시 요청은 한 번의 스크래핑으로 합쳐집니다.
+    """
+    return run_single_flight(place_id, lambda: scrape_into_catalog(place_id, url))
+
+def scrape_into_catalog(place_id, url):
+    """프로세스 간 잠금을 잡고 스크래핑한 뒤 카탈로그에 저장합니다."""
+    started_at = time.time()
+    with scrape_lock(place_id) as waited:
+        if waited:
+            # 다른 프로세스가 방금 같은 가게를 스크래핑했다면 그 결과를 그대로 사용
+            entry = load_catalog_entry(place_id)
+            if entry and entry.get("fetched_at", 0) >= started_at and entry.get("restaurant_info"):
+                print(f"🤝 다른 프로세스의 스크래핑 결과 사용: {place_id}")
+                return entry["restaurant_info"]
+        
+        restaurant_data = scrape_restaurant_info(url)
+        if restaurant_data and restaurant_data.get("menu"):
+            restaurant_data["place_id"] = place_id
+            classify_menu(restaurant_data["menu"], place_id)  # 가게별 음료 재정의 반영
+            save_catalog_entry(place_id, restaurant_data, url)
+        return restaurant_data
+
+@st.cache_resource
+def get_catalog_refresh_state():
+    """백그라운드 갱신이 진행 중인 place_id 목록과 끝나면 부를 콜백을 프로세스 전체에서 공유합니다."""
+    return {"lock": threading.Lock(), "pending": set(), "callbacks": {}}
+
+def refresh_catalog_entry_async(place_id, url, on_done=None):
+    """
+    백그라운드 스레드에서 카탈로그 항목을 갱신합니다. 같은 가게의 갱신은 한 번만 돌립니다.
+    on_done을 주면 갱신이 끝난 뒤 결과(실패하면 None)로 한 번 부릅니다. 이미 진행 중인 갱신에도 붙습니다.
+    """
+    state = get_catalog_refresh_state()
+    with state["lock"]:
+        if on_done:
+            state["callbacks"].setdefault(place_id, []).append(on_done)
+        if place_id in state["pending"]:
+            return
+        state["pending"].add(place_id)
+    
+    def worker():
+        result = None
+        try:
+            print(f"🔄 카탈로그 백그라운드 갱신: {place_id}")
+            result = refresh_catalog_entry(place_id, url)
+        except Exception as e:
+            print(f"카탈로그 백그라운드 갱신 오류: {e}")
+        finally:
+            with state["lock"]:
+                state["pending"].discard(place_id)
+                callbacks = state["callbacks"].pop(place_id, [])
+        for callback in callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"카탈로그 갱신 콜백 오류: {e}")
+    
+    threading.Thread(target=worker, name=f"catalog-refresh-{place_id}", daemon=True).start()
+
+def complete_partial_entry(place_id, on_done):
+    """
+    부분 결과로 저장된 가게를 바로 백그라운드에서 다시 스크래핑하고, 끝나면 on_done(결과)을 부릅니다.
+    카탈로그에 원래 URL이 없으면 아무것도 하지 않고 False를 반환합니다.
+    """
+    entry = load_catalog_entry(place_id)
+    if not entry or not entry.get("source_url"):
+        return False
+    refresh_catalog_entry_async(place_id, entry["source_url"], on_done)
+    return True
+
+# --- 5-5. 같은 가게 동시 스크래핑 합치기 (single-flight) ---
+SCRAPE_LOCK_TIMEOUT = get_env_int("SMIO_SCRAPE_LOCK_TIMEOUT", 90)  # 다른 프로세스의 스크래핑을 기다리는 최대 시간(초)
+
+@st.cache_resource
+def get_inflight_scrapes():
+    """진행 중인 스크래핑의 Future를 place_id별로 프로세스 전체에서 공유합니다."""
+    return {"lock": threading.Lock(), "futures": {}}
+
+def run_single_flight(place_id, fn):
+    """
+    같은 place_id로 진행 중인 작업이 있으면 새로 실행하지 않고 그 결과를 기다립니다.
+    처음 들어온 호출만 fn을 실행하고, 그 사이에 들어온 호출은 같은 Future를 공유합니다.
+    """
+    state = get_inflight_scrapes()
+    with state["lock"]:
+        future = state["futures"].get(place_id)
+        is_leader = future is None
+        if is_leader:
+            future = concurrent.futures.Future()
+            state["futures"][place_id] = future
+    
+    if not is_leader:
+        print(f"⏳ 같은 가게를 스크래핑 중 - 결과 대기: {place_id}")
+        return future.result()
+    
+    try:
+        future.set_result(fn())
+    except Exception as e:
+        future.set_exception(e)
+    finally:
+        with state["lock"]:
+            state["futures"].pop(place_id, None)
+    return future.result()
+
+@contextlib.contextmanager
+def scrape_lock(place_id, timeout=SCRAPE_LOCK_TIMEOUT):
+    """
+    place_id별 잠금 파일로 여러 프로세스가 같은 가게를 동시에 스크래핑하지 않게 합니다.
+    다른 프로세스가 잠금을 갖고 있어 기다렸다면 True를 넘겨줍니다.
+    fcntl이 없는 환경(Windows)이나 대기 시간 초과 시에는 잠금 없이 진행합니다.
+    """
+    if fcntl is None:
+        yield False
+        return
+    
+    lock_dir = CATALOG_DIR / "locks"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    with open(lock_dir / f"{place_id}.lock", 'w') as lock_file:
+        waited = False
+        locked = False
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                waited = True
+                if time.time() >= deadline:
+                    print(f"⚠️ 스크래핑 잠금 대기 시간 초과 - 잠금 없이 진행: {place_id}")
+                    break
+                time.sleep(0.2)
+        try:
+            yield waited
+        finally:
+            if locked:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def get_restaurant_info(normalized_url):
+    """
+    정규화된 메뉴 URL의 가게 정보를 반환합니다.
+    카탈로그 항목이 신선하면 그대로, 오래되었지만 허용 범위 안이면 바로 반환하면서 백그라운드로 갱신하고,
+    없거나 너무 오래되었으면 스크래핑합니다.
+    """
+    place_id = extract_place_id(normalized_url)
+    if not place_id:
+        return scrape_restaurant_info(normalized_url)
+    
+    entry = load_catalog_entry(place_id)
+    if entry and entry.get("restaurant_info"):
+        age = time.time() - entry.get("fetched_at", 0)
+        if age < CATALOG_TTL:
+            print(f"📦 카탈로그 적중: {place_id} ({age:.0f}초 전 갱신)")
+            report_scrape_progress("parsed")
+            return entry["restaurant_info"]
+        if age < CATALOG_TTL + CATALOG_STALE_TTL:
+            print(f"📦 오래된 카탈로그 적중: {place_id} ({age:.0f}초 전 갱신) - 백그라운드 갱신")
+            refresh_catalog_entry_async(place_id, normalized_url)
+            report_scrape_progress("parsed")
+            return entry["restaurant_info"]
+    
+    restaurant_data = refresh_catalog_entry(place_id, normalized_url)
+    if entry and entry.get("restaurant_info") and not (restaurant_data and restaurant_data.get("menu")):
+        # 새로 가져오기에 실패하면 너무 오래된 항목이라도 없는 것보다 낫다
+        print(f"⚠️ 스크래핑 실패 - 만료된 카탈로그 항목 사용: {place_id}")
+        return entry["restaurant_info"]
+    return restaurant_data
+
+# --- 5-6. 스크래핑 작업 큐: 백그라운드 처리와 진행 상황 ---
+SCRAPE_WORKERS = get_env_int("SMIO_SCRAPE_WORKERS", DRIVER_POOL_SIZE)  # 동시에 스크래핑하는 작업자 수
+SCRAPE_QUEUE_DEPTH = get_env_int("SMIO_SCRAPE_QUEUE_DEPTH", 8)  # 대기+진행 중 작업 최대 수 (넘으면 거절)
+SCRAPE_JOB_RETENTION = 600  # 끝난 작업 기록을 보관하는 시간(초)
+
+SCRAPE_PHASES = [
+    ("queued", "⏳ 순서를 기다리는 중..."),
+    ("resolving", "🔗 링크를 확인하는 중..."),
+    ("driver_acquired", "🌐 브라우저 준비 완료, 페이지 여는 중..."),
+    ("page_loaded", "📄 가게 페이지를 불러왔습니다"),
+    ("iframe_found", "🔍 가게 정보 영역을 찾았습니다"),
+    ("menu_expanded", "📖 메뉴를 모두 펼쳤습니다"),
+    ("parsed", "🧾 메뉴 정리 완료!"),
+]
+SCRAPE_PHASE_INDEX = {phase: i for i, (phase, _) in enumerate(SCRAPE_PHASES)}
+
+def run_scrape_job(url_input):
+    """
+    작업자 스레드에서 URL을 정규화하고 가게 정보를 가져옵니다.
+    URL을 찾지 못하면 None을, 그렇지 않으면 get_restaurant_info의 결과를 반환합니다.
+    """
+    report_scrape_progress("resolving")
+    normalized_url = normalize_naver_place_url(url_input)
+    if not normalized_url:
+        return None
+    return get_restaurant_info(normalized_url)
+
+class ScrapeJobQueue:
+    """가게 스크래핑을 제한된 수의 작업자 스레드에서 처리하고 단계별 진행 상황을 기록합니다."""
+
+    def __init__(self, workers=SCRAPE_WORKERS, max_depth=SCRAPE_QUEUE_DEPTH):
+        self.max_depth = max(1, max_depth)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="scrape-worker"
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._thread_jobs = {}  # 작업자 스레드 ID → 처리 중인 작업 ID
+
+    def submit(self, url_input):
+        """작업을 등록하고 작업 ID를 바로 반환합니다. 대기열이 가득 차면 None을 반환합니다."""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            if self._active_count() >= self.max_depth:
+                print(f"🚦 스크래핑 대기열 가득 참 ({self.max_depth}) - 요청 거절")
+                return None
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",  # queued → running → done/failed
+                "phase": "queued",
+                "result": None,
+                "error": None,
+                "created_at": now,
+                "updated_at": now
+            }
+        self._executor.submit(self._run, job_id, url_input)
+        return job_id
+
+    def get(self, job_id):
+        """작업 상태의 복사본을 반환합니다. 대기 중이면 앞선 대기 작업 수(position)를 함께 넣습니다."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            snapshot = dict(job)
+            snapshot["position"] = sum(
+                1 for other in self._jobs.values()
+                if other["status"] == "queued" and other["created_at"] < job["created_at"]
+            )
+            return snapshot
+
+    def report(self, phase):
+        """현재 스레드가 처리 중인 작업의 진행 단계를 갱신합니다. 작업 밖에서 호출되면 무시합니다."""
+        with self._lock:
+            job = self._jobs.get(self._thread_jobs.get(threading.get_ident()))
+            if job:
+                job["phase"] = phase
+                job["updated_at"] = time.time()
+
+    def _run(self, job_id, url_input):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._thread_jobs[thread_id] = job_id
+            self._jobs[job_id]["status"] = "running"
+        
+        status, result, error = "done", None, None
+        try:
+            result = run_scrape_job(url_input)
+        except Exception as e:
+            print(f"스크래핑 작업 오류: {e}")
+            status, error = "failed", str(e)
+        finally:
+            with self._lock:
+                self._thread_jobs.pop(thread_id, None)
+                self._jobs[job_id].update(status=status, result=result, error=error, updated_at=time.time())
+
+    def _active_count(self):
+        return sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+
+    def _prune(self, now):
+        """오래된 완료 작업 기록을 지웁니다."""
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["status"] in ("done", "failed") and now - job["updated_at"] > SCRAPE_JOB_RETENTION]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+@st.cache_resource
+def get_scrape_queue():
+    """프로세스 전체에서 공유하는 스크래핑 작업 큐를 반환합니다."""
+    return ScrapeJobQueue()
+
+def report_scrape_progress(phase):
+    """스크래핑 단계를 현재 작업에 기록합니다. 백그라운드 갱신처럼 작업 밖이면 아무것도 하지 않습니다."""
+    get_scrape_queue().report(phase)
+
+# --- 5-7. 즐겨찾기 가게 미리 준비 ---
+FAVORITES_FILE = Path(os.environ.get("SMIO_FAVORITES_FILE", "favorites.json"))
+FAVORITES_REFRESH_INTERVAL = get_env_int("SMIO_FAVORITES_REFRESH_INTERVAL", 3600)  # 즐겨찾기 재스크래핑 주기(초)
+
+def load_favorites():
+    """즐겨찾기 가게 목록(label, url)을 파일에서 불러옵니다."""
+    try:
+        if FAVORITES_FILE.exists():
+            with open(FAVORITES_FILE, 'r', encoding='utf-8') as f:
+                return [fav for fav in json.load(f) if fav.get("label") and fav.get("url")]
+        return []
+    except Exception as e:
+        print(f"즐겨찾기 로드 오류: {e}")
+        return []
+
+def warm_favorites(resolved):
+    """즐겨찾기 URL을 정규화하고, 카탈로그 항목이 없거나 갱신 주기가 지난 가게를 스크래핑합니다."""
+    for favorite in load_favorites():
+        url = favorite["url"]
+        try:
+            normalized_url = resolved.get(url) or normalize_naver_place_url(url)
+            place_id = extract_place_id(normalized_url)
+            if not place_id:
+                continue
+            resolved[url] = normalized_url
+            
+            entry = load_catalog_entry(place_id)
+            if not entry or time.time() - entry.get("fetched_at", 0) >= FAVORITES_REFRESH_INTERVAL:
+                print(f"⭐ 즐겨찾기 미리 스크래핑: {favorite['label']}")
+                refresh_catalog_entry(place_id, normalized_url)
+        except Exception as e:
+            print(f"즐겨찾기 준비 오류 ({favorite['label']}): {e}")
+
+@st.cache_resource
+def start_favorites_warmer():
+    """
+    즐겨찾기를 시작 시점에 한 번, 이후 주기적으로 미리 스크래핑하는 스레드를 띄웁니다.
+    랜딩 페이지가 처음 열릴 때 불리므로, 여기서 WebDriver 풀도 백그라운드로 미리 채워
+    첫 주문방 요청이 Chrome 기동을 기다리지 않게 합니다.
+    """
+    get_driver_pool()  # 풀 생성 시 warm_up_async()로 바로 채우기 시작 (기다리지 않음)
+    resolved = {}  # 즐겨찾기 URL → 정규화된 메뉴 URL
+    
+    def worker():
+        while True:
+            warm_favorites(resolved)
+            time.sleep(FAVORITES_REFRESH_INTERVAL)
+    
+    threading.Thread(target=worker, name="favorites-warmer", daemon=True).start()
+    return resolved
+
+def get_warm_favorite_info(favorite):
+    """즐겨찾기 가게가 카탈로그에 준비되어 있으면 그 정보를 바로 반환하고, 아니면 None을 반환합니다."""
+    normalized_url = start_favorites_warmer().get(favorite["url"])
+    place_id = extract_place_id(normalized_url)
+    if not place_id or not load_catalog_entry(place_id):
+        return None
+    # 카탈로그 항목이 있으면 오래되었어도 바로 반환되고 갱신은 백그라운드에서 진행됨
+    restaurant_data = get_restaurant_info(normalized_url)
+    return restaurant_data if restaurant_data and restaurant_data.get("menu") else None
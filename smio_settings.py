@@ -0,0 +1,21 @@
+"""
+스미오 공용 설정 도우미: 환경변수에서 설정값을 읽습니다.
+smio_app.py와 smio_scraper.py가 함께 사용합니다.
+"""
+import os
+
+
+# --- 4-1. 설정값 읽기 ---
+def get_env_int(name, default):
+    """환경변수에서 정수 설정값을 읽습니다. 값이 없거나 잘못되면 기본값을 사용합니다."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def get_env_list(name, default):
+    """쉼표로 구분된 환경변수를 목록으로 읽습니다. 값이 없으면 기본값을 사용합니다."""
+    value = os.environ.get(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
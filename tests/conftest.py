@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 저장소 루트의 smio_*.py 모듈을 패키지 설치 없이 import할 수 있도록
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+@pytest.fixture
+def load_fixture():
+    """tests/fixtures/ 아래 저장된 페이지를 문자열로 읽습니다."""
+    def load(name):
+        return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+    return load
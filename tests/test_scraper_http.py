@@ -0,0 +1,165 @@
+"""HTTP 스크래핑 경로(APOLLO_STATE 우선, HTML 마크업 대체) 테스트."""
+import pytest
+import requests
+from bs4 import BeautifulSoup
+
+import smio_scraper
+from smio_scraper import (
+    build_restaurant_info,
+    extract_apollo_state,
+    parse_apollo_menu,
+    parse_apollo_place,
+    parse_menu_items,
+    scrape_restaurant_info_http,
+)
+
+PLACE_URL = "https://m.place.naver.com/restaurant/1234567/menu/list"
+
+# Selenium 경로와 HTTP 경로 모두 build_restaurant_info로 만든 dict를 반환해야 함
+RESTAURANT_INFO_KEYS = set(build_restaurant_info())
+MENU_ITEM_KEYS = {"name", "price", "is_beverage"}
+
+class FakeResponse:
+    """requests.Response처럼 content와 encoding으로 text를 만드는 응답."""
+
+    def __init__(self, html, status_code=200, encoding=None):
+        self.content = html.encode("utf-8")
+        self.status_code = status_code
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return self.response
+
+@pytest.fixture
+def serve_page(monkeypatch):
+    """get_http_session()이 주어진 응답을 돌려주는 세션을 반환하도록 바꿉니다."""
+    monkeypatch.setattr(smio_scraper, "report_scrape_progress", lambda phase: None)
+    def serve(response):
+        session = FakeSession(response)
+        monkeypatch.setattr(smio_scraper, "get_http_session", lambda: session)
+        return session
+    return serve
+
+def test_extract_apollo_state_reads_only_the_state_object(load_fixture):
+    state = extract_apollo_state(load_fixture("place_menu_apollo.html"))
+
+    assert "PlaceDetailBase:1234567" in state
+    assert "loaded" not in state  # 뒤따르는 다른 window.* 할당은 포함하지 않음
+
+@pytest.mark.parametrize("html", [
+    "<html><body>no state</body></html>",
+    "<script>window.__APOLLO_STATE__ = {broken</script>",
+    "<script>window.__APOLLO_STATE__ = [1, 2];</script>",
+])
+def test_extract_apollo_state_returns_none_without_usable_state(html):
+    assert extract_apollo_state(html) is None
+
+def test_parse_apollo_place(load_fixture):
+    place = parse_apollo_place(extract_apollo_state(load_fixture("place_menu_apollo.html")))
+
+    assert place == {
+        "name": "스미오 분식",
+        "type": "분식",
+        "address": "서울 중구 세종대로 110",
+        "phone": "0507-1234-5678",
+        "rating": 4.52,
+        "review_visitor": 1287,
+    }
+    assert parse_apollo_place({}) == {}
+
+def test_parse_apollo_menu_keeps_screen_order_and_drops_duplicates(load_fixture):
+    menu = parse_apollo_menu(extract_apollo_state(load_fixture("place_menu_apollo.html")))
+
+    assert menu == [
+        {"name": "김치찌개", "price": 9000},
+        {"name": "제육볶음", "price": 10000},
+        {"name": "아메리카노", "price": 3000},
+        {"name": "공깃밥", "price": None},
+    ]
+
+def test_parse_menu_items_from_markup(load_fixture):
+    soup = BeautifulSoup(load_fixture("place_menu_markup.html"), "html.parser")
+
+    assert parse_menu_items(soup) == [
+        {"name": "김치찌개", "price": 9000},
+        {"name": "제육볶음", "price": 10000},
+        {"name": "아메리카노", "price": 3000},
+        {"name": "공깃밥", "price": None},
+    ]
+
+def test_scrape_http_uses_apollo_state(load_fixture, serve_page):
+    session = serve_page(FakeResponse(load_fixture("place_menu_apollo.html")))
+
+    info = scrape_restaurant_info_http(PLACE_URL)
+
+    assert session.requested == [PLACE_URL]
+    assert set(info) == RESTAURANT_INFO_KEYS
+    assert all(set(item) == MENU_ITEM_KEYS for item in info["menu"])
+    assert [item["name"] for item in info["menu"]] == ["김치찌개", "제육볶음", "아메리카노", "공깃밥"]
+    assert info["name"] == "스미오 분식"
+    assert info["phone"] == "0507-1234-5678"
+    assert info["rating"] == 4.52
+    assert info["parking"] == "주차 정보 없음"
+    assert "partial" not in info
+
+def test_scrape_http_falls_back_to_markup(load_fixture, serve_page):
+    serve_page(FakeResponse(load_fixture("place_menu_markup.html")))
+
+    info = scrape_restaurant_info_http(PLACE_URL)
+
+    assert set(info) == RESTAURANT_INFO_KEYS
+    assert all(set(item) == MENU_ITEM_KEYS for item in info["menu"])
+    assert [(item["name"], item["price"]) for item in info["menu"]] == [
+        ("김치찌개", 9000), ("제육볶음", 10000), ("아메리카노", 3000), ("공깃밥", None)
+    ]
+    assert info["name"] == "스미오 분식"
+    assert info["type"] == "분식"
+    assert info["address"] == "서울 중구 세종대로 110"
+    assert info["phone"] == "0507-1234-5678"
+    assert info["rating"] is None
+
+def test_scrape_http_both_paths_return_the_same_shape(load_fixture, serve_page):
+    serve_page(FakeResponse(load_fixture("place_menu_apollo.html")))
+    apollo_info = scrape_restaurant_info_http(PLACE_URL)
+    serve_page(FakeResponse(load_fixture("place_menu_markup.html")))
+    markup_info = scrape_restaurant_info_http(PLACE_URL)
+
+    assert set(apollo_info) == set(markup_info) == RESTAURANT_INFO_KEYS
+    assert apollo_info["menu"] == markup_info["menu"]
+
+def test_scrape_http_decodes_utf8_without_charset(load_fixture, serve_page):
+    # charset 헤더가 없으면 requests는 ISO-8859-1로 추정하므로 한글이 깨지지 않아야 함
+    serve_page(FakeResponse(load_fixture("place_menu_apollo.html"), encoding="ISO-8859-1"))
+
+    info = scrape_restaurant_info_http(PLACE_URL)
+
+    assert info["name"] == "스미오 분식"
+
+def test_scrape_http_returns_none_on_http_error(serve_page):
+    serve_page(FakeResponse("", status_code=503))
+
+    assert scrape_restaurant_info_http(PLACE_URL) is None
+
+def test_scrape_http_returns_empty_menu_for_unrelated_page(serve_page):
+    # 메뉴가 없으면 scrape_restaurant_info가 Selenium으로 넘어가도록 빈 메뉴를 반환
+    serve_page(FakeResponse("<html><body><p>로그인이 필요합니다</p></body></html>"))
+
+    info = scrape_restaurant_info_http(PLACE_URL)
+
+    assert set(info) == RESTAURANT_INFO_KEYS
+    assert info["menu"] == []
+    assert info["name"] == "가게 이름 정보 없음"